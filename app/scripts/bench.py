@@ -0,0 +1,333 @@
+"""
+Benchmarks for the tool generator.
+
+Usage:
+  python scripts/bench.py workers --topics 32 --latency 0.5 --workers 1 4 16
+  python scripts/bench.py categorize --headlines 10000
+  python scripts/bench.py feeds --feeds 4 --items 500 --limit 20
+  python scripts/bench.py importtime --budget-ms 150 --runs 5
+  python scripts/bench.py pipeline --topics 24 --latency 0.3 --failure-rate 0.1 --malformed-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+import generate_tools as gt
+from generation_scheduler import DeadLetterQueue, RateBudget, RetryPolicy
+from model_backends import StubBackend
+from response_cache import ResponseCache
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# ---------- Stub model ----------
+def make_stub_generator(latency: float) -> Callable[[gt.TopicIdea, str], gt.ToolConfig]:
+    """Stand-in for generate_tool that sleeps like a model round-trip and returns an offline config."""
+
+    def generate(topic: gt.TopicIdea, slug: str) -> gt.ToolConfig:
+        time.sleep(latency)
+        return gt.generate_offline_tool(slug)
+
+    return generate
+
+
+def bench_workers(topic_count: int, latency: float, worker_counts: List[int]) -> None:
+    jobs = [(gt.TopicIdea(slug=f"bench-topic-{i}", prompt=f"Bench topic {i}"), f"bench-topic-{i}") for i in range(topic_count)]
+    generate = make_stub_generator(latency)
+    print(f"{topic_count} topics, stub latency {latency:.2f}s")
+    print(f"{'workers':>8} {'seconds':>9} {'tools/s':>9}")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        slugs = [slug for _, slug, _ in gt.run_generation(jobs, generate, workers=workers)]
+        elapsed = time.perf_counter() - start
+        assert slugs == [slug for _, slug in jobs], "results out of order"
+        print(f"{workers:>8} {elapsed:>9.2f} {topic_count / elapsed:>9.2f}")
+
+
+# ---------- categorize_topic ----------
+def legacy_categorize(text: str) -> str:
+    """The original first-match-wins nested loop, kept as the baseline."""
+    lowered = text.lower()
+    words = set(re.findall(r"[a-z0-9]+", lowered))
+    for category, keywords in gt.CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if " " in keyword_lower:
+                if keyword_lower in lowered:
+                    return category
+            elif keyword_lower in words:
+                return category
+    return "general"
+
+
+def synthetic_headlines(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    keywords = [keyword for words in gt.CATEGORY_KEYWORDS.values() for keyword in words]
+    filler = "new report shows record surge as officials warn of rising costs across the region this week".split()
+    headlines = []
+    for _ in range(count):
+        words = rng.sample(filler, rng.randint(6, 12)) + rng.sample(keywords, rng.randint(0, 3))
+        rng.shuffle(words)
+        headlines.append(" ".join(words).capitalize())
+    return headlines
+
+
+def bench_categorize(count: int, repeats: int) -> None:
+    # Half distinct headlines, half repeats, mirroring trends offered to the topic queue again.
+    distinct = synthetic_headlines(count // 2 or 1)
+    batch = (distinct * 2)[:count]
+    print(f"{len(batch)} headlines ({len(distinct)} distinct), best of {repeats}")
+    print(f"{'variant':>18} {'total ms':>10} {'us/call':>9}")
+
+    def timed(label: str, func: Callable[[str], str], reset: Callable[[], None] | None = None) -> None:
+        best = float("inf")
+        for _ in range(repeats):
+            if reset:
+                reset()
+            start = time.perf_counter()
+            for headline in batch:
+                func(headline)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:>18} {best * 1000:>10.1f} {best / len(batch) * 1e6:>9.2f}")
+
+    timed("legacy", legacy_categorize)
+    timed("compiled (cold)", gt.categorize_topic, gt.categorize_topic.cache_clear)
+    timed("compiled (warm)", gt.categorize_topic)
+    timed("uncached scoring", gt.category_scores)
+
+
+# ---------- Trending feeds ----------
+def fixture_feed(index: int, items: int) -> bytes:
+    entries = "".join(
+        f"<item><title>Feed {index} story {n}: solar tax credit heat wave</title>"
+        f"<description>{'Lorem ipsum dolor sit amet. ' * 20}</description></item>"
+        for n in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {index}</title>{entries}</channel></rss>'.encode()
+
+
+def serve_fixture_feeds(feeds: Dict[str, bytes], latency: float) -> ThreadingHTTPServer:
+    """Local stand-in for RSS hosts: honours If-None-Match and counts body bytes actually sent."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            body = feeds.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            time.sleep(latency)
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            try:
+                for start in range(0, len(body), 16384):
+                    self.wfile.write(body[start : start + 16384])
+                    self.wfile.flush()
+                    self.server.bytes_sent += len(body[start : start + 16384])  # type: ignore[attr-defined]
+                    time.sleep(0.005)  # ~3 MB/s link so early termination is visible
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.bytes_sent = 0  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_feeds(feed_count: int, items: int, limit: int, latency: float) -> None:
+    from trending_feeds import FeedCache, fetch_feeds
+
+    feeds = {f"/feed/{i}.xml": fixture_feed(i, items) for i in range(feed_count)}
+    server = serve_fixture_feeds(feeds, latency)
+    urls = [f"http://127.0.0.1:{server.server_address[1]}{path}" for path in feeds]
+    total = sum(len(body) for body in feeds.values())
+    print(f"{feed_count} feeds x {items} items ({total / 1024:.0f} KiB), limit {limit}, latency {latency:.2f}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FeedCache(Path(tmp) / "feeds.json")
+        for label in ("cold", "conditional"):
+            server.bytes_sent = 0  # type: ignore[attr-defined]
+            start = time.perf_counter()
+            topics = fetch_feeds(urls, limit, cache)
+            elapsed = time.perf_counter() - start
+            time.sleep(0.1)  # let handlers notice the closed sockets before reading the counter
+            sent = server.bytes_sent  # type: ignore[attr-defined]
+            print(f"{label:>12}: {len(topics)} items in {elapsed * 1000:.0f} ms, ~{sent / 1024:.0f} KiB body sent")
+    server.shutdown()
+
+
+# ---------- Import time ----------
+# Entry points whose cold import is budgeted, and modules they must only load lazily.
+IMPORT_TARGETS = ("generate_tools", "maintain_tools")
+LAZY_MODULES = ("google.generativeai", "requests", "xml.etree.ElementTree", "numpy", "scipy")
+IMPORT_BUDGET_MS = 150.0
+
+
+def measure_import(module: str) -> Tuple[float, Set[str]]:
+    """Import module in a fresh interpreter with -X importtime; returns (cumulative ms, modules it pulled in)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    loaded: Set[str] = set()
+    after_site = False
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header row
+        name = fields[2].rstrip()
+        top_level = len(name) - len(name.lstrip()) == 1
+        if after_site:
+            loaded.add(name.strip())
+        if top_level and name.strip() == "site":
+            after_site = True  # interpreter start-up (site, .pth files) is not ours to budget
+        if top_level and name.strip() == module:
+            total = int(fields[1]) / 1000
+    return total, loaded
+
+
+def bench_importtime(budget_ms: float, runs: int) -> int:
+    failures = 0
+    print(f"{'module':>16} {'best ms':>9} {'budget':>8}")
+    for module in IMPORT_TARGETS:
+        samples = [measure_import(module) for _ in range(runs)]
+        best = min(total for total, _ in samples)
+        eager = sorted(name for name in LAZY_MODULES if any(name in loaded for _, loaded in samples))
+        status = "ok" if best <= budget_ms else "OVER"
+        print(f"{module:>16} {best:>9.1f} {budget_ms:>8.0f}  {status}")
+        if best > budget_ms:
+            failures += 1
+        if eager:
+            failures += 1
+            print(f"{'':>16} imports {', '.join(eager)} eagerly (should load on first use)")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(SCRIPTS_DIR / "generate_tools.py"), "--help"], capture_output=True, check=True)
+    print(f"generate_tools.py --help: {(time.perf_counter() - start) * 1000:.0f} ms wall clock")
+    return 1 if failures else 0
+
+
+# ---------- Full pipeline against the stub server ----------
+def bench_pipeline(
+    topic_count: int, latency: float, failure_rate: float, malformed_rate: float, worker_counts: List[int], seed: int
+) -> None:
+    """
+    Run the real generate_tool (prompting, extraction, validation, formula checks, retries)
+    against the local stub server; cache and dead-letter files live in a temp dir and
+    nothing is written to data/.
+    """
+    jobs = [
+        (gt.TopicIdea(slug=f"bench-pipeline-{i}", prompt=f"Bench pipeline topic {i}"), f"bench-pipeline-{i}")
+        for i in range(topic_count)
+    ]
+    print(
+        f"{topic_count} topics, stub latency {latency:.2f}s, failure rate {failure_rate:.0%}, "
+        f"malformed rate {malformed_rate:.0%}"
+    )
+    print(f"{'workers':>8} {'seconds':>9} {'tools/s':>9} {'ok':>5} {'requests':>9} {'failed':>7} {'malformed':>10} {'cached':>8}")
+    saved = (gt.MODEL_BACKEND, gt.RESPONSE_CACHE, gt.MODEL_BUDGET, gt.RETRY_POLICY, gt.DEAD_LETTER)
+    try:
+        for workers in worker_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                backend = StubBackend(latency=latency, failure_rate=failure_rate, malformed_rate=malformed_rate, seed=seed)
+                gt.MODEL_BACKEND = backend
+                gt.RESPONSE_CACHE = ResponseCache(Path(tmp) / "responses")
+                gt.MODEL_BUDGET = RateBudget(requests_per_minute=1_000_000, tokens_per_minute=1_000_000_000)
+                gt.RETRY_POLICY = RetryPolicy(attempts=4, base_delay=0.05, max_delay=0.5)
+                gt.DEAD_LETTER = DeadLetterQueue(Path(tmp) / "dead_letter.jsonl")
+
+                def generate(topic: gt.TopicIdea, slug: str) -> gt.ToolConfig | None:
+                    return gt.generate_tool(topic, slug, use_mock=False)
+
+                start = time.perf_counter()
+                produced = [tool for _, _, tool in gt.run_generation(jobs, generate, workers=workers)]
+                elapsed = time.perf_counter() - start
+                model = backend.server.model
+                requests, failures, malformed = model.requests, model.failures, model.malformed
+                # a second pass is answered from the cache without touching the server
+                gt.RESPONSE_CACHE.hits = gt.RESPONSE_CACHE.misses = 0
+                list(gt.run_generation(jobs, generate, workers=workers))
+                lookups = gt.RESPONSE_CACHE.hits + gt.RESPONSE_CACHE.misses
+                cached = gt.RESPONSE_CACHE.hits / lookups if lookups else 0.0
+                backend.close()
+            ok = sum(1 for tool in produced if tool is not None)
+            print(
+                f"{workers:>8} {elapsed:>9.2f} {topic_count / elapsed:>9.2f} {ok:>5} {requests:>9} "
+                f"{failures:>7} {malformed:>10} {cached:>8.0%}"
+            )
+    finally:
+        gt.MODEL_BACKEND, gt.RESPONSE_CACHE, gt.MODEL_BUDGET, gt.RETRY_POLICY, gt.DEAD_LETTER = saved
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generator benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    workers = sub.add_parser("workers", help="Throughput of run_generation against a stub model.")
+    workers.add_argument("--topics", type=int, default=32)
+    workers.add_argument("--latency", type=float, default=0.5, help="Stub seconds per generation.")
+    workers.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+
+    categorize = sub.add_parser("categorize", help="Per-call cost of categorize_topic on synthetic headlines.")
+    categorize.add_argument("--headlines", type=int, default=10000)
+    categorize.add_argument("--repeats", type=int, default=5)
+
+    feeds = sub.add_parser("feeds", help="Concurrent/conditional feed fetch against local fixture feeds.")
+    feeds.add_argument("--feeds", type=int, default=4)
+    feeds.add_argument("--items", type=int, default=500)
+    feeds.add_argument("--limit", type=int, default=20)
+    feeds.add_argument("--latency", type=float, default=0.2)
+
+    importtime = sub.add_parser("importtime", help="Cold import cost of the scripts; fails over budget.")
+    importtime.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Max cumulative import ms per module.")
+    importtime.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (best is compared).")
+
+    pipeline = sub.add_parser("pipeline", help="End-to-end generate_tool throughput against the stub model server.")
+    pipeline.add_argument("--topics", type=int, default=24)
+    pipeline.add_argument("--latency", type=float, default=0.3, help="Mean stub seconds per response.")
+    pipeline.add_argument("--failure-rate", type=float, default=0.1, help="Share of requests answered with 429/503.")
+    pipeline.add_argument("--malformed-rate", type=float, default=0.05, help="Share of responses truncated mid-JSON.")
+    pipeline.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    pipeline.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "importtime":
+        return bench_importtime(args.budget_ms, args.runs)
+    if args.command == "workers":
+        bench_workers(args.topics, args.latency, args.workers)
+    elif args.command == "categorize":
+        bench_categorize(args.headlines, args.repeats)
+    elif args.command == "feeds":
+        bench_feeds(args.feeds, args.items, args.limit, args.latency)
+    elif args.command == "pipeline":
+        bench_pipeline(args.topics, args.latency, args.failure_rate, args.malformed_rate, args.workers, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
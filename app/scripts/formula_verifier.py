@@ -0,0 +1,385 @@
+"""
+Batched verification of generated calculator formulas.
+
+A tool's `formula` is a JavaScript function body that dynamic-calculator.tsx runs as
+`new Function("inputs", "scope", "with (scope) { <formula> }")`. FormulaVerifier samples
+input vectors for every tool from its declared inputs (placeholder / default, min, max,
+step, select options) and evaluates them in node with the same wrapper. All tools of a
+call go to one node process per chunk over stdin, each tool runs inside its own vm
+context with a time limit, and only per-output aggregates come back. Tools that throw,
+return no object, produce NaN/Infinity or never change their outputs are rejected.
+
+node's vm module is not a security boundary, so the formula (model-written code) is
+kept away from anything worth reaching: node starts with a minimal environment (no API
+keys), and each context gets only a JSON string on a null-prototype global, parsed
+inside the context, so no host-realm object (and through its constructor, the host
+Function and `process`) is reachable from the formula.
+
+When node is not installed verification is skipped (every tool passes) with a warning.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import random
+import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SAMPLES = int(os.environ.get("FORMULA_SAMPLES", "200"))
+# Soft wall-clock budget for the samples of one tool: slow formulas (e.g. Monte Carlo
+# loops) are judged on the samples that fit. A single sample running past the budget
+# plus HANG_MS is treated as an infinite loop.
+TOOL_TIMEOUT_MS = 2000
+HANG_MS = 3000
+# Tools per node process when verifying many at once.
+CHUNK_SIZE = 128
+# The only variables node inherits; everything else (API keys, CI tokens, NODE_OPTIONS) stays out.
+NODE_ENV_KEYS = ("PATH", "SYSTEMROOT", "TMPDIR", "TEMP", "TMP")
+# Reject when more than this share of samples throws or yields a non-finite output.
+MAX_FAILURE_RATE = 0.5
+
+_NUMBER = re.compile(r"-?\d+(?:,\d{3})*(?:\.\d+)?")
+_EXAMPLE_PREFIX = re.compile(r"^e\.g\.,?\s*", re.IGNORECASE)
+
+# Reads {"timeout": ms, "hang": ms, "tools": [{slug, formula, outputs, vectors}]} on stdin and prints
+# one JSON line of aggregates per tool. Sample 0 is the placeholder vector.
+_NODE_RUNNER = r"""
+const vm = require("vm");
+const EVALUATE = `
+(() => {
+  const { formula, outputs, vectors, budget } = JSON.parse(request);
+  const stats = { compile: null, timeout: false, evaluated: 0, errors: 0, firstError: null, baseError: null,
+                  notObject: 0, ok: 0, outputs: {} };
+  const started = Date.now();
+  for (const id of outputs) {
+    stats.outputs[id] = { finite: 0, nonFinite: 0, missing: 0, other: 0, min: null, max: null, baseNonFinite: false };
+  }
+  let runner;
+  try {
+    runner = new Function("inputs", "scope", "with (scope) {\\n" + formula + "\\n}");
+  } catch (err) {
+    stats.compile = String(err && err.message || err);
+    return JSON.stringify(stats);
+  }
+  for (let index = 0; index < vectors.length; index++) {
+    if (index > 0 && Date.now() - started > budget) break;
+    const vector = vectors[index];
+    stats.evaluated++;
+    let result;
+    try {
+      const inputs = Object.assign({}, vector);
+      result = runner(inputs, Object.assign(Object.create(null), vector));
+    } catch (err) {
+      stats.errors++;
+      const message = String(err && err.message || err);
+      if (stats.firstError === null) stats.firstError = message;
+      if (index === 0) stats.baseError = message;
+      continue;
+    }
+    if (!result || typeof result !== "object") {
+      stats.notObject++;
+      if (stats.firstError === null) stats.firstError = "formula did not return an object";
+      if (index === 0) stats.baseError = "formula did not return an object";
+      continue;
+    }
+    stats.ok++;
+    for (const id of outputs) {
+      const value = result[id];
+      const entry = stats.outputs[id];
+      if (typeof value === "number") {
+        if (Number.isFinite(value)) {
+          entry.finite++;
+          if (entry.min === null || value < entry.min) entry.min = value;
+          if (entry.max === null || value > entry.max) entry.max = value;
+        } else {
+          entry.nonFinite++;
+          if (index === 0) entry.baseNonFinite = true;
+        }
+      } else if (value === undefined || value === null) {
+        entry.missing++;
+      } else {
+        entry.other++;
+      }
+    }
+  }
+  return JSON.stringify(stats);
+})()`;
+let input = "";
+process.stdin.setEncoding("utf8");
+process.stdin.on("data", (chunk) => { input += chunk; });
+process.stdin.on("end", () => {
+  const request = JSON.parse(input);
+  const script = new vm.Script(EVALUATE);
+  const lines = [];
+  for (const tool of request.tools) {
+    // only a primitive crosses over; the null prototype keeps host Object/Function out of reach
+    const sandbox = Object.create(null);
+    sandbox.request = JSON.stringify({
+      formula: tool.formula, outputs: tool.outputs, vectors: tool.vectors, budget: request.timeout,
+    });
+    const context = vm.createContext(sandbox);
+    let line;
+    try {
+      line = script.runInContext(context, { timeout: request.timeout + request.hang });
+    } catch (err) {
+      line = JSON.stringify({ compile: null, timeout: true, evaluated: 0, errors: 0, firstError: String(err && err.message || err),
+                              baseError: null, notObject: 0, ok: 0, outputs: {} });
+    }
+    lines.push(JSON.stringify({ slug: tool.slug, stats: JSON.parse(line) }));
+  }
+  process.stdout.write(lines.join("\n") + "\n");
+});
+"""
+
+
+class FormulaRejected(ValueError):
+    """A generated formula failed sampled evaluation."""
+
+
+@dataclass
+class Verdict:
+    slug: str
+    ok: bool
+    reasons: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    samples: int = 0
+
+    def describe(self) -> str:
+        return "; ".join(self.reasons or self.warnings) or "ok"
+
+
+# ---------- Sampling ----------
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        if match:
+            return float(match.group().replace(",", ""))
+    return None
+
+
+def _base_value(field_spec: Dict[str, Any], strict: bool = False) -> Optional[float]:
+    """Default or placeholder as a number; strict only accepts values that are wholly numeric."""
+    for key in ("default", "defaultValue", "default_value", "placeholder"):
+        value = field_spec.get(key)
+        if strict and isinstance(value, str):
+            text = _EXAMPLE_PREFIX.sub("", value.strip()).strip("$%€£ ")
+            if not _NUMBER.fullmatch(text):
+                continue
+        number = _as_number(value)
+        if number is not None:
+            return number
+    return None
+
+
+def _number_text(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _snap(value: float, step: Optional[float], low: float, high: float) -> float:
+    if step and step > 0:
+        value = round(value / step) * step
+    value = min(max(value, low), high)
+    return round(value, 10)
+
+
+def number_sampler(field_spec: Dict[str, Any]):
+    """Return (base value, sample(rng)) for a numeric input."""
+    base = _base_value(field_spec)
+    low = _as_number(field_spec.get("min"))
+    high = _as_number(field_spec.get("max"))
+    step = _as_number(field_spec.get("step"))
+    if base is None:
+        base = low if low is not None and low > 0 else 1.0
+    if low is None:
+        low = base / 10 if base > 0 else (base * 10 if base < 0 else 0.0)
+    if high is None:
+        high = base * 10 if base > 0 else (base / 10 if base < 0 else 10.0)
+    if high < low:
+        low, high = high, low
+    base = _snap(base, step, low, high)
+    log_scale = low > 0 and high / low > 10
+
+    def sample(rng: random.Random) -> float:
+        if log_scale:
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return _snap(value, step, low, high)
+
+    return base, sample
+
+
+def _choices(field_spec: Dict[str, Any]) -> List[str]:
+    choices: List[str] = []
+    for option in field_spec.get("options") or []:
+        if isinstance(option, dict):
+            option = option.get("value", option.get("label"))
+        if option is not None:
+            choices.append(str(option))
+    if not choices:
+        placeholder = field_spec.get("placeholder")
+        if isinstance(placeholder, str) and placeholder:
+            choices.append(_EXAMPLE_PREFIX.sub("", placeholder))
+    return choices or [""]
+
+
+def sample_vectors(inputs: List[Dict[str, Any]], count: int, seed: str = "") -> List[Dict[str, Any]]:
+    """
+    Build `count` input vectors the way the browser would pass them: numbers for number
+    inputs, strings for everything else (typed numbers for currency/percentage-style
+    fields with a numeric default). Vector 0 holds the placeholder/default values.
+    """
+    rng = random.Random(seed)
+    base: Dict[str, Any] = {}
+    samplers = []
+    for spec in inputs:
+        if not isinstance(spec, dict) or not spec.get("id"):
+            continue
+        input_id = str(spec["id"])
+        if spec.get("type") == "number":
+            value, sample = number_sampler(spec)
+            base[input_id] = value
+            samplers.append((input_id, sample))
+        elif not spec.get("options") and _base_value(spec, strict=True) is not None:
+            value, sample = number_sampler(spec)
+            base[input_id] = _number_text(value)
+            samplers.append((input_id, lambda r, sample=sample: _number_text(sample(r))))
+        else:
+            choices = _choices(spec)
+            base[input_id] = choices[0]
+            samplers.append((input_id, lambda r, choices=choices: r.choice(choices)))
+    vectors = [base]
+    for _ in range(max(0, count - 1)):
+        vectors.append({input_id: sample(rng) for input_id, sample in samplers})
+    return vectors
+
+
+# ---------- Verdicts ----------
+def judge(slug: str, stats: Dict[str, Any], numeric_inputs: bool) -> Verdict:
+    samples = stats.get("evaluated", 0)
+    verdict = Verdict(slug=slug, ok=True, samples=samples)
+    reasons, warnings = verdict.reasons, verdict.warnings
+    if stats.get("compile"):
+        reasons.append(f"syntax error: {stats['compile']}")
+    elif stats.get("timeout"):
+        reasons.append(f"timed out: {stats.get('firstError')}")
+    else:
+        failed = stats.get("errors", 0) + stats.get("notObject", 0)
+        if failed and failed > samples * MAX_FAILURE_RATE:
+            reasons.append(f"fails on {failed}/{samples} samples: {stats.get('firstError')}")
+        elif stats.get("baseError"):
+            reasons.append(f"fails on placeholder inputs: {stats['baseError']}")
+        elif failed:
+            warnings.append(f"fails on {failed}/{samples} samples")
+        outputs = stats.get("outputs", {})
+        ok_samples = stats.get("ok", 0)
+        if ok_samples and outputs:
+            present = {key: entry for key, entry in outputs.items() if entry["missing"] < ok_samples}
+            if not present:
+                reasons.append("returns none of the declared outputs")
+            for key in sorted(set(outputs) - set(present)):
+                warnings.append(f"output '{key}' is never returned")
+            for key, entry in present.items():
+                if entry["baseNonFinite"]:
+                    reasons.append(f"output '{key}' is non-finite on placeholder inputs")
+                elif entry["nonFinite"] > ok_samples * MAX_FAILURE_RATE:
+                    reasons.append(f"output '{key}' is non-finite on {entry['nonFinite']}/{ok_samples} samples")
+                elif entry["nonFinite"]:
+                    warnings.append(f"output '{key}' is non-finite on {entry['nonFinite']}/{ok_samples} samples")
+            numeric = {key: entry for key, entry in present.items() if entry["finite"]}
+            if numeric_inputs and ok_samples > 1 and numeric and not present.keys() - numeric.keys():
+                if all(entry["min"] == entry["max"] for entry in numeric.values()):
+                    reasons.append("outputs are constant across all samples")
+    verdict.ok = not reasons
+    return verdict
+
+
+# ---------- Runner ----------
+class FormulaVerifier:
+    def __init__(
+        self,
+        samples: int = DEFAULT_SAMPLES,
+        enabled: bool = True,
+        node: Optional[str] = None,
+        timeout_ms: int = TOOL_TIMEOUT_MS,
+    ) -> None:
+        self.samples = samples
+        self.enabled = enabled
+        self.node = node or os.environ.get("NODE_BINARY") or shutil.which("node")
+        self.timeout_ms = timeout_ms
+        self.rejected = 0
+        self._warned = False
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and bool(self.node)
+
+    def _run_chunk(self, payload: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        request = json.dumps({"timeout": self.timeout_ms, "hang": HANG_MS, "tools": payload}, ensure_ascii=False)
+        completed = subprocess.run(
+            [self.node, "-e", _NODE_RUNNER],  # type: ignore[list-item]
+            input=request,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            timeout=30 + len(payload) * (self.timeout_ms + HANG_MS) / 1000,
+            env={key: os.environ[key] for key in NODE_ENV_KEYS if key in os.environ},
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"node exited with {completed.returncode}: {completed.stderr.strip()[:300]}")
+        stats: Dict[str, Dict[str, Any]] = {}
+        for line in completed.stdout.splitlines():
+            if line.strip():
+                row = json.loads(line)
+                stats[row["slug"]] = row["stats"]
+        return stats
+
+    def verify(self, tools: List[Dict[str, Any]], workers: int = 1) -> List[Verdict]:
+        """Verify tool dicts (slug, inputs, outputs, formula); verdicts come back in input order."""
+        if not self.available:
+            if self.enabled and not self._warned:
+                self._warned = True
+                print("Warning: node not found; skipping formula verification.")
+            return [Verdict(slug=str(tool.get("slug")), ok=True) for tool in tools]
+        payload = []
+        numeric_inputs = []
+        for index, tool in enumerate(tools):
+            inputs = tool.get("inputs") if isinstance(tool.get("inputs"), list) else []
+            outputs = tool.get("outputs") if isinstance(tool.get("outputs"), list) else []
+            slug = str(tool.get("slug") or index)
+            payload.append(
+                {
+                    "slug": f"{index}:{slug}",
+                    "formula": str(tool.get("formula") or ""),
+                    "outputs": [str(out["id"]) for out in outputs if isinstance(out, dict) and out.get("id")],
+                    "vectors": sample_vectors(inputs, self.samples, seed=slug),
+                }
+            )
+            numeric_inputs.append(any(isinstance(spec, dict) and spec.get("type") == "number" for spec in inputs))
+        chunks = [payload[start : start + CHUNK_SIZE] for start in range(0, len(payload), CHUNK_SIZE)]
+        stats: Dict[str, Dict[str, Any]] = {}
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                stats.update(self._run_chunk(chunk))
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                for result in pool.map(self._run_chunk, chunks):
+                    stats.update(result)
+        verdicts = []
+        for item, has_numbers in zip(payload, numeric_inputs):
+            slug = item["slug"].split(":", 1)[1]
+            verdict = judge(slug, stats.get(item["slug"], {"timeout": True, "firstError": "no result from node"}), has_numbers)
+            if not verdict.ok:
+                self.rejected += 1
+            verdicts.append(verdict)
+        return verdicts
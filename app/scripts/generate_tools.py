@@ -2,55 +2,77 @@
 Advanced tool generator with strategy mode and content-heavy outputs.
 
 Features:
-- Strategy mode (default): Gemini plans high-value low-competition niches and returns topics.
+- Strategy mode (default): the model plans high-value low-competition niches and returns topics.
+- Model backends: Gemini (default), any OpenAI-compatible endpoint, or a deterministic local
+  stub server for offline load tests (--backend, see model_backends.py).
 - Strong prompt: requires 3-8 inputs, >=2 outputs, multi-step formula, 5-8 FAQs, related slugs, and ~800-word article with 3 fixed sections.
 - Validation/fallbacks to avoid empty content.
+- Formula verification: generated formulas are evaluated over sampled inputs in node and
+  tools with throwing, NaN/Infinity or constant outputs are retried instead of saved.
+- Related tools: after a run, `related` is set from TF-IDF neighbours for the new tools,
+  which are also added to existing lists they beat (see related_tools.py); skipped with --mock.
 """
 
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import json
 import os
 import random
 import re
+import statistics
+import subprocess
 import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
-from xml.etree import ElementTree as ET
-
-try:
-    import requests
-
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from formula_verifier import FormulaRejected, FormulaVerifier
+from generation_log import GenerationLog
+from generation_scheduler import (
+    EXPECTED_OUTPUT_TOKENS,
+    DeadLetterQueue,
+    RateBudget,
+    RetryPolicy,
+    estimate_tokens,
+)
+from json_extract import JSONExtractError, JSONStreamExtractor, extract_json
+from model_backends import BACKENDS, DEFAULT_BACKEND, ModelBackend, make_backend
+from near_duplicates import NearDuplicateIndex
+from related_tools import RelatedIndex, write_related
+from response_cache import ResponseCache
+from stage_spans import SpanRecorder
+from topic_queue import TopicQueue
+from tool_manifest import ToolManifest
+from tool_writer import ToolWriteBatch
 
-# ---- compat for Python < 3.10 (packages_distributions) ----
-try:
-    from importlib.metadata import packages_distributions as _pd  # type: ignore
-except Exception:
-    try:
-        import importlib_metadata  # type: ignore
-        import importlib.metadata as _ilm  # type: ignore
 
-        if not hasattr(_ilm, "packages_distributions"):
-            _ilm.packages_distributions = importlib_metadata.packages_distributions  # type: ignore
-    except Exception:
-        pass
+# requests and the feed parser are imported on first use (inside trending_feeds), and the
+# model SDKs inside model_backends, so --help, --mock runs and scripts that import this
+# module skip their start-up cost (`python scripts/bench.py importtime` guards this).
+HAS_REQUESTS = importlib.util.find_spec("requests") is not None
 
-try:
-    import google.generativeai as genai  # type: ignore
 
-    HAS_GENAI = True
-except ImportError:
-    HAS_GENAI = False
 
 ROOT = Path(__file__).resolve().parents[1]
 TOOLS_DIR = ROOT / "data" / "tools"
 LOG_FILE = ROOT / "data" / "tool_generation_log.csv"
+TOOL_MANIFEST = ToolManifest(
+    TOOLS_DIR,
+    ROOT / "data" / ".cache" / "tools_manifest.json",
+    categorize=lambda text: categorize_topic(text),
+)
+NEAR_DUP_INDEX = NearDuplicateIndex(ROOT / "data" / ".cache" / "minhash_index.json", TOOLS_DIR)
+RELATED_INDEX = RelatedIndex(ROOT / "data" / ".cache" / "related_index.json", TOOLS_DIR)
+GENERATION_LOG = GenerationLog(LOG_FILE, ROOT / "data" / ".cache" / "generation_log.sqlite")
+# One or more RSS feeds, separated by commas or whitespace.
 TRENDING_FEED_URL = os.environ.get(
     "TRENDING_FEED_URL",
     "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en",
@@ -85,10 +107,19 @@ CATEGORY_KEYWORDS: Dict[str, List[str]] = {
     "lifestyle": ["travel", "nutrition", "wedding", "family", "pet", "garden"],
     "sports": ["game", "team", "tournament", "player", "score", "olympic"],
 }
-TOOLS_DIR.mkdir(parents=True, exist_ok=True)
 
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+MODEL_BACKEND: ModelBackend = make_backend()
+RESPONSE_CACHE = ResponseCache(ROOT / "data" / ".cache" / "responses")
+# Defaults match the gemini-2.5-flash free tier; raise them for paid quotas.
+MODEL_BUDGET = RateBudget(
+    requests_per_minute=int(os.environ.get("GEMINI_RPM", "10")),
+    tokens_per_minute=int(os.environ.get("GEMINI_TPM", "250000")),
+)
+RETRY_POLICY = RetryPolicy(attempts=int(os.environ.get("GENERATION_ATTEMPTS", "3")))
+DEAD_LETTER = DeadLetterQueue(ROOT / "data" / "generation_dead_letter.jsonl")
+TOPIC_QUEUE = TopicQueue(ROOT / "data" / "topic_queue.jsonl")
+FORMULA_VERIFIER = FormulaVerifier()
+SPANS = SpanRecorder()
 
 
 # ---------- Data model ----------
@@ -139,6 +170,15 @@ class ToolConfig:
         return data
 
 
+@dataclass
+class StreamStats:
+    topic: str
+    outcome: str
+    total: float
+    first_field: Optional[float] = None
+    chars: int = 0
+
+
 # ---------- Helpers ----------
 def sanitize_slug(text: str) -> str:
     slug = re.sub(r"[^a-zA-Z0-9]+", "-", text).strip("-").lower()
@@ -153,67 +193,89 @@ def ensure_dirs() -> None:
 def clean_json(text: str | None) -> Dict[str, Any] | None:
     if not text:
         return None
-    cleaned = re.sub(r"```json\s*", "", text, flags=re.IGNORECASE)
-    cleaned = re.sub(r"```", "", cleaned)
-    try:
-        match = re.search(r"(\{.*\})", cleaned, re.DOTALL)
-        if match:
-            return json.loads(match.group(1))
-        return json.loads(cleaned)
-    except Exception:
-        return None
+    with SPANS.span("clean_json", bytes=len(text.encode("utf-8"))) as span:
+        try:
+            data = extract_json(text, kind="object")
+        except JSONExtractError as exc:
+            span["error"] = "JSONExtractError"
+            print(f"Warning: could not parse model JSON ({exc})")
+            return None
+    return data
 
 
 def append_log(slug: str, title: str, path: Path) -> None:
-    ensure_dirs()
-    header_needed = not LOG_FILE.exists()
-    with LOG_FILE.open("a", encoding="utf-8") as fh:
-        if header_needed:
-            fh.write("timestamp_utc,slug,title,path\n")
-        fh.write(f"{datetime.utcnow().isoformat(timespec='seconds')}Z,{slug},{title},{path}\n")
+    """Buffer a log row; rows are written together by GENERATION_LOG.flush() at the end of the run."""
+    GENERATION_LOG.append(slug, title, path)
 
 
+def _compile_category_keywords(
+    keywords: Dict[str, List[str]],
+) -> Tuple[Dict[str, List[Tuple[str, float]]], Dict[str, List[Tuple[Tuple[str, ...], str, float]]]]:
+    """
+    Build token -> [(category, weight)] for single-word keywords and
+    first token -> [(phrase tokens, category, weight)] for multi-word keywords.
+    Multi-word keywords weigh one point per word since they are more specific.
+    """
+    single: Dict[str, List[Tuple[str, float]]] = {}
+    phrases: Dict[str, List[Tuple[Tuple[str, ...], str, float]]] = {}
+    for category, words in keywords.items():
+        for keyword in words:
+            tokens = tuple(re.findall(r"[a-z0-9]+", keyword.lower()))
+            if not tokens:
+                continue
+            if len(tokens) == 1:
+                single.setdefault(tokens[0], []).append((category, 1.0))
+            else:
+                phrases.setdefault(tokens[0], []).append((tokens, category, float(len(tokens))))
+    return single, phrases
+
+
+_KEYWORD_TOKENS, _KEYWORD_PHRASES = _compile_category_keywords(CATEGORY_KEYWORDS)
+_CATEGORY_ORDER = {category: index for index, category in enumerate(CATEGORY_KEYWORDS)}
+
+
+def category_scores(text: str) -> Dict[str, float]:
+    """Weighted keyword hits per category; each distinct keyword counts once."""
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    matched: set[Tuple[str, Tuple[str, ...]]] = set()
+    scores: Dict[str, float] = {}
+    for index, token in enumerate(tokens):
+        for category, weight in _KEYWORD_TOKENS.get(token, ()):
+            if (category, (token,)) not in matched:
+                matched.add((category, (token,)))
+                scores[category] = scores.get(category, 0.0) + weight
+        for phrase, category, weight in _KEYWORD_PHRASES.get(token, ()):
+            if tuple(tokens[index : index + len(phrase)]) == phrase and (category, phrase) not in matched:
+                matched.add((category, phrase))
+                scores[category] = scores.get(category, 0.0) + weight
+    return scores
+
+
+@lru_cache(maxsize=16384)
 def categorize_topic(text: str) -> str:
-    lowered = text.lower()
-    words = set(re.findall(r"[a-z0-9]+", lowered))
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            if " " in keyword_lower:
-                if keyword_lower in lowered:
-                    return category
-            elif keyword_lower in words:
-                return category
-    return "general"
+    """Highest-scoring category; ties go to the category listed first in CATEGORY_KEYWORDS."""
+    scores = category_scores(text)
+    if not scores:
+        return "general"
+    return max(scores, key=lambda category: (scores[category], -_CATEGORY_ORDER[category]))
 
 
+@SPANS.timed()
 def fetch_trending_topics(limit: int = 20) -> List[Dict[str, str]]:
     if not HAS_REQUESTS:
         print("Warning: requests is not installed; skipping trending fetch.")
         return []
-    try:
-        response = requests.get(TRENDING_FEED_URL, timeout=15)
-        response.raise_for_status()
-    except Exception as exc:
-        print(f"Warning: unable to fetch trending feed ({exc})")
-        return []
-    try:
-        root = ET.fromstring(response.text)
-    except ET.ParseError as exc:
-        print(f"Warning: unable to parse trending feed ({exc})")
-        return []
+    from trending_feeds import FeedCache, fetch_feeds, parse_feed_urls
+
+    cache = FeedCache(ROOT / "data" / ".cache" / "feeds.json")
+    items = fetch_feeds(parse_feed_urls(TRENDING_FEED_URL), limit, cache)
+    cache.save()
 
     topics: List[Dict[str, str]] = []
-    for item in root.findall(".//item"):
-        title = (item.findtext("title") or "").strip()
-        description = (item.findtext("description") or "").strip()
-        if not title:
-            continue
-        combined = f"{title} {description}".strip()
-        category = categorize_topic(combined)
-        topics.append({"title": title, "category": category})
-        if len(topics) >= limit:
-            break
+    for item in items:
+        combined = f"{item['title']} {item['description']}".strip()
+        topics.append({"title": item["title"], "category": categorize_topic(combined)})
+    SPANS.annotate(items=len(topics))
     return topics
 
 
@@ -222,131 +284,118 @@ def build_trend_context(topics: Iterable[Dict[str, str]]) -> str:
     return "\n".join(lines)
 
 
-def diversify_topics(
-    ideas: List[TopicIdea],
-    plan_count: int,
-    trends: Optional[List[Dict[str, str]]] = None,
-    min_categories: int = 4,
-    max_per_category: int = 2,
-) -> List[TopicIdea]:
-    """
-    Apply hard caps per category and backfill with trending items so daily runs
-    are not dominated by a single domain (e.g., finance).
-    """
-    selected: List[TopicIdea] = []
-    category_counts: Dict[str, int] = {}
-    seen_slugs: set[str] = set()
-
-    def consider(raw: TopicIdea) -> None:
-        if len(selected) >= plan_count:
-            return
-        category = raw.category or categorize_topic(raw.prompt)
-        if category_counts.get(category, 0) >= max_per_category:
-            return
-        slug = sanitize_slug(raw.slug)
-        if slug in seen_slugs:
-            return
-        seen_slugs.add(slug)
-        category_counts[category] = category_counts.get(category, 0) + 1
-        selected.append(TopicIdea(slug=slug, prompt=raw.prompt, category=category, source=raw.source))
+def category_pressure(days: int = 14) -> Dict[str, float]:
+    """Tools generated per category over the last `days`, relative to the per-category mean."""
+    since = datetime.utcnow() - timedelta(days=days)
+    counts = Counter(categorize_topic(title) for _, _, title, _ in GENERATION_LOG.rows_since(since))
+    if not counts:
+        return {}
+    mean = sum(counts.values()) / len(CATEGORY_KEYWORDS)
+    return {category: count / mean for category, count in counts.items()}
+
+
+def topic_novelty(prompt: str, allow_near_duplicates: bool = False) -> Optional[float]:
+    """1 - MinHash similarity to the closest existing tool; None for a near-duplicate."""
+    match = NEAR_DUP_INDEX.closest(prompt)
+    if match is None:
+        return 1.0
+    if match[1] >= NEAR_DUP_INDEX.threshold and not allow_near_duplicates:
+        return None
+    return 1.0 - match[1]
+
 
+def offer_topics(ideas: Iterable[TopicIdea], origin: str) -> int:
+    """Queue candidate topics that are not built yet (slug and category resolved once); returns how many were new."""
+    added = 0
     for idea in ideas:
-        consider(idea)
-        if len(selected) >= plan_count:
-            break
+        slug = sanitize_slug(idea.slug)
+        if TOOL_MANIFEST.exists(slug):
+            continue
+        category = idea.category or categorize_topic(idea.prompt)
+        added += TOPIC_QUEUE.offer(slug, idea.prompt, category, origin, idea.source)
+    return added
+
+
+def trend_ideas(trends: Iterable[Dict[str, str]]) -> List[TopicIdea]:
+    return [
+        TopicIdea(
+            slug=sanitize_slug(item.get("title", "trend-topic")),
+            prompt=f"{item.get('title', 'Trending topic')} calculator inspired by current news",
+            category=item.get("category"),
+            source="trend",
+        )
+        for item in trends
+    ]
 
-    if trends:
-        # First, add categories we do not yet have to reach diversity minimum.
-        for item in trends:
-            if len(selected) >= plan_count:
-                break
-            if len(category_counts) >= min_categories and min_categories > 0:
-                break
-            category = item.get("category") or categorize_topic(item.get("title", ""))
-            if category in category_counts:
-                continue
-            slug = sanitize_slug(item.get("title", "trend-topic"))
-            prompt = f"{item.get('title', 'Trending topic')} calculator inspired by current news"
-            consider(TopicIdea(slug=slug, prompt=prompt, category=category, source="trend"))
-
-        # If we still have capacity, fill remaining slots with other trending items respecting caps.
-        for item in trends:
-            if len(selected) >= plan_count:
-                break
-            category = item.get("category") or categorize_topic(item.get("title", ""))
-            slug = sanitize_slug(item.get("title", "trend-topic"))
-            prompt = f"{item.get('title', 'Trending topic')} calculator inspired by current news"
-            consider(TopicIdea(slug=slug, prompt=prompt, category=category, source="trend"))
-
-    # If we are still short because of strict caps, allow existing categories up to the plan_count.
-    if len(selected) < plan_count:
-        overflow: List[TopicIdea] = []
-        for idea in ideas:
-            slug = sanitize_slug(idea.slug)
-            if slug in seen_slugs:
-                continue
-            overflow.append(
-                TopicIdea(
-                    slug=slug,
-                    prompt=idea.prompt,
-                    category=idea.category or categorize_topic(idea.prompt),
-                    source=idea.source,
-                )
-            )
-        for idea in overflow:
-            if len(selected) >= plan_count:
-                break
-            selected.append(idea)
-            seen_slugs.add(idea.slug)
 
-    return selected[:plan_count]
+def select_queued_topics(
+    count: int, max_per_category: int = 2, shuffle: bool = False, allow_near_duplicates: bool = False
+) -> List[TopicIdea]:
+    TOPIC_QUEUE.prune()
+    entries = TOPIC_QUEUE.select(
+        count,
+        max_per_category=max_per_category,
+        pressure=category_pressure(),
+        novelty=lambda prompt: topic_novelty(prompt, allow_near_duplicates),
+        exclude=TOOL_MANIFEST.exists,
+        shuffle=shuffle,
+    )
+    origins = Counter(entry["origin"] for entry in entries)
+    print(
+        f"Topic queue: picked {len(entries)} ({', '.join(f'{n} {o}' for o, n in origins.most_common()) or 'none'}), "
+        f"{len(TOPIC_QUEUE)} carried over."
+    )
+    return [
+        TopicIdea(slug=entry["slug"], prompt=entry["prompt"], category=entry["category"], source=entry.get("source"))
+        for entry in entries
+    ]
 
 
 def load_recent_slugs(days: int = 14) -> set[str]:
-    if not LOG_FILE.exists():
-        return set()
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    recent: set[str] = set()
-    with LOG_FILE.open("r", encoding="utf-8") as fh:
-        header_skipped = False
-        for line in fh:
-            if not header_skipped:
-                header_skipped = True
-                if line.lower().startswith("timestamp_utc"):
-                    continue
-            parts = line.strip().split(",")
-            if len(parts) < 2:
-                continue
-            timestamp_raw, slug = parts[0], parts[1]
-            ts_clean = timestamp_raw.rstrip("Z")
-            dt: datetime | None = None
-            for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
-                try:
-                    dt = datetime.strptime(ts_clean, fmt)
-                    break
-                except ValueError:
-                    continue
-            if not dt:
-                try:
-                    dt = datetime.fromisoformat(ts_clean)
-                except ValueError:
-                    continue
-            if dt >= cutoff:
-                recent.add(slug)
-    return recent
+    return GENERATION_LOG.recent_slugs(days)
 
 
 # ---------- Content generation ----------
-def plan_topics_with_gemini(
-    api_key: str,
+def record_model_traffic(prompt: str, text: str, cached: bool = False) -> None:
+    """Attach request/response sizes (tokens estimated at ~4 chars each) to the open span."""
+    SPANS.annotate(
+        model_calls=0 if cached else 1,
+        cache_hits=1 if cached else 0,
+        prompt_tokens=estimate_tokens(prompt, 0),
+        response_tokens=estimate_tokens(text, 0),
+        prompt_bytes=len(prompt.encode("utf-8")),
+        response_bytes=len(text.encode("utf-8")),
+    )
+
+
+def call_model(prompt: str, timeout: int, expected_output: int | None = None) -> str:
+    """
+    Return the model's text for prompt, served from RESPONSE_CACHE when the same prompt
+    was seen before; live calls wait for room in MODEL_BUDGET first.
+    """
+    cached = RESPONSE_CACHE.get(MODEL_BACKEND.cache_name, prompt)
+    if cached is not None:
+        record_model_traffic(prompt, cached, cached=True)
+        return cached
+    if expected_output is None:
+        MODEL_BUDGET.acquire(estimate_tokens(prompt))
+    else:
+        MODEL_BUDGET.acquire(estimate_tokens(prompt, expected_output))
+    text = MODEL_BACKEND.generate(prompt, timeout)
+    record_model_traffic(prompt, text)
+    RESPONSE_CACHE.put(MODEL_BACKEND.cache_name, prompt, text)
+    return text
+
+
+@SPANS.timed()
+def plan_topics(
     plan_count: int,
     niches: str,
     trends: Optional[List[Dict[str, str]]] = None,
     recent_slugs: Optional[set[str]] = None,
 ) -> List[TopicIdea]:
-    if not HAS_GENAI:
+    if not MODEL_BACKEND.available():
         return []
-    genai.configure(api_key=api_key)
     trend_context = build_trend_context((trends or [])[:12]) if trends else ""
     avoid_list = sorted(list(recent_slugs))[:20] if recent_slugs else []
     avoid_text = ", ".join(avoid_list)
@@ -375,19 +424,13 @@ Constraints:
 - Include at least one non-finance idea.
 - Each calculator must be formula-heavy (multi-step logic, not a single multiplication).
 - JSON only, no commentary."""
-    model = genai.GenerativeModel(MODEL_NAME)
     try:
-        response = model.generate_content(prompt, request_options={"timeout": 60})
+        text = call_model(prompt, timeout=60, expected_output=150 * plan_count) or "[]"
     except Exception as e:
         print("Strategy generation failed:", e)
         return []
-    text = response.text or "[]"
     try:
-        cleaned = re.sub(r"```json\s*", "", text, flags=re.IGNORECASE)
-        cleaned = re.sub(r"```", "", cleaned)
-        topics = json.loads(cleaned)
-        if not isinstance(topics, list):
-            raise ValueError("Plan result is not a list")
+        topics = extract_json(text, kind="array")
         ideas: List[TopicIdea] = []
         for raw in topics:
             if isinstance(raw, str):
@@ -426,20 +469,15 @@ Constraints:
     return []
 
 
-def generate_with_gemini(topic: str, api_key: str) -> ToolConfig | None:
-    if not HAS_GENAI:
-        return None
-    genai.configure(api_key=api_key)
-    prompt = f"""You are generating a high-quality, professional JSON config for a calculator about "{topic}".
-Return only valid JSON with fields: slug, title, seo{{title,description}}, summary,
+TOOL_FIELDS_SPEC = """fields: slug, title, seo{title,description}, summary,
 inputs[id,label,type(number|text),placeholder,required,step?],
 outputs[id,label,unit?,precision?],
 formula (JavaScript body returning an object), cta,
-faq(list of {{q,a}} 5-8 items), tags(list of strings),
+faq(list of {q,a} 5-8 items), tags(list of strings),
     related(slugs of similar tools), article(list of sections with heading, body),
-    calculationSteps(list of strings describing the math).
+    calculationSteps(list of strings describing the math)."""
 
-Constraints for "High Value Content":
+TOOL_CONTENT_RULES = """Constraints for "High Value Content":
 - inputs: 4-10 professional inputs. Use realistic domain units and granular steps.
 - formula: Must be a robust, multi-step calculation. Include edge case handling, caps, and logical branches.
 - calculationSteps: 3-6 clear, numbered steps explaining how the inputs become the outputs.
@@ -451,24 +489,227 @@ Constraints for "High Value Content":
   4) "Case Studies": Two detailed, realistic scenarios with specific numbers (e.g., "John's Mortgage", "Sarah's Calorie Deficit").
   5) "Expert Tips & Pitfalls": nuance, edge cases, and professional advice.
 - FAQ: 8-10 distinct questions.
-- Tone: Professional, verifiable, objective (like Investopedia or Mayo Clinic).
+- Tone: Professional, verifiable, objective (like Investopedia or Mayo Clinic)."""
+
+
+def build_tool_prompt(topic: str) -> str:
+    return f"""You are generating a high-quality, professional JSON config for a calculator about "{topic}".
+Return only valid JSON with {TOOL_FIELDS_SPEC}
+
+{TOOL_CONTENT_RULES}
 
 Respond with JSON only, ensuring the content is substantial and high-value."""
-    model = genai.GenerativeModel(MODEL_NAME)
-    try:
-        response = model.generate_content(prompt, request_options={"timeout": 120})
-    except Exception as e:
-        print(f"❌ Generation failed for {topic}:", e)
+
+
+def build_batch_prompt(topics: List[str]) -> str:
+    """One request for several calculators; the shared schema and rules are sent once."""
+    listing = "\n".join(f'{index}. "{topic}"' for index, topic in enumerate(topics, start=1))
+    return f"""You are generating high-quality, professional JSON configs for {len(topics)} calculators:
+{listing}
+
+Return only a valid JSON array with exactly {len(topics)} objects, in the same order as the list above.
+Each object must echo its list number as "index" and have {TOOL_FIELDS_SPEC}
+
+{TOOL_CONTENT_RULES}
+- These rules apply to every calculator independently; do not shorten later items.
+
+Respond with the JSON array only, ensuring every config is substantial and high-value."""
+
+
+@SPANS.timed()
+def generate_with_model(topic: str) -> ToolConfig | None:
+    if not MODEL_BACKEND.available():
         return None
-    data = clean_json(response.text)
+    prompt = build_tool_prompt(topic)
+    # API errors propagate so RETRY_POLICY can back off and report them.
+    text = call_model(prompt, timeout=120)
+    data = clean_json(text)
     if not data:
+        RESPONSE_CACHE.discard(MODEL_BACKEND.cache_name, prompt)
         return None
     slug = data.get("slug") or sanitize_slug(topic)
     data["slug"] = slug
     return validate_and_fix(data, slug)
 
 
+# ---------- Streaming generation ----------
+REQUIRED_STREAM_FIELDS = ("inputs", "outputs", "formula")
+# Bulky fields the prompt asks for after the required ones; if one starts first the
+# response is off-spec and not worth waiting for.
+HEAVY_STREAM_FIELDS = ("faq", "article")
+# Give up if this much text arrives without the JSON object starting.
+STREAM_PREAMBLE_LIMIT = 2000
+STREAM_STATS: List[StreamStats] = []
+_STREAM_STATS_LOCK = threading.Lock()
+
+
+class StreamAbort(Exception):
+    pass
+
+
+def stream_model(prompt: str, timeout: int) -> Iterator[str]:
+    """Yield response text chunks; a cached response is replayed as a single chunk."""
+    cached = RESPONSE_CACHE.get(MODEL_BACKEND.cache_name, prompt)
+    if cached is not None:
+        yield cached
+        return
+    MODEL_BUDGET.acquire(estimate_tokens(prompt))
+    yield from MODEL_BACKEND.stream(prompt, timeout)
+
+
+def check_required_field(key: str, raw: str) -> str | None:
+    """Return why a required field is unusable, or None if it looks fine."""
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        return f"'{key}' is not valid JSON ({exc.msg})"
+    if key in ("inputs", "outputs"):
+        if not isinstance(value, list) or not value:
+            return f"'{key}' is empty or not a list"
+        if not all(isinstance(item, dict) and isinstance(item.get("id"), str) and item["id"] for item in value):
+            return f"'{key}' has items without an id"
+    elif key == "formula":
+        if not isinstance(value, str) or "return" not in value:
+            return "'formula' does not return a value"
+    return None
+
+
+def record_stream_stats(stats: StreamStats) -> None:
+    with _STREAM_STATS_LOCK:
+        STREAM_STATS.append(stats)
+    first = f"{stats.first_field:.1f}s" if stats.first_field is not None else "-"
+    print(f"⏱ {stats.topic[:60]}: first field {first}, total {stats.total:.1f}s, {stats.chars} chars ({stats.outcome})")
+
+
+@SPANS.timed()
+def generate_with_model_stream(topic: str, attempts: int = 2) -> ToolConfig | None:
+    """
+    Stream the generation response and validate top-level fields as they complete.
+    Malformed inputs/outputs/formula, or bulky fields arriving before them, abort the
+    stream and start another attempt instead of waiting out the full response.
+    """
+    if not MODEL_BACKEND.available():
+        return None
+    prompt = build_tool_prompt(topic)
+    for attempt in range(1, attempts + 1):
+        start = time.perf_counter()
+        first_field: List[float] = []
+        seen: set[str] = set()
+
+        def on_key(key: str) -> None:
+            missing = [field for field in REQUIRED_STREAM_FIELDS if field not in seen]
+            if key in HEAVY_STREAM_FIELDS and missing:
+                raise StreamAbort(f"'{key}' started before {', '.join(missing)}")
+
+        def on_member(key: str, raw: str) -> None:
+            if not first_field:
+                first_field.append(time.perf_counter() - start)
+            if key in REQUIRED_STREAM_FIELDS:
+                reason = check_required_field(key, raw)
+                if reason:
+                    raise StreamAbort(reason)
+                seen.add(key)
+
+        extractor = JSONStreamExtractor("object", on_key=on_key, on_member=on_member)
+        outcome = "ok"
+        data: Dict[str, Any] | None = None
+        try:
+            for chunk in stream_model(prompt, timeout=120):
+                if extractor.feed(chunk):
+                    break
+                if extractor.start is None and len(extractor.buffer) > STREAM_PREAMBLE_LIMIT:
+                    raise StreamAbort("no JSON object in response preamble")
+            data = extractor.result()
+            missing = [field for field in REQUIRED_STREAM_FIELDS if field not in seen]
+            if missing:
+                raise StreamAbort(f"missing {', '.join(missing)}")
+        except StreamAbort as exc:
+            outcome = f"aborted: {exc}"
+        except JSONExtractError as exc:
+            outcome = f"unparseable: {exc.reason}"
+        except Exception as exc:
+            outcome = f"error: {exc}"
+        record_model_traffic(prompt, extractor.buffer)
+        record_stream_stats(
+            StreamStats(
+                topic=topic,
+                outcome=outcome if attempt == 1 else f"{outcome} (attempt {attempt})",
+                total=time.perf_counter() - start,
+                first_field=first_field[0] if first_field else None,
+                chars=len(extractor.buffer),
+            )
+        )
+        if outcome == "ok" and data is not None:
+            RESPONSE_CACHE.put(MODEL_BACKEND.cache_name, prompt, extractor.buffer)
+            slug = data.get("slug") or sanitize_slug(topic)
+            return validate_and_fix(data, slug)
+    return None
+
+
+def stream_summary() -> str:
+    with _STREAM_STATS_LOCK:
+        stats = list(STREAM_STATS)
+    ok = [item for item in stats if item.outcome.startswith("ok")]
+    firsts = [item.first_field for item in stats if item.first_field is not None]
+    lines = [f"Streaming: {len(ok)}/{len(stats)} attempts succeeded, {len(stats) - len(ok)} aborted or failed."]
+    if firsts:
+        lines.append(f"  median time-to-first-field {statistics.median(firsts):.1f}s")
+    if ok:
+        lines.append(f"  median total latency {statistics.median(item.total for item in ok):.1f}s")
+    return "\n".join(lines)
+
+
+def is_usable_config(data: Any) -> bool:
+    """Minimum shape for a batch item to be kept instead of retried on its own."""
+    return (
+        isinstance(data, dict)
+        and isinstance(data.get("inputs"), list)
+        and bool(data["inputs"])
+        and isinstance(data.get("outputs"), list)
+        and bool(data["outputs"])
+        and isinstance(data.get("formula"), str)
+        and bool(data["formula"].strip())
+    )
+
+
+@SPANS.timed()
+def generate_batch_with_model(topics: List[str]) -> List[ToolConfig | None]:
+    """
+    Generate configs for several topics in one request. Items that are missing or
+    malformed come back as None so the caller can retry them individually.
+    """
+    results: List[ToolConfig | None] = [None] * len(topics)
+    if not MODEL_BACKEND.available() or not topics:
+        return results
+    prompt = build_batch_prompt(topics)
+    try:
+        text = call_model(
+            prompt,
+            timeout=120 + 90 * (len(topics) - 1),
+            expected_output=EXPECTED_OUTPUT_TOKENS * len(topics),
+        )
+    except Exception as e:
+        print(f"❌ Batch generation failed for {len(topics)} topics:", e)
+        return results
+    try:
+        items = extract_json(text, kind="array")
+    except JSONExtractError as exc:
+        print(f"Warning: could not parse batch response for {len(topics)} topics ({exc})")
+        return results
+    for position, data in enumerate(items):
+        if not is_usable_config(data):
+            continue
+        index = data.get("index")
+        slot = index - 1 if isinstance(index, int) and 1 <= index <= len(topics) else position
+        if slot >= len(topics) or results[slot] is not None:
+            continue
+        slug = data.get("slug") or sanitize_slug(topics[slot])
+        results[slot] = validate_and_fix(data, slug)
+    return results
+
+
 # ---------- Validation / fallback ----------
+@SPANS.timed()
 def validate_and_fix(data: Dict[str, Any], slug: str) -> ToolConfig:
     data = dict(data)
     data["slug"] = slug
@@ -548,6 +789,16 @@ def validate_and_fix(data: Dict[str, Any], slug: str) -> ToolConfig:
     )
 
 
+@SPANS.timed("verify_formula")
+def check_formula(tool: ToolConfig, topic: str) -> ToolConfig:
+    """Raise FormulaRejected (dropping the cached response) when the tool's formula fails verification."""
+    verdict = FORMULA_VERIFIER.verify([tool.to_dict()])[0]
+    if not verdict.ok:
+        RESPONSE_CACHE.discard(MODEL_BACKEND.cache_name, build_tool_prompt(topic))
+        raise FormulaRejected(f"formula rejected: {verdict.describe()}")
+    return tool
+
+
 def generate_offline_tool(slug: str) -> ToolConfig:
     title = slug.replace("-", " ").title()
     return ToolConfig(
@@ -570,6 +821,144 @@ def generate_offline_tool(slug: str) -> ToolConfig:
     )
 
 
+@SPANS.timed()
+def generate_tool(
+    topic: TopicIdea, slug: str, use_mock: bool, stream: bool = False
+) -> ToolConfig | None:
+    """
+    Mock mode returns the offline placeholder. Live mode retries with backoff (a formula
+    that fails verification counts as a failed attempt); if every attempt fails the topic
+    is dead-lettered for the next run and None is returned instead of shipping a
+    placeholder page.
+    """
+    SPANS.annotate(slug=slug)
+    if use_mock:
+        tool: ToolConfig | None = generate_offline_tool(slug)
+    else:
+
+        def attempt() -> ToolConfig | None:
+            if stream:
+                result = generate_with_model_stream(topic.prompt, attempts=1)
+            else:
+                result = generate_with_model(topic.prompt)
+            return check_formula(result, topic.prompt) if result is not None else None
+
+        tool, error = RETRY_POLICY.call(attempt, label=topic.prompt)
+        if tool is None:
+            print(f"❌ Error on {topic.prompt}: {error}")
+            if DEAD_LETTER.add(slug, topic.prompt, error, topic.category, topic.source):
+                print(f"⚠️ Queued {slug} in {DEAD_LETTER.path.name} for the next run")
+            else:
+                print(f"⚠️ Giving up on {slug} after {DEAD_LETTER.max_attempts} failed runs")
+            return None
+    # ensure slug matches filename
+    tool.slug = slug
+    return tool
+
+
+@SPANS.timed()
+def generate_tool_batch(
+    jobs: List[Tuple[TopicIdea, str]], use_mock: bool, stream: bool = False
+) -> List[ToolConfig | None]:
+    """Generate several jobs in one model call; items the batch could not produce are retried one by one."""
+    batch: List[ToolConfig | None] = [None] * len(jobs)
+    if not use_mock and len(jobs) > 1:
+        batch = generate_batch_with_model([topic.prompt for topic, _ in jobs])
+        usable = [tool for tool in batch if tool is not None]
+        # one node call verifies every formula the batch produced
+        try:
+            with SPANS.span("verify_formula", tools=len(usable)):
+                verdicts = iter(FORMULA_VERIFIER.verify([tool.to_dict() for tool in usable]))
+        except (RuntimeError, subprocess.SubprocessError, OSError, ValueError) as e:
+            # unverified items go through the one-by-one path, which verifies and retries each
+            print(f"Formula verification failed for the batch ({e.__class__.__name__}: {e}); retrying items individually.")
+            batch = [None] * len(jobs)
+            verdicts = iter(())
+        for index, tool in enumerate(batch):
+            if tool is not None:
+                verdict = next(verdicts)
+                if not verdict.ok:
+                    print(f"Formula rejected for {jobs[index][0].prompt[:60]}: {verdict.describe()}")
+                    batch[index] = None
+        missing = sum(1 for tool in batch if tool is None)
+        if missing:
+            print(f"Batch of {len(jobs)} returned {len(jobs) - missing} usable configs; retrying {missing} individually.")
+    tools: List[ToolConfig | None] = []
+    for (topic, slug), tool in zip(jobs, batch):
+        if tool is None:
+            tool = generate_tool(topic, slug, use_mock, stream=stream)
+        else:
+            tool.slug = slug
+        tools.append(tool)
+    return tools
+
+
+# ---------- Scheduling ----------
+def select_jobs(
+    topics: Iterable[TopicIdea],
+    max_per_day: int,
+    slug_override: str | None = None,
+    force: bool = False,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> List[Tuple[TopicIdea, str]]:
+    """
+    Resolve topics to (topic, slug) jobs before any model call, dropping slugs that
+    already exist on disk (unless force), repeat within the batch or are near-duplicates
+    of an existing tool or an earlier topic, capped at max_per_day.
+    """
+    jobs: List[Tuple[TopicIdea, str]] = []
+    seen: set[str] = set()
+    for topic in topics:
+        if len(jobs) >= max_per_day:
+            print(f"Reached daily cap ({max_per_day}), stopping.")
+            break
+        slug = sanitize_slug(slug_override or topic.slug)
+        if slug in seen:
+            continue
+        if TOOL_MANIFEST.exists(slug) and not force:
+            print(f"Skip existing {slug}")
+            continue
+        if near_duplicates is not None:
+            match = near_duplicates.query(topic.prompt)
+            if match and not (force and match[0] == slug):
+                print(f"Skip near-duplicate {slug} (~{match[1]:.2f} similar to {match[0]})")
+                continue
+            near_duplicates.reserve(slug, topic.prompt)
+        seen.add(slug)
+        jobs.append((topic, slug))
+    return jobs
+
+
+def run_generation(
+    jobs: List[Tuple[TopicIdea, str]],
+    generate: Callable[[TopicIdea, str], ToolConfig | None],
+    workers: int = 1,
+    batch_size: int = 1,
+    generate_batch: Optional[Callable[[List[Tuple[TopicIdea, str]]], List[ToolConfig | None]]] = None,
+) -> Iterator[Tuple[TopicIdea, str, ToolConfig | None]]:
+    """
+    Run generate() for every job (or generate_batch() for chunks of batch_size jobs)
+    with up to `workers` calls in flight. Results (None for failed jobs) are yielded in
+    job order regardless of completion order, so files and log rows land deterministically.
+    """
+    if generate_batch is not None and batch_size > 1:
+        units = [jobs[start : start + batch_size] for start in range(0, len(jobs), batch_size)]
+        run_unit: Callable[[List[Tuple[TopicIdea, str]]], List[ToolConfig | None]] = generate_batch
+    else:
+        units = [[job] for job in jobs]
+        run_unit = lambda unit: [generate(*unit[0])]  # noqa: E731
+    if workers <= 1 or len(units) <= 1:
+        results: Iterable[List[ToolConfig | None]] = map(run_unit, units)
+        for unit, tools in zip(units, results):
+            for (topic, slug), tool in zip(unit, tools):
+                yield topic, slug, tool
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(units))) as pool:
+        for unit, tools in zip(units, pool.map(run_unit, units)):
+            for (topic, slug), tool in zip(unit, tools):
+                yield topic, slug, tool
+
+
 # ---------- CLI ----------
 def iter_topics_from_file(path: Path) -> Iterable[TopicIdea]:
     with path.open("r", encoding="utf-8") as fh:
@@ -579,6 +968,15 @@ def iter_topics_from_file(path: Path) -> Iterable[TopicIdea]:
                 yield TopicIdea(slug=sanitize_slug(topic), prompt=topic)
 
 
+def write_profile(profiler: Any, path: Path, top: int = 15) -> None:
+    import pstats
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(path))
+    print(f"cProfile stats written to {path} (top {top} by cumulative time):")
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
+
+
 def main(argv: List[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Generate tool JSON configs.")
     parser.add_argument("--topic", help="Single domain or calculator idea.")
@@ -586,7 +984,7 @@ def main(argv: List[str] | None = None) -> int:
     parser.add_argument("--max-per-day", type=int, default=10, help="Max items to generate.")
     parser.add_argument("--log", action="store_true", help="Append CSV log.")
     parser.add_argument("--shuffle", action="store_true", help="Shuffle topics.")
-    parser.add_argument("--strategy", action="store_true", help="Use strategy planning via Gemini.")
+    parser.add_argument("--strategy", action="store_true", help="Use strategy planning via the model backend.")
     parser.add_argument(
         "--use-trending",
         action="store_true",
@@ -602,102 +1000,288 @@ def main(argv: List[str] | None = None) -> int:
     parser.add_argument("--force", action="store_true", help="Overwrite existing file if exists.")
     parser.add_argument("--mock", action="store_true", help="Force mock mode (no API calls).")
     parser.add_argument("--slug", help="Optional slug override for single topic.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.environ.get("GENERATOR_BATCH_SIZE", "1")),
+        help="Topics packed into one generation request (failed items are retried individually).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream generation responses, aborting and retrying early when required fields are missing or malformed.",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=5,
+        help="Publish staged tool files (atomic rename + one directory fsync) after this many tools.",
+    )
+    parser.add_argument(
+        "--compact-json",
+        action="store_true",
+        help="Write tool JSON without indentation (smaller files, faster parses).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=DEFAULT_BACKEND,
+        help="Model backend: gemini, an OpenAI-compatible endpoint, or the local stub server (default: MODEL_BACKEND or gemini).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk model response cache.")
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="Skip evaluating generated formulas over sampled inputs before saving.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("GENERATOR_WORKERS", "1")),
+        help="Topics generated concurrently (files and log rows are still written in topic order).",
+    )
+    parser.add_argument(
+        "--allow-near-duplicates",
+        action="store_true",
+        help="Skip MinHash near-duplicate rejection of topics against existing tools.",
+    )
+    parser.add_argument(
+        "--no-related",
+        action="store_true",
+        help="Keep model-suggested `related` slugs instead of rebuilding them from TF-IDF neighbours.",
+    )
+    parser.add_argument(
+        "--spans",
+        type=Path,
+        default=os.environ.get("GENERATOR_SPANS") or None,
+        help="Append per-stage timing spans (tokens, bytes, ms) to this file as JSON lines.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Run under cProfile and dump stats to this file (profiles the main thread; use --workers 1 to include generation).",
+    )
+    parser.add_argument("--export-log", type=Path, help="Write the full generation log as CSV to this path and exit.")
+    parser.add_argument("--refresh-manifest", action="store_true", help="Sync the tool manifest with data/tools and exit.")
     args = parser.parse_args(argv)
 
+    if args.export_log:
+        count = GENERATION_LOG.export_csv(args.export_log)
+        print(f"Exported {count} log rows to {args.export_log}")
+        return 0
+    if args.refresh_manifest:
+        stats = TOOL_MANIFEST.refresh()
+        TOOL_MANIFEST.save()
+        NEAR_DUP_INDEX.save()
+        DEAD_LETTER.save()
+        print(
+            f"Manifest: {len(TOOL_MANIFEST)} tools ({stats['parsed']} parsed, {stats['removed']} removed) "
+            f"-> {TOOL_MANIFEST.path}"
+        )
+        return 0
     if not args.topic and not args.topics_file and not args.strategy:
         parser.error("Provide --topic or --topics-file or --strategy")
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be >= 1")
+    if args.commit_every < 1:
+        parser.error("--commit-every must be >= 1")
+
+    global MODEL_BACKEND
+    if args.backend != MODEL_BACKEND.kind:
+        MODEL_BACKEND = make_backend(args.backend, pool_size=max(args.workers, 4))
 
+    ensure_dirs()
+    if args.spans:
+        SPANS.open(args.spans)
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    RESPONSE_CACHE.enabled = not args.no_cache
+    FORMULA_VERIFIER.enabled = not args.no_verify
     plan_target = min(args.plan_count, args.max_per_day)
     topics: List[TopicIdea] = []
-    api_key = GEMINI_API_KEY
-    use_mock = args.mock or not (api_key and HAS_GENAI)
+    use_mock = args.mock or not MODEL_BACKEND.available()
+    if not use_mock:
+        print(f"Model backend: {MODEL_BACKEND.describe()}")
     recent_slugs = load_recent_slugs()
     trend_data: List[Dict[str, str]] = []
     if args.use_trending:
         trend_limit = max(args.plan_count * 2, 10)
         trend_data = fetch_trending_topics(limit=trend_limit)
 
-    if args.strategy and not use_mock:
-        topics = plan_topics_with_gemini(
-            api_key,
-            args.plan_count,
-            args.niches,
-            trends=trend_data or None,
-            recent_slugs=recent_slugs or None,
-        )
-        if args.shuffle:
-            random.shuffle(topics)
-        if topics:
-            topics = diversify_topics(
-                topics,
-                plan_count=plan_target,
+    TOOL_MANIFEST.refresh()
+    NEAR_DUP_INDEX.sync(TOOL_MANIFEST)
+    near_duplicates = None if args.allow_near_duplicates else NEAR_DUP_INDEX
+
+    # Topics that failed on earlier runs go first; those that become jobs take planning slots.
+    retry_topics: List[TopicIdea] = []
+    retry_jobs: List[Tuple[TopicIdea, str]] = []
+    if not use_mock:
+        retry_topics = [
+            TopicIdea(
+                slug=entry["slug"],
+                prompt=entry["prompt"],
+                category=entry.get("category"),
+                source=entry.get("source"),
+            )
+            for entry in DEAD_LETTER.load()
+        ]
+        if retry_topics:
+            print(f"Retrying {len(retry_topics)} dead-lettered topic(s) before planning new ones.")
+            retry_jobs = select_jobs(
+                retry_topics,
+                args.max_per_day,
+                slug_override=args.slug,
+                force=args.force,
+                near_duplicates=near_duplicates,
+            )
+            picked = {slug for _, slug in retry_jobs}
+            for topic in retry_topics:
+                if topic.slug in picked:
+                    continue
+                if TOOL_MANIFEST.exists(topic.slug):
+                    DEAD_LETTER.discard(topic.slug)
+                # a skipped retry still uses up an attempt, so it cannot linger forever
+                elif not DEAD_LETTER.add(
+                    topic.slug, topic.prompt, "skipped: near-duplicate or over the daily cap", topic.category, topic.source
+                ):
+                    print(f"⚠️ Giving up on {topic.slug} after {DEAD_LETTER.max_attempts} runs")
+    plan_slots = max(0, args.plan_count - len(retry_jobs))
+    topics_file = args.topics_file
+    env_topics = os.environ.get("TOPICS_FILE")
+    if not topics_file and env_topics and Path(env_topics).exists():
+        topics_file = Path(env_topics)
+
+    if use_mock:
+        # Mock tools are placeholders; written under queued slugs they would shadow real ideas.
+        if args.strategy or trend_data:
+            print("Mock run: topic queue not used; taking topics from --topics-file/--topic.")
+    elif args.strategy or (trend_data and not (topics_file or args.topic)):
+        # Planned ideas, trends and topics.txt all feed the persistent queue; the best
+        # candidates (including ones carried over from earlier runs) are picked from it.
+        # Without --strategy an explicit --topic/--topics-file takes precedence over trends.
+        if args.strategy and plan_slots:
+            planned = plan_topics(
+                plan_slots,
+                args.niches,
                 trends=trend_data or None,
-                min_categories=5 if trend_data else 4,
-                max_per_category=2,
+                recent_slugs=recent_slugs or None,
             )
-        if not topics:
-            print("Strategy returned no topics; falling back to topics file or single topic.")
-    if not topics and args.topics_file:
-        topics = list(iter_topics_from_file(args.topics_file))
+            if not planned:
+                print("Strategy returned no topics; picking from queued candidates.")
+            offer_topics(planned, "plan")
+        offer_topics(trend_ideas(trend_data), "trend")
+        if topics_file:
+            offer_topics(iter_topics_from_file(topics_file), "file")
+        topics = select_queued_topics(
+            max(1, plan_target - len(retry_jobs)),
+            max_per_category=2,
+            shuffle=args.shuffle,
+            allow_near_duplicates=args.allow_near_duplicates,
+        )
+    if not topics and topics_file:
+        topics = list(iter_topics_from_file(topics_file))
         if args.shuffle:
             random.shuffle(topics)
-    if not topics:
-        # env TOPICS_FILE fallback
-        env_topics = os.environ.get("TOPICS_FILE")
-        if env_topics and Path(env_topics).exists():
-            topics = list(iter_topics_from_file(Path(env_topics)))
-            if args.shuffle:
-                random.shuffle(topics)
     if not topics and args.topic:
         topics = [TopicIdea(slug=sanitize_slug(args.topic), prompt=args.topic)]
-    if not topics and trend_data:
-        trending_ideas = [
-            TopicIdea(
-                slug=sanitize_slug(item["title"]),
-                prompt=f"{item['title']} calculator inspired by breaking news",
-                category=item.get("category"),
-            )
-            for item in trend_data
-        ]
-        topics = diversify_topics(
-            trending_ideas,
-            plan_count=plan_target,
-            trends=trend_data or None,
-            min_categories=5,
-            max_per_category=2,
-        )
 
+    retry_slugs = {slug for _, slug in retry_jobs}
+    topics = [topic for topic in topics if sanitize_slug(args.slug or topic.slug) not in retry_slugs]
+    jobs = retry_jobs + select_jobs(
+        topics,
+        args.max_per_day - len(retry_jobs),
+        slug_override=args.slug,
+        force=args.force,
+        near_duplicates=near_duplicates,
+    )
+    topics = retry_topics + topics
+
+    def generate(topic: TopicIdea, slug: str) -> ToolConfig | None:
+        return generate_tool(topic, slug, use_mock, stream=args.stream)
+
+    def generate_batch(batch: List[Tuple[TopicIdea, str]]) -> List[ToolConfig | None]:
+        return generate_tool_batch(batch, use_mock, stream=args.stream)
+
+    writer = ToolWriteBatch(TOOLS_DIR, compact=args.compact_json)
     generated = 0
-    for topic in topics:
-        if generated >= args.max_per_day:
-            print(f"Reached daily cap ({args.max_per_day}), stopping.")
-            break
-        slug = sanitize_slug(args.slug or topic.slug)
-        tool: ToolConfig | None = None
+    saved: List[str] = []
+
+    def commit_writes() -> None:
+        """Publish staged tools, then record them in the log, manifest and indexes."""
+        nonlocal generated
+        with SPANS.span("commit_writes", files=len(writer)):
+            committed = writer.commit()
+        for slug, path, data, raw in committed:
+            TOOL_MANIFEST.update(slug, data, raw, path)
+            NEAR_DUP_INDEX.add(slug, data, TOOL_MANIFEST.entries[slug]["hash"])
+            DEAD_LETTER.discard(slug)
+            if args.log:
+                append_log(slug, data["title"], path)
+            generated += 1
+            saved.append(slug)
+            print(f"Saved {data['title']} to {path}")
+        GENERATION_LOG.flush()
+
+    try:
+        for topic, slug, tool in run_generation(
+            jobs, generate, workers=args.workers, batch_size=args.batch_size, generate_batch=generate_batch
+        ):
+            if tool is None:
+                continue
+            with SPANS.span("write_tool", slug=slug) as span:
+                span["bytes"] = len(writer.stage(slug, tool.to_dict()))
+            if len(writer) >= args.commit_every:
+                commit_writes()
+    finally:
+        # Whatever was fully staged is still worth keeping if the run is interrupted.
+        commit_writes()
+        TOOL_MANIFEST.save()
+        NEAR_DUP_INDEX.save()
+        DEAD_LETTER.save()
         if not use_mock:
-            try:
-                tool = generate_with_gemini(topic.prompt, api_key)  # type: ignore[arg-type]
-            except Exception as e:
-                print(f"❌ Error on {topic.prompt}: {e}")
-                tool = None
-        if not tool:
-            tool = generate_offline_tool(slug)
-        # ensure slug matches filename
-        tool.slug = slug
-        path = TOOLS_DIR / f"{slug}.json"
-        if path.exists() and not args.force:
-            print(f"Skip existing {slug}")
-            continue
-        ensure_dirs()
-        with path.open("w", encoding="utf-8") as fh:
-            json.dump(tool.to_dict(), fh, indent=2, ensure_ascii=False)
-            fh.write("\n")
-        if args.log:
-            append_log(tool.slug, tool.title, path)
-        generated += 1
-        print(f"Saved {tool.title} to {path}")
+            TOPIC_QUEUE.save()
+
+    # Only the tools saved now are scored; full rebuilds are `maintain_tools.py related`.
+    if saved and not args.no_related and not use_mock:
+        related_start = time.perf_counter()
+        with SPANS.span("related_update"):
+            lists = RELATED_INDEX.add(saved)
+            _, committed = write_related(TOOLS_DIR, lists)
+        for slug, path, data, raw in committed:
+            TOOL_MANIFEST.update(slug, data, raw, path)
+        TOOL_MANIFEST.save()
+        print(
+            f"Related tools: {len(saved)} new tool(s) scored against {len(TOOL_MANIFEST.entries)} in "
+            f"{time.perf_counter() - related_start:.2f}s; {len(lists)} neighbour lists changed, {len(committed)} files rewritten."
+        )
 
     print(f"Complete. Generated: {generated}/{len(topics)} (cap {args.max_per_day}).")
+    if not use_mock:
+        print(RESPONSE_CACHE.summary())
+        if MODEL_BUDGET.waited:
+            print(f"Rate budget: waited {MODEL_BUDGET.waited:.1f}s for request/token headroom.")
+        if len(DEAD_LETTER):
+            print(f"Dead-letter queue: {len(DEAD_LETTER)} topic(s) pending retry.")
+        if STREAM_STATS:
+            print(stream_summary())
+        if FORMULA_VERIFIER.rejected:
+            print(f"Formula verification: rejected {FORMULA_VERIFIER.rejected} generated config(s).")
+    MODEL_BACKEND.close()
+    if profiler is not None:
+        profiler.disable()
+        write_profile(profiler, args.profile)
+    timings = SPANS.summary()
+    if timings:
+        print(timings)
+    SPANS.close()
+    if args.spans:
+        print(f"Spans appended to {args.spans}")
     return 0
 
 
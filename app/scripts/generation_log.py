@@ -0,0 +1,178 @@
+"""
+Indexed store for the tool generation log.
+
+data/tool_generation_log.csv stays the committed, human-readable record. A SQLite index
+under data/.cache/ mirrors it with normalized timestamps so recent-slug windows are a
+range query; only rows appended to the CSV since the last sync are parsed. Appends are
+buffered and written to both the CSV and the index once per run via flush().
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+CSV_HEADER = "timestamp_utc,slug,title,path\n"
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+Row = Tuple[str, str, str, str]
+
+
+def normalize_timestamp(raw: str) -> Optional[str]:
+    ts_clean = raw.strip().rstrip("Z")
+    for fmt in (TIMESTAMP_FORMAT, "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(ts_clean, fmt).strftime(TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(ts_clean).strftime(TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def parse_csv_line(line: str) -> Optional[Row]:
+    parts = line.rstrip("\n").split(",", 2)
+    if len(parts) < 2:
+        return None
+    ts = normalize_timestamp(parts[0])
+    if not ts:
+        return None
+    title, path = "", ""
+    if len(parts) == 3:
+        # titles are written unquoted and may contain commas; the path is the last field
+        title, _, path = parts[2].rpartition(",")
+        if not _:
+            title, path = parts[2], ""
+    return ts, parts[1], title, path
+
+
+def format_csv_line(row: Row) -> str:
+    ts, slug, title, path = row
+    return f"{ts}Z,{slug},{title},{path}\n"
+
+
+class GenerationLog:
+    def __init__(self, csv_path: Path, db_path: Path) -> None:
+        self.csv_path = csv_path
+        self.db_path = db_path
+        self._pending: List[Row] = []
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # ---- index maintenance ----
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS log (ts TEXT NOT NULL, slug TEXT NOT NULL, title TEXT, path TEXT);
+                CREATE INDEX IF NOT EXISTS log_ts ON log (ts);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """
+            )
+            self._conn = conn
+            self._sync()
+        return self._conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()  # type: ignore[union-attr]
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))  # type: ignore[union-attr]
+
+    def _csv_head(self) -> str:
+        with self.csv_path.open("rb") as fh:
+            return fh.read(256).decode("utf-8", "replace")
+
+    def _sync(self) -> None:
+        """Import CSV rows appended since the last sync; rebuild if the CSV was rewritten."""
+        conn = self._conn
+        assert conn is not None
+        if not self.csv_path.exists():
+            conn.execute("DELETE FROM log")
+            self._set_meta("offset", "0")
+            self._set_meta("head", "")
+            conn.commit()
+            return
+        size = self.csv_path.stat().st_size
+        offset = int(self._meta("offset") or 0)
+        head = self._csv_head()
+        if offset > size or (offset and self._meta("head") != head):
+            conn.execute("DELETE FROM log")
+            offset = 0
+        if offset == size:
+            return
+        with self.csv_path.open("rb") as fh:
+            fh.seek(offset)
+            chunk = fh.read()
+        # only consume complete lines so a half-written row is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        rows = []
+        for raw in chunk[:end].decode("utf-8", "replace").splitlines():
+            if raw.lower().startswith("timestamp_utc"):
+                continue
+            row = parse_csv_line(raw)
+            if row:
+                rows.append(row)
+        conn.executemany("INSERT INTO log (ts, slug, title, path) VALUES (?, ?, ?, ?)", rows)
+        self._set_meta("offset", str(offset + end))
+        self._set_meta("head", head)
+        conn.commit()
+
+    # ---- queries ----
+    def recent_slugs(self, days: int = 14, now: Optional[datetime] = None) -> set[str]:
+        if not self.csv_path.exists() and not self._pending:
+            return set()
+        conn = self._connect()
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=days)).strftime(TIMESTAMP_FORMAT)
+        recent = {slug for (slug,) in conn.execute("SELECT DISTINCT slug FROM log WHERE ts >= ?", (cutoff,))}
+        recent.update(slug for ts, slug, _, _ in self._pending if ts >= cutoff)
+        return recent
+
+    def rows_since(self, since: datetime) -> List[Row]:
+        conn = self._connect()
+        cutoff = since.strftime(TIMESTAMP_FORMAT)
+        return list(conn.execute("SELECT ts, slug, title, path FROM log WHERE ts >= ? ORDER BY ts, rowid", (cutoff,)))
+
+    # ---- writes ----
+    def append(self, slug: str, title: str, path: Path | str, when: Optional[datetime] = None) -> None:
+        ts = (when or datetime.utcnow()).strftime(TIMESTAMP_FORMAT)
+        self._pending.append((ts, slug, title, str(path)))
+
+    def flush(self) -> int:
+        """Write buffered rows to the CSV in one append and to the index in one transaction."""
+        if not self._pending:
+            return 0
+        conn = self._connect()
+        rows, self._pending = self._pending, []
+        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+        header_needed = not self.csv_path.exists()
+        with self.csv_path.open("a", encoding="utf-8") as fh:
+            if header_needed:
+                fh.write(CSV_HEADER)
+            fh.writelines(format_csv_line(row) for row in rows)
+        with conn:
+            conn.executemany("INSERT INTO log (ts, slug, title, path) VALUES (?, ?, ?, ?)", rows)
+            self._set_meta("offset", str(self.csv_path.stat().st_size))
+            self._set_meta("head", self._csv_head())
+        return len(rows)
+
+    def export_csv(self, path: Path) -> int:
+        """Write the full log (index order) as CSV for consumers that want a clean copy."""
+        conn = self._connect()
+        rows: Iterable[Row] = conn.execute("SELECT ts, slug, title, path FROM log ORDER BY ts, rowid")
+        count = 0
+        with path.open("w", encoding="utf-8") as fh:
+            fh.write(CSV_HEADER)
+            for row in rows:
+                fh.write(format_csv_line(row))
+                count += 1
+        return count
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
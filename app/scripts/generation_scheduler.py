@@ -0,0 +1,170 @@
+"""
+Scheduling helpers around model calls: rate budgets, retries and a dead-letter queue.
+
+- RateBudget keeps requests and (estimated) tokens within per-minute limits over a
+  sliding 60 s window, blocking callers until a slot frees up.
+- RetryPolicy retries a call with exponential backoff and full jitter.
+- DeadLetterQueue persists topics that still failed after retries so the next run
+  can retry them before planning new ones, instead of shipping placeholder tools.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Rough output size of one generated tool (1500+ word article, FAQs, formula).
+EXPECTED_OUTPUT_TOKENS = 6000
+
+
+def estimate_tokens(prompt: str, expected_output: int = EXPECTED_OUTPUT_TOKENS) -> int:
+    """~4 characters per token for the prompt plus the expected response size."""
+    return len(prompt) // 4 + expected_output
+
+
+class RateBudget:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window: float = 60.0) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self.waited = 0.0
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._events and now - self._events[0][0] >= self.window:
+            self._events.popleft()
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request of `tokens` fits in the window; returns seconds waited."""
+        waited = 0.0
+        # A single request larger than the whole token budget is let through once the window is empty.
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute > 0 else tokens
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+                used_tokens = sum(count for _, count in self._events)
+                over_requests = self.requests_per_minute > 0 and len(self._events) >= self.requests_per_minute
+                over_tokens = self.tokens_per_minute > 0 and used_tokens + tokens > self.tokens_per_minute
+                if not over_requests and not over_tokens:
+                    self._events.append((now, tokens))
+                    self.waited += waited
+                    return waited
+                delay = self.window - (now - self._events[0][0]) + 0.01
+            time.sleep(delay)
+            waited += delay
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base_delay: float = 2.0, max_delay: float = 60.0) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def call(self, func: Callable[[], Optional[T]], label: str = "") -> Tuple[Optional[T], str]:
+        """Run func until it returns non-None; returns (result, last error message)."""
+        error = ""
+        for attempt in range(1, self.attempts + 1):
+            try:
+                result = func()
+                if result is not None:
+                    return result, ""
+                error = "no usable response"
+            except Exception as exc:
+                error = str(exc) or exc.__class__.__name__
+            if attempt < self.attempts:
+                delay = self.delay(attempt)
+                print(f"↻ Retrying {label[:60]} in {delay:.1f}s (attempt {attempt + 1}/{self.attempts}): {error}")
+                time.sleep(delay)
+        return None, error
+
+
+class DeadLetterQueue:
+    """JSON-lines file of topics whose generation failed, retried on later runs."""
+
+    def __init__(self, path: Path, max_attempts: int = 5) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict[str, Any]]:
+        if not self._loaded:
+            self._loaded = True
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as fh:
+                    for line in fh:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get("slug"):
+                            self._entries[entry["slug"]] = entry
+        return list(self._entries.values())
+
+    def add(self, slug: str, prompt: str, error: str, category: str | None = None, source: str | None = None) -> bool:
+        """Record a failure; returns False when the topic has exhausted max_attempts and was dropped."""
+        self.load()
+        now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        with self._lock:
+            entry = self._entries.get(slug) or {
+                "slug": slug,
+                "prompt": prompt,
+                "category": category,
+                "source": source,
+                "attempts": 0,
+                "first_failed": now,
+            }
+            entry["attempts"] += 1
+            entry["last_failed"] = now
+            entry["error"] = error[:300]
+            self._dirty = True
+            if entry["attempts"] >= self.max_attempts:
+                self._entries.pop(slug, None)
+                return False
+            self._entries[slug] = entry
+            return True
+
+    def discard(self, slug: str) -> None:
+        self.load()
+        with self._lock:
+            if self._entries.pop(slug, None) is not None:
+                self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        with self._lock:
+            entries = list(self._entries.values())
+            self._dirty = False
+        if not entries:
+            self.path.unlink(missing_ok=True)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
@@ -0,0 +1,180 @@
+"""
+Single-pass JSON extraction from model responses.
+
+Model output often wraps JSON in ```json fences or prose. JSONStreamExtractor scans for
+the first '{' (or '[') and tracks nesting while respecting strings and escapes, so it
+finds the matching close bracket without regex backtracking. It accepts the response in
+chunks, which lets a streamed response be checked as it arrives: for a top-level object,
+on_key/on_member callbacks fire as each field name and each complete field value is seen,
+so callers can validate (and abort) before the rest of the response arrives. Failures
+raise JSONExtractError carrying the offset where parsing went wrong.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+# Outside strings only brackets, quotes and separators matter; inside, only quotes and backslashes.
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_OPENERS = {"{": "}", "[": "]"}
+
+
+class JSONExtractError(ValueError):
+    def __init__(self, reason: str, position: int, text: str = "") -> None:
+        self.reason = reason
+        self.position = position
+        snippet = text[max(0, position - 30) : position + 30].replace("\n", "\\n") if text else ""
+        super().__init__(f"{reason} at offset {position}" + (f" near '{snippet}'" if snippet else ""))
+
+
+class JSONStreamExtractor:
+    """
+    Incrementally locate the outermost balanced JSON value in a text stream.
+
+    kind is "object", "array" or "any" (whichever bracket appears first). When the value
+    is an object, on_key(name) fires when a top-level field name has been read and
+    on_member(name, raw_value) when its value is complete; exceptions raised by either
+    propagate out of feed().
+    """
+
+    def __init__(
+        self,
+        kind: str = "any",
+        on_key: Optional[Callable[[str], None]] = None,
+        on_member: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        if kind not in ("object", "array", "any"):
+            raise ValueError(f"unknown kind {kind!r}")
+        self.kind = kind
+        self.on_key = on_key
+        self.on_member = on_member
+        self.buffer = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # top-level object member tracking: "key" -> "colon" -> "value" -> "key" ...
+        self._member_state = "key"
+        self._key_start = 0
+        self._value_start = 0
+        self._string_is_key = False
+        self._current_key = ""
+
+    @property
+    def depth(self) -> int:
+        return len(self._stack)
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def _openers(self) -> str:
+        return {"object": "{", "array": "[", "any": "{["}[self.kind]
+
+    def feed(self, chunk: str) -> bool:
+        """Consume more text; returns True once the outermost value is closed."""
+        if self.end is not None:
+            return True
+        self.buffer += chunk
+        text = self.buffer
+        pos = self._pos
+        length = len(text)
+        if self.start is None:
+            openers = self._openers()
+            found = [index for index in (text.find(char, pos) for char in openers) if index != -1]
+            if not found:
+                self._pos = length
+                return False
+            pos = min(found)
+            self.start = pos
+            self._stack.append(_OPENERS[text[pos]])
+            pos += 1
+        while pos < length:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(text, pos)
+                if not match:
+                    pos = length
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._string_is_key = False
+                        try:
+                            self._current_key = json.loads(text[self._key_start : pos])
+                        except json.JSONDecodeError as exc:
+                            raise JSONExtractError(f"bad field name ({exc.msg})", self._key_start, text) from None
+                        self._member_state = "colon"
+                        if self.on_key:
+                            self._pos = pos
+                            self.on_key(self._current_key)
+                continue
+            match = _STRUCTURAL.search(text, pos)
+            if not match:
+                pos = length
+                break
+            char = match.group()
+            pos = match.end()
+            top_level = len(self._stack) == 1 and self._stack[0] == "}"
+            if char == '"':
+                self._in_string = True
+                if top_level and self._member_state == "key":
+                    self._string_is_key = True
+                    self._key_start = pos - 1
+            elif char == ":":
+                if top_level and self._member_state == "colon":
+                    self._member_state = "value"
+                    self._value_start = pos
+            elif char == ",":
+                if top_level and self._member_state == "value":
+                    self._member_state = "key"
+                    self._emit_member(text[self._value_start : pos - 1], pos)
+            elif char in _OPENERS:
+                self._stack.append(_OPENERS[char])
+            else:
+                expected = self._stack.pop()
+                if char != expected:
+                    self._pos = pos
+                    raise JSONExtractError(f"expected '{expected}' but found '{char}'", pos - 1, text)
+                if not self._stack:
+                    self.end = pos
+                    if top_level and self._member_state == "value":
+                        self._member_state = "key"
+                        self._emit_member(text[self._value_start : pos - 1], pos)
+                    break
+        self._pos = pos
+        return self.end is not None
+
+    def _emit_member(self, raw_value: str, pos: int) -> None:
+        if self.on_member:
+            self._pos = pos
+            self.on_member(self._current_key, raw_value.strip())
+
+    def result(self) -> Any:
+        if self.start is None:
+            raise JSONExtractError(f"no JSON {self.kind} found", len(self.buffer), self.buffer)
+        if self.end is None:
+            where = "inside a string" if self._in_string else f"with {self.depth} unclosed bracket(s)"
+            raise JSONExtractError(f"truncated JSON ({where})", len(self.buffer), self.buffer)
+        try:
+            return json.loads(self.buffer[self.start : self.end])
+        except json.JSONDecodeError as exc:
+            raise JSONExtractError(exc.msg, self.start + exc.pos, self.buffer) from None
+
+
+def extract_json(text: str, kind: str = "any") -> Any:
+    """Parse the outermost balanced JSON value of the given kind from text."""
+    extractor = JSONStreamExtractor(kind)
+    extractor.feed(text or "")
+    return extractor.result()
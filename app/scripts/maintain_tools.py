@@ -0,0 +1,381 @@
+"""
+Maintenance commands for the tool corpus in data/tools.
+
+  audit   Measure article length, FAQ/input/output counts and validate_and_fix fallback
+          usage per tool and write thin_tools_report.json. Results are cached in
+          data/.cache/audit_state.json so only files whose size/mtime (then hash) changed
+          are re-read; a cold pass fans out over a process pool.
+  revalidate
+          Stream every tool through generate_tools.validate_and_fix over a process pool
+          and atomically rewrite only files whose canonical form changed (keys the
+          generator does not know, e.g. calculationSteps or chart, are kept). Files
+          already canonical under the current rules are skipped by size/mtime via
+          data/.cache/revalidate_state.json.
+  related Rebuild each tool's `related` list from TF-IDF nearest neighbours over title,
+          tags, summary and article (see related_tools.py). Incremental by default: only
+          new or edited tools are scored against the corpus.
+  verify  Run every tool's formula over sampled input vectors in node (see
+          formula_verifier.py) and list tools that throw, return NaN/Infinity or
+          constant outputs. Exits non-zero when any tool is rejected.
+
+Usage:
+  python scripts/maintain_tools.py audit [--min-length 1000] [--workers N] [--full]
+  python scripts/maintain_tools.py revalidate [--workers N] [--dry-run] [--full]
+  python scripts/maintain_tools.py related [--k 5] [--full] [--dry-run]
+  python scripts/maintain_tools.py verify [--samples 200] [--workers N] [--report PATH] [slug ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from formula_verifier import DEFAULT_SAMPLES, FormulaVerifier
+from related_tools import DEFAULT_K, RelatedIndex, related_summary, write_related
+from tool_manifest import article_length, content_hash
+from tool_writer import ToolWriteBatch
+
+ROOT = Path(__file__).resolve().parents[1]
+TOOLS_DIR = ROOT / "data" / "tools"
+CACHE_DIR = ROOT / "data" / ".cache"
+AUDIT_STATE_FILE = CACHE_DIR / "audit_state.json"
+REVALIDATE_STATE_FILE = CACHE_DIR / "revalidate_state.json"
+RELATED_INDEX_FILE = CACHE_DIR / "related_index.json"
+THIN_REPORT_FILE = ROOT.parent / "thin_tools_report.json"
+AUDIT_VERSION = 1
+# Below this many changed files the pool start-up costs more than it saves.
+POOL_THRESHOLD = 64
+
+
+# ---------- Helpers ----------
+def load_state(path: Path, version: int) -> Dict[str, Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            raw = json.load(fh)
+        if raw.get("version") == version:
+            return raw.get("tools", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_state(path: Path, version: int, tools: Dict[str, Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump({"version": version, "tools": tools}, fh, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def changed_files(
+    tools_dir: Path, state: Dict[str, Dict[str, Any]]
+) -> Tuple[List[Path], List[str], Dict[str, os.stat_result]]:
+    """Return (files whose size/mtime differ from state, slugs no longer on disk, stats)."""
+    stats: Dict[str, os.stat_result] = {}
+    changed: List[Path] = []
+    for dirent in os.scandir(tools_dir):
+        if not dirent.name.endswith(".json"):
+            continue
+        slug = dirent.name[: -len(".json")]
+        stat = dirent.stat()
+        stats[slug] = stat
+        entry = state.get(slug)
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+            changed.append(Path(dirent.path))
+    removed = [slug for slug in state if slug not in stats]
+    return sorted(changed), removed, stats
+
+
+def map_files(func, paths: List[Path], workers: Optional[int]) -> Iterator[Any]:
+    """Yield func(path) for every path in order, over a process pool for large inputs."""
+    if len(paths) < POOL_THRESHOLD or workers == 1:
+        yield from map(func, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(func, paths, chunksize=16)
+
+
+# ---------- Audit ----------
+def fallback_markers(data: Dict[str, Any]) -> List[str]:
+    """Name the fields that still carry validate_and_fix / offline placeholder content."""
+    title = data.get("title") or ""
+    markers: List[str] = []
+    inputs = data.get("inputs") or []
+    if len(inputs) == 1 and isinstance(inputs[0], dict) and inputs[0].get("id") == "val":
+        markers.append("inputs")
+    outputs = data.get("outputs") or []
+    if len(outputs) == 1 and isinstance(outputs[0], dict) and outputs[0].get("id") == "result" and outputs[0].get("label") == "Result":
+        markers.append("outputs")
+    formula = (data.get("formula") or "").strip()
+    if formula in ("return { result: 0 };", "const result = val * 1; return { result };"):
+        markers.append("formula")
+    summary = data.get("summary") or ""
+    if summary.endswith("helps you compute results accurately with domain-specific guardrails and explanations.") or summary == f"{title} helps you compute results quickly.":
+        markers.append("summary")
+    seo = data.get("seo") or {}
+    if seo.get("title") in (f"{title} - Free Online Calculator", f"{title} Free Tool"):
+        markers.append("seo")
+    faq = data.get("faq") or []
+    if any(isinstance(item, dict) and item.get("q") in (f"How to use {title}?", "How to use?") for item in faq):
+        markers.append("faq")
+    headings = {section.get("heading") for section in data.get("article") or [] if isinstance(section, dict)}
+    if {"How It Works: The Logic", "Best Practices & Common Mistakes"} <= headings or "How the calculation works" in headings:
+        markers.append("article")
+    return markers
+
+
+def audit_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    article = data.get("article") if isinstance(data.get("article"), list) else []
+    return {
+        "length": article_length(data),
+        "sections": len(article),
+        "faq": len(data.get("faq") or []),
+        "inputs": len(data.get("inputs") or []),
+        "outputs": len(data.get("outputs") or []),
+        "fallbacks": fallback_markers(data),
+    }
+
+
+def audit_file(path: Path) -> Tuple[str, Optional[str], Optional[Dict[str, Any]]]:
+    try:
+        raw = path.read_bytes()
+        data = json.loads(raw)
+    except (OSError, ValueError) as exc:
+        print(f"Warning: unable to read {path.name} ({exc})")
+        return path.stem, None, None
+    return path.stem, content_hash(raw), audit_metrics(data)
+
+
+def run_audit(min_length: int, workers: Optional[int], full: bool) -> int:
+    start = time.perf_counter()
+    state = {} if full else load_state(AUDIT_STATE_FILE, AUDIT_VERSION)
+    changed, removed, stats = changed_files(TOOLS_DIR, state)
+    for slug in removed:
+        del state[slug]
+
+    reprocessed = 0
+    for slug, digest, metrics in map_files(audit_file, changed, workers):
+        if digest is None:
+            state.pop(slug, None)
+            continue
+        stat = stats[slug]
+        entry = state.get(slug)
+        if not entry or entry.get("hash") != digest:
+            reprocessed += 1
+            entry = {"hash": digest, "metrics": metrics}
+        entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+        state[slug] = entry
+    save_state(AUDIT_STATE_FILE, AUDIT_VERSION, state)
+
+    thin = [
+        {"slug": slug, **state[slug]["metrics"]}
+        for slug in sorted(state)
+        if state[slug]["metrics"]["length"] < min_length
+    ]
+    with THIN_REPORT_FILE.open("w", encoding="utf-8") as fh:
+        json.dump(thin, fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+
+    with_fallbacks = sum(1 for entry in state.values() if entry["metrics"]["fallbacks"])
+    elapsed = time.perf_counter() - start
+    print(
+        f"Audited {len(state)} tools in {elapsed:.2f}s "
+        f"({len(changed)} stat-changed, {reprocessed} re-measured, {len(removed)} removed)."
+    )
+    print(f"Thin (<{min_length} chars): {len(thin)}. Using fallback content: {with_fallbacks}.")
+    print(f"Report saved to {THIN_REPORT_FILE}")
+    return 0
+
+
+# ---------- Revalidate ----------
+def rules_version() -> str:
+    """Digest of validate_and_fix's source, so a rule change invalidates the skip state."""
+    from generate_tools import validate_and_fix
+
+    return content_hash(inspect.getsource(validate_and_fix).encode("utf-8"))
+
+
+def canonical_tool(slug: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """validate_and_fix output merged over the original, keeping its key order and extra keys."""
+    from generate_tools import validate_and_fix
+
+    canonical = dict(data)
+    canonical.update(validate_and_fix(data, slug).to_dict())
+    return canonical
+
+
+def revalidate_file(path: Path) -> Tuple[str, Optional[Dict[str, Any]], bool, Optional[str]]:
+    """Return (slug, canonical data if it differs from the file, file is compact, error)."""
+    try:
+        raw = path.read_bytes()
+        data = json.loads(raw)
+    except (OSError, ValueError) as exc:
+        return path.stem, None, False, str(exc)
+    if not isinstance(data, dict):
+        return path.stem, None, False, "not a JSON object"
+    canonical = canonical_tool(path.stem, data)
+    compact = not raw.lstrip().startswith(b"{\n")
+    return path.stem, (canonical if canonical != data else None), compact, None
+
+
+def run_revalidate(workers: Optional[int], dry_run: bool, full: bool) -> int:
+    start = time.perf_counter()
+    version = rules_version()
+    state = {} if full else load_state(REVALIDATE_STATE_FILE, version)
+    changed, removed, stats = changed_files(TOOLS_DIR, state)
+    for slug in removed:
+        del state[slug]
+
+    pretty = ToolWriteBatch(TOOLS_DIR)
+    compact = ToolWriteBatch(TOOLS_DIR, compact=True)
+    rewritten: List[str] = []
+    failed = 0
+    try:
+        for slug, canonical, is_compact, error in map_files(revalidate_file, changed, workers):
+            if error:
+                failed += 1
+                state.pop(slug, None)
+                print(f"Warning: unable to revalidate {slug}.json ({error})")
+                continue
+            if canonical is not None:
+                rewritten.append(slug)
+                if dry_run:
+                    continue
+                (compact if is_compact else pretty).stage(slug, canonical)
+            stat = stats[slug]
+            state[slug] = {"size": stat.st_size, "mtime": stat.st_mtime}
+        if not dry_run:
+            for batch in (pretty, compact):
+                for slug, path, _, _ in batch.commit():
+                    stat = path.stat()
+                    state[slug] = {"size": stat.st_size, "mtime": stat.st_mtime}
+    finally:
+        pretty.abort()
+        compact.abort()
+    if dry_run:
+        for slug in rewritten:
+            state.pop(slug, None)
+    save_state(REVALIDATE_STATE_FILE, version, state)
+
+    elapsed = time.perf_counter() - start
+    rate = len(changed) / elapsed if elapsed > 0 else 0.0
+    for slug in rewritten:
+        print(f"{'Would rewrite' if dry_run else 'Rewrote'} {slug}")
+    print(
+        f"Revalidated {len(changed)} of {len(stats)} tools in {elapsed:.2f}s ({rate:.0f} files/s): "
+        f"{len(rewritten)} {'to rewrite' if dry_run else 'rewritten'}, {failed} unreadable, "
+        f"{len(stats) - len(changed)} unchanged since last pass."
+    )
+    return 1 if failed else 0
+
+
+# ---------- Related ----------
+def run_related(k: int, full: bool, dry_run: bool) -> int:
+    start = time.perf_counter()
+    index = RelatedIndex(RELATED_INDEX_FILE, TOOLS_DIR, k=k)
+    changed = index.update(full=full)
+    # every file is compared, so hand-edited `related` lists are corrected too
+    lists = {slug: index.neighbors(slug) for slug in index.entries}
+    differing, committed = write_related(TOOLS_DIR, lists, dry_run=dry_run)
+    if not dry_run:
+        index.save()
+    for slug in differing if dry_run else []:
+        print(f"Would rewrite {slug}: {', '.join(index.neighbors(slug)) or '(none)'}")
+    print(related_summary(len(index.entries), len(changed), len(differing) if dry_run else len(committed), time.perf_counter() - start, dry_run))
+    return 0
+
+
+# ---------- Verify ----------
+def run_verify(slugs: List[str], samples: int, workers: Optional[int], report: Optional[Path]) -> int:
+    start = time.perf_counter()
+    paths = [TOOLS_DIR / f"{slug}.json" for slug in slugs] if slugs else sorted(TOOLS_DIR.glob("*.json"))
+    tools: List[Dict[str, Any]] = []
+    for path in paths:
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            print(f"Warning: unable to read {path.name} ({exc})")
+            continue
+        data["slug"] = path.stem
+        tools.append(data)
+
+    verifier = FormulaVerifier(samples=samples)
+    if not verifier.available:
+        print("node is required for formula verification (set NODE_BINARY if it is not on PATH).")
+        return 2
+    verdicts = verifier.verify(tools, workers=workers or os.cpu_count() or 1)
+    rejected = [verdict for verdict in verdicts if not verdict.ok]
+    warned = [verdict for verdict in verdicts if verdict.ok and verdict.warnings]
+    for verdict in rejected:
+        print(f"✗ {verdict.slug}: {verdict.describe()}")
+    if report:
+        with report.open("w", encoding="utf-8") as fh:
+            json.dump(
+                [
+                    {"slug": verdict.slug, "ok": verdict.ok, "reasons": verdict.reasons, "warnings": verdict.warnings}
+                    for verdict in rejected + warned
+                ],
+                fh,
+                indent=2,
+                ensure_ascii=False,
+            )
+            fh.write("\n")
+        print(f"Report saved to {report}")
+
+    elapsed = time.perf_counter() - start
+    evaluations = sum(verdict.samples for verdict in verdicts)
+    print(
+        f"Verified {len(verdicts)} tools ({evaluations} evaluations) in {elapsed:.2f}s: "
+        f"{len(rejected)} rejected, {len(warned)} with warnings."
+    )
+    return 1 if rejected else 0
+
+
+# ---------- CLI ----------
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tool corpus maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    audit = sub.add_parser("audit", help="Incremental thin-content audit -> thin_tools_report.json.")
+    audit.add_argument("--min-length", type=int, default=1000, help="Article characters below which a tool is thin.")
+    audit.add_argument("--workers", type=int, default=None, help="Process pool size for large passes.")
+    audit.add_argument("--full", action="store_true", help="Ignore cached results and re-read every file.")
+
+    revalidate = sub.add_parser("revalidate", help="Re-apply validate_and_fix to every tool and rewrite drifted files.")
+    revalidate.add_argument("--workers", type=int, default=None, help="Process pool size for large passes.")
+    revalidate.add_argument("--dry-run", action="store_true", help="List files that would change without writing.")
+    revalidate.add_argument("--full", action="store_true", help="Re-check every file, not just ones changed since the last pass.")
+
+    related = sub.add_parser("related", help="Rewrite `related` from TF-IDF nearest neighbours.")
+    related.add_argument("--k", type=int, default=DEFAULT_K, help="Neighbours kept per tool.")
+    related.add_argument("--full", action="store_true", help="Recompute every tool instead of only new/edited ones.")
+    related.add_argument("--dry-run", action="store_true", help="List files that would change without writing.")
+
+    verify = sub.add_parser("verify", help="Evaluate formulas over sampled inputs and reject broken tools.")
+    verify.add_argument("slugs", nargs="*", help="Only verify these tools (default: all).")
+    verify.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Input vectors evaluated per tool.")
+    verify.add_argument("--workers", type=int, default=None, help="Concurrent node processes.")
+    verify.add_argument("--report", type=Path, help="Write rejected/warned tools as JSON to this path.")
+
+    args = parser.parse_args(argv)
+    if args.command == "audit":
+        return run_audit(args.min_length, args.workers, args.full)
+    if args.command == "revalidate":
+        return run_revalidate(args.workers, args.dry_run, args.full)
+    if args.command == "related":
+        return run_related(args.k, args.full, args.dry_run)
+    if args.command == "verify":
+        return run_verify(args.slugs, args.samples, args.workers, args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
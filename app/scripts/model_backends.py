@@ -0,0 +1,263 @@
+"""
+Model backends for the generator.
+
+Every backend turns a prompt into response text (generate) or text chunks (stream):
+
+- gemini  google.generativeai (GEMINI_API_KEY, GEMINI_MODEL); the SDK is imported on first use.
+- openai  any OpenAI-compatible /chat/completions endpoint (OPENAI_BASE_URL, OPENAI_API_KEY,
+          OPENAI_MODEL), streaming over server-sent events; one pooled requests.Session.
+- stub    the deterministic local server from stub_model_server.py, started in-process on
+          first use, with STUB_LATENCY / STUB_JITTER / STUB_FAILURE_RATE / STUB_MALFORMED_RATE /
+          STUB_SEED, for load tests without a key or network.
+
+Errors propagate as exceptions so the caller's retry policy sees them.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+BACKENDS = ("gemini", "openai", "stub")
+DEFAULT_BACKEND = os.environ.get("MODEL_BACKEND", "gemini")
+
+
+def _has_module(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+HAS_GENAI = _has_module("google.generativeai")
+HAS_REQUESTS = _has_module("requests")
+_genai: Any = None
+
+
+def load_genai() -> Any:
+    global _genai
+    if _genai is None:
+        # ---- compat for Python < 3.10 (packages_distributions) ----
+        try:
+            from importlib.metadata import packages_distributions as _pd  # type: ignore  # noqa: F401
+        except Exception:
+            try:
+                import importlib_metadata  # type: ignore
+                import importlib.metadata as _ilm  # type: ignore
+
+                if not hasattr(_ilm, "packages_distributions"):
+                    _ilm.packages_distributions = importlib_metadata.packages_distributions  # type: ignore
+            except Exception:
+                pass
+        import google.generativeai as genai  # type: ignore
+
+        _genai = genai
+    return _genai
+
+
+class ModelBackend:
+    kind = "base"
+
+    def __init__(self, model: str) -> None:
+        self.model = model
+
+    @property
+    def cache_name(self) -> str:
+        """Model identity used to key the response cache."""
+        return f"{self.kind}:{self.model}"
+
+    def available(self) -> bool:
+        return False
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        yield self.generate(prompt, timeout)
+
+    def close(self) -> None:
+        pass
+
+    def describe(self) -> str:
+        return f"{self.kind} ({self.model})"
+
+
+class GeminiBackend(ModelBackend):
+    kind = "gemini"
+
+    def __init__(self, model: str, api_key: Optional[str]) -> None:
+        super().__init__(model)
+        self.api_key = api_key
+        self._configured = False
+        self._lock = threading.Lock()
+
+    @property
+    def cache_name(self) -> str:
+        return self.model  # matches entries cached before backends existed
+
+    def available(self) -> bool:
+        return bool(self.api_key) and HAS_GENAI
+
+    def _model(self) -> Any:
+        genai = load_genai()
+        with self._lock:
+            if not self._configured:
+                genai.configure(api_key=self.api_key)
+                self._configured = True
+        return genai.GenerativeModel(self.model)
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        response = self._model().generate_content(prompt, request_options={"timeout": timeout})
+        return response.text or ""
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        response = self._model().generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # chunks without text parts (e.g. safety metadata only)
+                continue
+            if text:
+                yield text
+
+
+class OpenAICompatibleBackend(ModelBackend):
+    kind = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None, pool_size: int = 16) -> None:
+        super().__init__(model)
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self._session: Any = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return bool(self.base_url) and HAS_REQUESTS
+
+    def session(self) -> Any:
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if self.api_key:
+                    session.headers["Authorization"] = f"Bearer {self.api_key}"
+                self._session = session
+            return self._session
+
+    def _payload(self, prompt: str, stream: bool) -> Dict[str, Any]:
+        return {"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        response = self.session().post(
+            f"{self.base_url}/chat/completions", json=self._payload(prompt, False), timeout=timeout
+        )
+        response.raise_for_status()
+        choices = response.json().get("choices") or []
+        if not choices:
+            return ""
+        return (choices[0].get("message") or {}).get("content") or ""
+
+    def stream(self, prompt: str, timeout: float) -> Iterator[str]:
+        with self.session().post(
+            f"{self.base_url}/chat/completions", json=self._payload(prompt, True), timeout=timeout, stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                text = (choices[0].get("delta") or {}).get("content") if choices else None
+                if text:
+                    yield text
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class StubBackend(OpenAICompatibleBackend):
+    """OpenAI-compatible client for an in-process stub server started on first use."""
+
+    kind = "stub"
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.2,
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        super().__init__("", model="stub")
+        self.options = {
+            "latency": latency,
+            "jitter": jitter,
+            "failure_rate": failure_rate,
+            "malformed_rate": malformed_rate,
+            "seed": seed,
+        }
+        self.server: Any = None
+        self._server_lock = threading.Lock()
+
+    def available(self) -> bool:
+        return HAS_REQUESTS
+
+    def session(self) -> Any:
+        with self._server_lock:
+            if self.server is None:
+                from stub_model_server import start_stub_server
+
+                self.server = start_stub_server(**self.options)
+                self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        return super().session()
+
+    def close(self) -> None:
+        super().close()
+        with self._server_lock:
+            if self.server is not None:
+                self.server.shutdown()
+                self.server.server_close()
+                self.server = None
+
+    def describe(self) -> str:
+        opts = self.options
+        return (
+            f"stub (latency {opts['latency']}s ±{opts['jitter']:.0%}, failure rate {opts['failure_rate']:.0%}, "
+            f"malformed rate {opts['malformed_rate']:.0%}, seed {opts['seed']})"
+        )
+
+
+def make_backend(name: str = DEFAULT_BACKEND, pool_size: int = 16) -> ModelBackend:
+    if name == "gemini":
+        return GeminiBackend(os.environ.get("GEMINI_MODEL", "gemini-2.5-flash"), os.environ.get("GEMINI_API_KEY"))
+    if name == "openai":
+        return OpenAICompatibleBackend(
+            os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),
+            os.environ.get("OPENAI_API_KEY"),
+            pool_size=pool_size,
+        )
+    if name == "stub":
+        return StubBackend(
+            latency=float(os.environ.get("STUB_LATENCY", "0.5")),
+            jitter=float(os.environ.get("STUB_JITTER", "0.2")),
+            failure_rate=float(os.environ.get("STUB_FAILURE_RATE", "0")),
+            malformed_rate=float(os.environ.get("STUB_MALFORMED_RATE", "0")),
+            seed=int(os.environ.get("STUB_SEED", "0")),
+        )
+    raise ValueError(f"unknown model backend {name!r} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,191 @@
+"""
+MinHash/LSH index over existing tools for near-duplicate topic rejection.
+
+Each tool is reduced to the token set of its title (generic words like "calculator"
+dropped; summary and tags are used only when the title has no usable tokens, since their
+extra vocabulary drowns the Jaccard signal between short titles) and summarized by a
+NUM_PERM-value MinHash signature. Signatures are banded into LSH buckets, so a candidate
+topic is compared only against tools sharing a band instead of the whole corpus.
+Signatures persist in data/.cache/minhash_index.json and are recomputed only for tools
+whose manifest hash changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NUM_PERM = 60
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+INDEX_VERSION = 1
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1337)
+_PERMS: List[Tuple[int, int]] = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+STOPWORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "by", "your", "you", "how", "from",
+    "is", "it", "this", "that", "vs", "per", "at", "as", "or", "based", "using", "new", "free", "online",
+    "calculator", "estimator", "tool", "tools", "calc", "helps", "compute", "calculate", "calculation",
+    "category", "inspired", "results", "quickly", "accurately",
+}
+Signature = List[int]
+
+
+def tokenize(text: str) -> set[str]:
+    return {token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS and len(token) > 1}
+
+
+def tool_tokens(data: Dict[str, Any]) -> set[str]:
+    tokens = tokenize(data.get("title") or "")
+    if tokens:
+        return tokens
+    tags = data.get("tags") if isinstance(data.get("tags"), list) else []
+    return tokenize(" ".join([data.get("summary") or "", " ".join(str(tag) for tag in tags)]))
+
+
+def topic_tokens(prompt: str) -> set[str]:
+    """Tokens for a planned topic; plan prompts are 'title | Category: ... | summary'."""
+    title, _, rest = prompt.partition(" | ")
+    return tokenize(title) or tokenize(rest)
+
+
+def signature(tokens: Iterable[str]) -> Optional[Signature]:
+    hashed = [
+        int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big") & _MAX_HASH
+        for token in tokens
+    ]
+    if not hashed:
+        return None
+    return [min((a * value + b) % _PRIME for value in hashed) & _MAX_HASH for a, b in _PERMS]
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+def _band_keys(sig: Signature) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(band, tuple(sig[band * ROWS : (band + 1) * ROWS])) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    def __init__(self, path: Path, tools_dir: Path, threshold: float = 0.6) -> None:
+        self.path = path
+        self.tools_dir = tools_dir
+        self.threshold = threshold
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], set[str]] = {}
+        self._pending: Dict[str, Signature] = {}
+        self._loaded = False
+        self._dirty = False
+
+    # ---- persistence ----
+    def load(self) -> "NearDuplicateIndex":
+        if self._loaded:
+            return self
+        self._loaded = True
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+            if raw.get("version") == INDEX_VERSION and raw.get("num_perm") == NUM_PERM:
+                self.entries = raw.get("tools", {})
+        except (OSError, ValueError):
+            self.entries = {}
+        for slug, entry in self.entries.items():
+            self._insert(slug, entry["sig"])
+        return self
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump({"version": INDEX_VERSION, "num_perm": NUM_PERM, "tools": self.entries}, fh, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    # ---- maintenance ----
+    def _insert(self, slug: str, sig: Signature) -> None:
+        for key in _band_keys(sig):
+            self._buckets.setdefault(key, set()).add(slug)
+
+    def _remove(self, slug: str) -> None:
+        sig = self._pending.pop(slug, None)
+        entry = self.entries.pop(slug, None)
+        for old in (sig, entry["sig"] if entry else None):
+            if old:
+                for key in _band_keys(old):
+                    self._buckets.get(key, set()).discard(slug)
+
+    def add(self, slug: str, data: Dict[str, Any], digest: str = "") -> None:
+        self.load()
+        self._remove(slug)
+        sig = signature(tool_tokens(data))
+        if sig is None:
+            return
+        self.entries[slug] = {"hash": digest, "sig": sig}
+        self._insert(slug, sig)
+        self._dirty = True
+
+    def sync(self, manifest_entries: Iterable[Dict[str, Any]]) -> int:
+        """Re-sign tools whose manifest hash changed and drop tools that disappeared."""
+        self.load()
+        updated = 0
+        seen: set[str] = set()
+        for item in manifest_entries:
+            slug = item["slug"]
+            seen.add(slug)
+            entry = self.entries.get(slug)
+            if entry and entry.get("hash") == item.get("hash"):
+                continue
+            try:
+                with (self.tools_dir / f"{slug}.json").open("r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            self.add(slug, data, item.get("hash", ""))
+            updated += 1
+        for slug in [slug for slug in self.entries if slug not in seen]:
+            self._remove(slug)
+            self._dirty = True
+        return updated
+
+    def reserve(self, slug: str, prompt: str) -> None:
+        """Hold a slot for a topic accepted in this run so later candidates in the batch dedup against it."""
+        sig = signature(topic_tokens(prompt))
+        if sig is not None:
+            self._pending[slug] = sig
+            self._insert(slug, sig)
+
+    # ---- queries ----
+    def closest(self, prompt: str) -> Optional[Tuple[str, float]]:
+        """
+        Return (slug, estimated Jaccard) of the most similar tool or reserved topic sharing
+        an LSH band with prompt, or None when nothing does (similarity well below ~0.3).
+        """
+        self.load()
+        sig = signature(topic_tokens(prompt))
+        if sig is None:
+            return None
+        candidates: set[str] = set()
+        for key in _band_keys(sig):
+            candidates |= self._buckets.get(key, set())
+        best: Optional[Tuple[str, float]] = None
+        for slug in candidates:
+            other = self._pending.get(slug) or self.entries[slug]["sig"]
+            score = similarity(sig, other)
+            if best is None or score > best[1]:
+                best = (slug, score)
+        return best
+
+    def query(self, prompt: str) -> Optional[Tuple[str, float]]:
+        """Return (slug, estimated Jaccard) of the closest indexed tool or reserved topic at or above threshold."""
+        best = self.closest(prompt)
+        return best if best is not None and best[1] >= self.threshold else None
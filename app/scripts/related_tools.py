@@ -0,0 +1,333 @@
+"""
+Related-tools graph from TF-IDF nearest neighbours.
+
+Each tool becomes a TF-IDF vector over its title (weighted x3), tags (x2), summary and
+article text; `related` is rewritten to the top-k tools by cosine similarity, so every
+slug it lists exists. With numpy/scipy installed the vectors form a sparse CSR matrix and
+similarities for a set of rows are one sparse product; otherwise an inverted index
+accumulates the same dot products in pure Python.
+
+Neighbour lists persist in data/.cache/related_index.json keyed on a hash of the indexed
+text. An update only scores new or edited tools (and tools that pointed at removed or
+edited ones) against the corpus, then offers each new tool to the existing lists whose
+weakest neighbour it beats, instead of recomputing all pairs. IDF weights drift as the
+corpus grows, so a full rebuild happens once it has grown by REBUILD_GROWTH since the last.
+
+The generator does not rely on that cache (it is not restored in CI): add() scores only
+the tools saved in a run and inserts them into the `related` lists already in the tool
+files, so a run touches the new tools and the few lists they displace. Full rebuilds are
+left to `maintain_tools.py related`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import importlib.util
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from near_duplicates import STOPWORDS
+from tool_manifest import content_hash
+from tool_writer import Committed, ToolWriteBatch
+
+# numpy/scipy are optional and imported only when a matrix is built (they dominate start-up).
+HAS_SCIPY = all(importlib.util.find_spec(name) is not None for name in ("numpy", "scipy"))
+
+INDEX_VERSION = 1
+DEFAULT_K = 5
+# Neighbours below this cosine similarity are noise rather than related tools.
+MIN_SCORE = 0.05
+REBUILD_GROWTH = 0.25
+# Only a tool's highest-weighted terms are kept; the long tail of article vocabulary adds
+# little to cosine scores but dominates the cost of the pure-Python path.
+MAX_TERMS = 128
+FIELD_WEIGHTS = (("title", 3), ("tags", 2), ("summary", 1), ("article", 1))
+
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+Neighbors = List[Tuple[str, float]]
+
+
+def field_text(data: Dict[str, Any], name: str) -> str:
+    value = data.get(name)
+    if name == "tags":
+        return " ".join(str(tag) for tag in value) if isinstance(value, list) else ""
+    if name == "article":
+        if not isinstance(value, list):
+            return ""
+        return " ".join(
+            f"{section.get('heading') or ''} {section.get('body') or ''}" for section in value if isinstance(section, dict)
+        )
+    return value if isinstance(value, str) else ""
+
+
+def term_counts(data: Dict[str, Any]) -> Counter:
+    counts: Counter = Counter()
+    for name, weight in FIELD_WEIGHTS:
+        for token in _WORD.findall(field_text(data, name).lower()):
+            if token not in STOPWORDS:
+                counts[token] += weight
+    return counts
+
+
+def document_hash(data: Dict[str, Any]) -> str:
+    text = "\0".join(field_text(data, name) for name, _ in FIELD_WEIGHTS)
+    return content_hash(text.encode("utf-8"))
+
+
+def tfidf_rows(counts: List[Counter]) -> Tuple[List[Dict[int, float]], int]:
+    """L2-normalised TF-IDF rows (sublinear tf, smoothed idf, top MAX_TERMS terms) and the vocabulary size."""
+    df: Counter = Counter()
+    for doc in counts:
+        df.update(doc.keys())
+    total = len(counts)
+    vocab = {term: index for index, term in enumerate(sorted(df))}
+    idf = {term: math.log((1 + total) / (1 + freq)) + 1 for term, freq in df.items()}
+    rows: List[Dict[int, float]] = []
+    for doc in counts:
+        weights = {vocab[term]: (1 + math.log(count)) * idf[term] for term, count in doc.items()}
+        if len(weights) > MAX_TERMS:
+            weights = dict(heapq.nlargest(MAX_TERMS, weights.items(), key=lambda item: item[1]))
+        norm = math.sqrt(sum(value * value for value in weights.values())) or 1.0
+        rows.append({column: value / norm for column, value in weights.items()})
+    return rows, len(vocab)
+
+
+def cosine(left: Dict[int, float], right: Dict[int, float]) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(value * right.get(column, 0.0) for column, value in left.items())
+
+
+class TfidfMatrix:
+    """TF-IDF rows (see tfidf_rows) for a fixed list of slugs, with batched similarity queries."""
+
+    def __init__(self, slugs: List[str], counts: List[Counter]) -> None:
+        self.slugs = slugs
+        self.row = {slug: index for index, slug in enumerate(slugs)}
+        self.rows, vocab_size = tfidf_rows(counts)
+        total = len(counts)
+        if HAS_SCIPY:
+            from scipy import sparse
+
+            indptr = [0]
+            indices: List[int] = []
+            data: List[float] = []
+            for weights in self.rows:
+                indices.extend(weights.keys())
+                data.extend(weights.values())
+                indptr.append(len(indices))
+            self.matrix = sparse.csr_matrix((data, indices, indptr), shape=(total, vocab_size))
+        else:
+            self.postings: Dict[int, List[Tuple[int, float]]] = {}
+            for index, weights in enumerate(self.rows):
+                for column, value in weights.items():
+                    self.postings.setdefault(column, []).append((index, value))
+
+    def similarities(self, rows: List[int]) -> List[List[float]]:
+        """Cosine similarity of each requested row against every row (len(rows) x n)."""
+        if not rows:
+            return []
+        if HAS_SCIPY:
+            import numpy as np
+
+            product = self.matrix[rows] @ self.matrix.T
+            return np.asarray(product.todense()).tolist()
+        result: List[List[float]] = []
+        for row in rows:
+            scores = [0.0] * len(self.slugs)
+            for column, value in self.rows[row].items():
+                for other, weight in self.postings[column]:
+                    scores[other] += value * weight
+            result.append(scores)
+        return result
+
+
+def top_neighbors(slugs: List[str], scores: List[float], own: int, k: int) -> Neighbors:
+    best = heapq.nlargest(k + 1, range(len(scores)), key=scores.__getitem__)
+    return [(slugs[index], round(scores[index], 4)) for index in best if index != own and scores[index] >= MIN_SCORE][:k]
+
+
+class RelatedIndex:
+    def __init__(self, path: Path, tools_dir: Path, k: int = DEFAULT_K) -> None:
+        self.path = path
+        self.tools_dir = tools_dir
+        self.k = k
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.built_docs = 0
+        self._loaded = False
+
+    # ---- persistence ----
+    def load(self) -> "RelatedIndex":
+        if self._loaded:
+            return self
+        self._loaded = True
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+            if raw.get("version") == INDEX_VERSION and raw.get("k") == self.k:
+                self.entries = raw.get("tools", {})
+                self.built_docs = raw.get("built_docs", 0)
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        payload = {"version": INDEX_VERSION, "k": self.k, "built_docs": self.built_docs, "tools": self.entries}
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def neighbors(self, slug: str) -> List[str]:
+        return [other for other, _ in self.load().entries.get(slug, {}).get("neighbors", [])]
+
+    # ---- updates ----
+    def _read_corpus(self) -> Dict[str, Dict[str, Any]]:
+        corpus: Dict[str, Dict[str, Any]] = {}
+        for dirent in sorted(os.scandir(self.tools_dir), key=lambda entry: entry.name):
+            if not dirent.name.endswith(".json"):
+                continue
+            try:
+                with open(dirent.path, "r", encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            if isinstance(data, dict):
+                corpus[dirent.name[: -len(".json")]] = data
+        return corpus
+
+    def update(self, full: bool = False) -> Set[str]:
+        """Bring neighbour lists in line with data/tools; returns slugs whose list changed."""
+        self.load()
+        corpus = self._read_corpus()
+        slugs = list(corpus)
+        hashes = {slug: document_hash(data) for slug, data in corpus.items()}
+        matrix = TfidfMatrix(slugs, [term_counts(corpus[slug]) for slug in slugs])
+
+        removed = {slug for slug in self.entries if slug not in corpus}
+        dirty = {slug for slug in slugs if self.entries.get(slug, {}).get("hash") != hashes[slug]}
+        grown = self.built_docs and len(slugs) > self.built_docs * (1 + REBUILD_GROWTH)
+        if full or not self.entries or grown:
+            targets = set(slugs)
+            self.built_docs = len(slugs)
+        else:
+            stale = removed | dirty
+            targets = set(dirty)
+            for slug, entry in self.entries.items():
+                if slug in corpus and any(other in stale for other, _ in entry.get("neighbors", [])):
+                    targets.add(slug)
+
+        before = {slug: self.neighbors(slug) for slug in self.entries}
+        for slug in removed:
+            self.entries.pop(slug, None)
+        rows = [matrix.row[slug] for slug in slugs if slug in targets]
+        for row, scores in zip(rows, matrix.similarities(rows)):
+            slug = slugs[row]
+            self.entries[slug] = {"hash": hashes[slug], "neighbors": top_neighbors(slugs, scores, row, self.k)}
+            if slug not in dirty or full:
+                continue
+            # offer the new/edited tool to lists it now beats (similarity is symmetric)
+            for other, score in enumerate(scores):
+                other_slug = slugs[other]
+                if other_slug in targets or score < MIN_SCORE:
+                    continue
+                current = self.entries[other_slug]["neighbors"]
+                if len(current) < self.k or score > current[-1][1]:
+                    current = [item for item in current if item[0] != slug] + [(slug, round(score, 4))]
+                    current.sort(key=lambda item: -item[1])
+                    self.entries[other_slug]["neighbors"] = current[: self.k]
+        return {slug for slug in self.entries if self.neighbors(slug) != before.get(slug)}
+
+    def add(self, new_slugs: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Score only new_slugs against the corpus and insert them into the `related` lists
+        already in the tool files; returns the lists that changed (the new tools' own and
+        those a new tool displaced the weakest neighbour from). Neither the cache nor the
+        other pairs are touched, so a cold cache costs O(new x n), not a full rebuild.
+        """
+        corpus = self._read_corpus()
+        new = sorted({slug for slug in new_slugs if slug in corpus})
+        if not new:
+            return {}
+        slugs = list(corpus)
+        matrix = TfidfMatrix(slugs, [term_counts(corpus[slug]) for slug in slugs])
+        row, rows = matrix.row, matrix.rows
+        fresh = set(new)
+        lists: Dict[str, List[str]] = {}
+        offers: Dict[str, Neighbors] = {}
+        for slug, scores in zip(new, matrix.similarities([row[slug] for slug in new])):
+            lists[slug] = [other for other, _ in top_neighbors(slugs, scores, row[slug], self.k)]
+            for other, score in enumerate(scores):
+                if slugs[other] not in fresh and score >= MIN_SCORE:
+                    offers.setdefault(slugs[other], []).append((slug, score))
+
+        for slug, candidates in offers.items():
+            vector = rows[row[slug]]
+            current = corpus[slug].get("related")
+            current = [other for other in current if isinstance(other, str) and other not in fresh] if isinstance(current, list) else []
+            # slugs with no tool file rank below any real neighbour, so they are displaced first
+            scored = [
+                (other, cosine(vector, rows[row[other]]) if other in row else -1.0) for other in dict.fromkeys(current)
+            ]
+            inserted = False
+            for candidate, score in sorted(candidates, key=lambda item: -item[1]):
+                if len(scored) >= self.k:
+                    weakest = min(range(len(scored)), key=lambda index: scored[index][1])
+                    if score <= scored[weakest][1]:
+                        continue
+                    del scored[weakest]
+                # keep the existing order; the newcomer goes in ahead of the first weaker neighbour
+                position = next((index for index, (_, value) in enumerate(scored) if value < score), len(scored))
+                scored.insert(position, (candidate, score))
+                inserted = True
+            related = [other for other, _ in scored]
+            if inserted and related != corpus[slug].get("related"):
+                lists[slug] = related
+        return lists
+
+
+def write_related(
+    tools_dir: Path, lists: Dict[str, List[str]], dry_run: bool = False
+) -> Tuple[List[str], List[Committed]]:
+    """
+    Set `related` to lists[slug] for each slug whose file disagrees; returns (slugs that
+    differed, committed writes). Files keep their compact/indented layout.
+    """
+    pretty = ToolWriteBatch(tools_dir)
+    compact = ToolWriteBatch(tools_dir, compact=True)
+    differing: List[str] = []
+    try:
+        for slug in sorted(lists):
+            path = tools_dir / f"{slug}.json"
+            try:
+                raw = path.read_bytes()
+                data = json.loads(raw)
+            except (OSError, ValueError):
+                continue
+            related = lists[slug]
+            if data.get("related") == related:
+                continue
+            differing.append(slug)
+            if not dry_run:
+                data["related"] = related
+                (pretty if raw.lstrip().startswith(b"{\n") else compact).stage(slug, data)
+        committed = pretty.commit() + compact.commit()
+    finally:
+        pretty.abort()
+        compact.abort()
+    return differing, committed
+
+
+def related_summary(indexed: int, changed: int, written: int, elapsed: float, dry_run: bool = False) -> str:
+    backend = "scipy sparse" if HAS_SCIPY else "pure Python"
+    verb = "to rewrite" if dry_run else "rewritten"
+    return (
+        f"Related tools: {indexed} tools indexed ({backend}) in {elapsed:.2f}s; "
+        f"{changed} neighbour lists changed, {written} files {verb}."
+    )
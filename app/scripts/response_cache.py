@@ -0,0 +1,113 @@
+"""
+Content-addressed on-disk cache for model responses.
+
+Entries live under data/.cache/responses/<sha256>.json, keyed on model name + prompt.
+Expired entries (TTL) are dropped on read; when the directory grows past max_bytes the
+least recently used entries are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_HOURS", "168")) * 3600
+DEFAULT_MAX_BYTES = int(float(os.environ.get("RESPONSE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+
+def cache_key(model: str, prompt: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        enabled: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = self._path(cache_key(model, prompt))
+        text: Optional[str] = None
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            if time.time() - float(entry.get("created", 0)) <= self.ttl_seconds:
+                text = entry.get("text")
+                os.utime(path)  # mark as recently used for LRU eviction
+            else:
+                path.unlink(missing_ok=True)
+        except (OSError, ValueError):
+            text = None
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def put(self, model: str, prompt: str, text: str) -> None:
+        if not self.enabled or not text:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(cache_key(model, prompt))
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump({"model": model, "created": time.time(), "text": text}, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._evict()
+
+    def discard(self, model: str, prompt: str) -> None:
+        """Drop an entry whose response turned out to be unusable so a retry reaches the model."""
+        self._path(cache_key(model, prompt)).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0.0
+        return f"Response cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), {self.evictions} evicted."
@@ -8,6 +8,8 @@ MAX_PER_DAY="${MAX_PER_DAY:-10}"
 PLAN_COUNT="${PLAN_COUNT:-10}"
 NICHES="${NICHES:-health, climate, construction, energy, education, technology, lifestyle, sports, finance}"
 TOPICS_FILE="${TOPICS_FILE:-scripts/topics.txt}"
+WORKERS="${WORKERS:-1}"
+BATCH_SIZE="${BATCH_SIZE:-1}"
 
 "${PYTHON_BIN}" scripts/generate_tools.py \
   --strategy \
@@ -16,5 +18,7 @@ TOPICS_FILE="${TOPICS_FILE:-scripts/topics.txt}"
   --max-per-day "${MAX_PER_DAY}" \
   --niches "${NICHES}" \
   --topics-file "${TOPICS_FILE}" \
+  --workers "${WORKERS}" \
+  --batch-size "${BATCH_SIZE}" \
   --log \
   --shuffle
@@ -0,0 +1,130 @@
+"""
+Per-stage timing spans for a generator run.
+
+`with SPANS.span("clean_json", bytes=len(text)):` times a block on the current thread.
+Spans nest per thread, so a stage is reported under the stage that called it
+(generate_tool/generate_with_model/clean_json). annotate() adds counts to the innermost
+open span; call_model uses it to attach prompt/response bytes and estimated tokens to
+whichever planning or generation span made the request.
+
+With a sink path set, every finished span is appended to it as one JSON line. summary()
+aggregates calls, wall time, tokens and bytes per stage path for the end-of-run table.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Numeric attributes summed per stage in the summary table: prompt/response counts describe
+# model traffic, bytes the data a stage handled (text parsed, file written).
+COUNTERS = ("prompt_tokens", "response_tokens", "prompt_bytes", "response_bytes", "bytes")
+
+
+class SpanRecorder:
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.records: List[Dict[str, Any]] = []
+        self._sink: Optional[TextIO] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def open(self, path: Path) -> None:
+        """Append finished spans to path as JSON lines."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._sink = path.open("a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sink is not None:
+                self._sink.close()
+                self._sink = None
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, stage: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        stack = self._stack()
+        path = f"{stack[-1]['path']}/{stage}" if stack else stage
+        record: Dict[str, Any] = {"stage": stage, "path": path, **attrs}
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record["error"] = exc.__class__.__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            record["start"] = round(start - self.origin, 4)
+            record["ms"] = round((end - start) * 1000, 2)
+            record["thread"] = threading.current_thread().name
+            with self._lock:
+                self.records.append(record)
+                if self._sink is not None:
+                    self._sink.write(json.dumps(record, default=str) + "\n")
+
+    def timed(self, stage: Optional[str] = None) -> Callable[[F], F]:
+        """Decorator: run the function inside a span named after it (or stage)."""
+
+        def decorate(func: F) -> F:
+            name = stage or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def annotate(self, **attrs: Any) -> None:
+        """Add to the innermost open span on this thread (numbers accumulate); no-op outside spans."""
+        stack = self._stack()
+        if not stack:
+            return
+        record = stack[-1]
+        for key, value in attrs.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and key in record:
+                record[key] += value
+            else:
+                record[key] = value
+
+    def summary(self) -> str:
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return ""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(record["path"], []).append(record)
+        header = f"{'stage':<44} {'calls':>6} {'total s':>8} {'mean ms':>9} {'p95 ms':>9} {'tok in':>8} {'tok out':>8} {'KB sent':>8} {'KB recv':>8} {'KB data':>8} {'err':>4}"
+        lines = ["Stage timings:", header]
+        for path in sorted(groups, key=lambda key: key.split("/")):
+            group = groups[path]
+            durations = sorted(item["ms"] for item in group)
+            p95 = durations[min(len(durations) - 1, math.ceil(0.95 * len(durations)) - 1)]
+            sums = {key: sum(item.get(key, 0) for item in group) for key in COUNTERS}
+            depth = path.count("/")
+            label = ("  " * depth + path.rsplit("/", 1)[-1])[:44]
+            lines.append(
+                f"{label:<44} {len(group):>6} {sum(durations) / 1000:>8.2f} {sum(durations) / len(group):>9.1f} "
+                f"{p95:>9.1f} {sums['prompt_tokens']:>8} {sums['response_tokens']:>8} "
+                f"{sums['prompt_bytes'] / 1024:>8.1f} {sums['response_bytes'] / 1024:>8.1f} {sums['bytes'] / 1024:>8.1f} "
+                f"{sum(1 for item in group if 'error' in item):>4}"
+            )
+        return "\n".join(lines)
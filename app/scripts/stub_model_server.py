@@ -0,0 +1,266 @@
+"""
+Deterministic local stand-in for a model API, for offline load tests of the generator.
+
+Speaks the OpenAI-compatible POST /v1/chat/completions protocol (plain and
+"stream": true server-sent events). Responses are built from the prompt: planning
+prompts get a JSON array of calculator ideas, tool prompts a complete tool config (with
+a formula that passes formula_verifier) and batch prompts one config per listed topic.
+Content depends only on the prompt; latency, HTTP failures (503 / 429) and malformed
+(truncated) responses are drawn from one RNG seeded by --seed, so a run with the same
+request order behaves the same way every time.
+
+Usage:
+  python scripts/stub_model_server.py --port 8089 --latency 0.5 --failure-rate 0.1
+  MODEL_BACKEND=openai OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python scripts/generate_tools.py ...
+or let the generator start one in-process with --backend stub.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+_TOOL_TOPIC = re.compile(r'JSON config for a calculator about "(.+?)"\.', re.DOTALL)
+_BATCH_ITEM = re.compile(r'^(\d+)\. "(.+)"$', re.MULTILINE)
+_PLAN_COUNT = re.compile(r"Return ONLY a JSON array of (\d+) objects")
+_CATEGORIES = ["finance", "health", "climate", "energy", "construction", "technology", "education", "lifestyle", "sports"]
+_SUBJECTS = ["cost", "load", "yield", "budget", "risk", "capacity", "payback", "footprint", "demand", "margin"]
+STREAM_CHUNK = 512
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60] or "stub-tool"
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def stub_tool(topic: str, index: int | None = None) -> Dict[str, Any]:
+    title_text = topic.split(" | ", 1)[0].strip() or "Stub"
+    title = title_text if title_text.lower().endswith("calculator") else f"{title_text} Calculator"
+    rng = random.Random(_digest(topic))
+    words = re.findall(r"[A-Za-z]+", title_text) or ["value"]
+    inputs = [
+        {"id": "quantity", "label": f"{words[0].title()} Quantity", "type": "number", "placeholder": str(rng.randint(5, 50)), "required": True, "step": 1},
+        {"id": "unitCost", "label": "Unit Cost", "type": "number", "placeholder": str(rng.randint(10, 500)), "required": True, "step": 0.01},
+        {"id": "rate", "label": "Annual Rate (%)", "type": "number", "placeholder": str(rng.randint(2, 12)), "required": True, "step": 0.1},
+        {"id": "years", "label": "Years", "type": "number", "placeholder": str(rng.randint(1, 20)), "required": True, "step": 1},
+    ]
+    formula = (
+        "const base = quantity * unitCost;\n"
+        "const growth = Math.pow(1 + rate / 100, Math.max(years, 0));\n"
+        "const total = base * growth;\n"
+        "const perYear = years > 0 ? total / years : total;\n"
+        "return { total, perYear };"
+    )
+    paragraph = " ".join(
+        f"{title} models the {rng.choice(_SUBJECTS)} of {' '.join(words).lower()} over time."
+        for _ in range(12)
+    )
+    config: Dict[str, Any] = {
+        "slug": _slug(title_text),
+        "title": title,
+        "seo": {"title": f"{title} | Free Online Tool", "description": f"Estimate {title_text.lower()} in seconds."},
+        "summary": f"{title} estimates total and yearly figures from quantity, unit cost, rate and time.",
+        "inputs": inputs,
+        "outputs": [
+            {"id": "total", "label": "Total", "unit": "$", "precision": 2},
+            {"id": "perYear", "label": "Per Year", "unit": "$", "precision": 2},
+        ],
+        "formula": formula,
+        "cta": "Calculate",
+        "faq": [{"q": f"{title} question {n}?", "a": f"Answer {n} for {title_text}."} for n in range(1, 7)],
+        "tags": [word.lower() for word in words[:4]] + ["stub"],
+        "related": [],
+        "article": [
+            {"heading": heading, "body": paragraph}
+            for heading in (
+                "Introduction & The 'Why'",
+                "The Math Under the Hood",
+                "Step-by-Step Guide",
+                "Case Studies",
+                "Expert Tips & Pitfalls",
+            )
+        ],
+        "calculationSteps": ["Multiply quantity by unit cost.", "Compound by the annual rate.", "Divide by years."],
+    }
+    if index is not None:
+        config = {"index": index, **config}
+    return config
+
+
+def stub_plan(prompt: str, count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(_digest(prompt))
+    ideas = []
+    for number in range(count):
+        category = _CATEGORIES[number % len(_CATEGORIES)]
+        subject = rng.choice(_SUBJECTS)
+        title = f"Stub {category.title()} {subject.title()} Planner {rng.randint(100, 999)}"
+        ideas.append(
+            {
+                "slug": _slug(title),
+                "title": title,
+                "category": category,
+                "inspiration": "stub load test",
+                "summary": f"Estimates {subject} for {category} scenarios.",
+            }
+        )
+    return ideas
+
+
+def stub_content(prompt: str) -> str:
+    plan = _PLAN_COUNT.search(prompt)
+    if plan:
+        return json.dumps(stub_plan(prompt, int(plan.group(1))))
+    match = _TOOL_TOPIC.search(prompt)
+    if match:
+        return "```json\n" + json.dumps(stub_tool(match.group(1)), indent=2) + "\n```"
+    items = _BATCH_ITEM.findall(prompt)
+    if items:
+        return json.dumps([stub_tool(topic, int(index)) for index, topic in items])
+    return "stub response"
+
+
+class StubModel:
+    def __init__(
+        self, latency: float = 0.5, jitter: float = 0.2, failure_rate: float = 0.0, malformed_rate: float = 0.0, seed: int = 0
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.requests = 0
+        self.failures = 0
+        self.malformed = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self, prompt: str) -> Tuple[int, float, str]:
+        """Return (HTTP status, delay seconds, content) for one request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter))
+            roll = self._rng.random()
+            if roll < self.failure_rate:
+                self.failures += 1
+                return (429 if self._rng.random() < 0.5 else 503), delay / 4, ""
+            malformed = roll < self.failure_rate + self.malformed_rate
+            if malformed:
+                self.malformed += 1
+        content = stub_content(prompt)
+        if malformed:
+            content = content[: max(1, len(content) // 3)]
+        return 200, max(0.0, delay), content
+
+
+def make_handler(model: StubModel) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            messages = body.get("messages") or [{}]
+            prompt = str(messages[-1].get("content") or "")
+            status, delay, content = model.plan(prompt)
+            if status != 200:
+                time.sleep(delay)
+                payload = json.dumps({"error": {"message": "stub failure", "code": status}}).encode("utf-8")
+                self.send_response(status)
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            if body.get("stream"):
+                self._stream(content, delay)
+                return
+            time.sleep(delay)
+            payload = json.dumps(
+                {"object": "chat.completion", "model": "stub", "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, content: str, delay: float) -> None:
+            chunks = [content[start : start + STREAM_CHUNK] for start in range(0, len(content), STREAM_CHUNK)] or [""]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for chunk in chunks:
+                    time.sleep(delay / len(chunks))
+                    event = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": chunk}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client aborted the stream
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **options: Any) -> ThreadingHTTPServer:
+    """Serve a StubModel from a daemon thread; the model is available as server.model."""
+    model = StubModel(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(model))
+    server.daemon_threads = True
+    server.model = model  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible stub model server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean seconds per response.")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency varies by up to this fraction.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 429/503.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of responses truncated mid-JSON.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = start_stub_server(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    print(f"Stub model listening on http://{args.host}:{server.server_address[1]}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        model = server.model  # type: ignore[attr-defined]
+        print(f"\n{model.requests} requests, {model.failures} failed, {model.malformed} malformed.")
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Compact manifest of the tool catalog in data/tools.
+
+One JSON file (data/.cache/tools_manifest.json) holds slug, title, category, tags, article
+length, content hash, size and mtime per tool. refresh() only stats the directory and
+re-parses files whose size or mtime changed; the generator calls update() for every tool
+it saves, so existence checks, dedup and audits never need a full parse of the corpus.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def article_length(data: Dict[str, Any]) -> int:
+    article = data.get("article")
+    if not isinstance(article, list):
+        return 0
+    return sum(len(section.get("body") or "") for section in article if isinstance(section, dict))
+
+
+class ToolManifest:
+    def __init__(
+        self,
+        tools_dir: Path,
+        path: Path,
+        categorize: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        self.tools_dir = tools_dir
+        self.path = path
+        self.categorize = categorize
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ---- persistence ----
+    def load(self) -> "ToolManifest":
+        if self._loaded:
+            return self
+        self._loaded = True
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                raw = json.load(fh)
+            if raw.get("version") == MANIFEST_VERSION:
+                self.entries = raw.get("tools", {})
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as fh:
+                json.dump({"version": MANIFEST_VERSION, "tools": self.entries}, fh, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # ---- maintenance ----
+    def _entry(self, slug: str, data: Dict[str, Any], raw: bytes, stat: os.stat_result) -> Dict[str, Any]:
+        title = data.get("title") or slug
+        tags = data.get("tags") if isinstance(data.get("tags"), list) else []
+        category = data.get("category")
+        if not category and self.categorize:
+            category = self.categorize(f"{title} {' '.join(str(tag) for tag in tags)}")
+        return {
+            "slug": slug,
+            "title": title,
+            "category": category or "general",
+            "tags": tags,
+            "article_length": article_length(data),
+            "hash": content_hash(raw),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+    def refresh(self) -> Dict[str, int]:
+        """Sync with data/tools: re-parse only new or changed files, drop deleted ones."""
+        self.load()
+        stats = {"scanned": 0, "parsed": 0, "removed": 0}
+        seen: set[str] = set()
+        if self.tools_dir.exists():
+            for dirent in os.scandir(self.tools_dir):
+                if not dirent.name.endswith(".json"):
+                    continue
+                slug = dirent.name[: -len(".json")]
+                seen.add(slug)
+                stats["scanned"] += 1
+                stat = dirent.stat()
+                entry = self.entries.get(slug)
+                if entry and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+                    continue
+                try:
+                    raw = Path(dirent.path).read_bytes()
+                    data = json.loads(raw)
+                except (OSError, ValueError):
+                    continue
+                if entry and entry.get("hash") == content_hash(raw):
+                    # touched but unchanged (e.g. fresh checkout): just record the new stat
+                    entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+                else:
+                    self.entries[slug] = self._entry(slug, data, raw, stat)
+                    stats["parsed"] += 1
+                self._dirty = True
+        for slug in list(self.entries):
+            if slug not in seen:
+                del self.entries[slug]
+                stats["removed"] += 1
+                self._dirty = True
+        return stats
+
+    def update(self, slug: str, data: Dict[str, Any], raw: bytes, path: Path) -> None:
+        """Record a tool the caller just wrote, reusing its in-memory data and bytes."""
+        self.load()
+        entry = self._entry(slug, data, raw, path.stat())
+        with self._lock:
+            self.entries[slug] = entry
+            self._dirty = True
+
+    # ---- queries ----
+    def exists(self, slug: str) -> bool:
+        return slug in self.load().entries
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.load().entries.values())
+
+    def __len__(self) -> int:
+        return len(self.load().entries)
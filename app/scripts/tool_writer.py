@@ -0,0 +1,86 @@
+"""
+Atomic, batched writes of tool JSON files.
+
+stage() serializes a tool to a hidden temp file in the target directory and syncs its
+data; commit() renames every staged file over its final name and fsyncs the directory
+once, so a crash leaves each tool either fully old or fully new, never truncated JSON
+for tool-loader.ts to trip over.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+Committed = Tuple[str, Path, Dict[str, Any], bytes]
+
+
+def serialize_tool(data: Dict[str, Any], compact: bool = False) -> bytes:
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    return (text + "\n").encode("utf-8")
+
+
+def fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # directories cannot be opened on some platforms (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ToolWriteBatch:
+    def __init__(self, directory: Path, compact: bool = False) -> None:
+        self.directory = directory
+        self.compact = compact
+        self._staged: List[Tuple[str, Path, Path, Dict[str, Any], bytes]] = []
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def stage(self, slug: str, data: Dict[str, Any]) -> bytes:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        raw = serialize_tool(data, self.compact)
+        final = self.directory / f"{slug}.json"
+        tmp = self.directory / f".{slug}.json.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            # os.write may write less than asked (signals, full disks); loop until all of it is out
+            view = memoryview(raw)
+            while view:
+                view = view[os.write(fd, view) :]
+            # data must be on disk before the rename publishes it
+            if hasattr(os, "fdatasync"):
+                os.fdatasync(fd)
+            else:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._staged.append((slug, tmp, final, data, raw))
+        return raw
+
+    def commit(self) -> List[Committed]:
+        """Publish all staged files and fsync the directory once; returns what was committed."""
+        if not self._staged:
+            return []
+        staged, self._staged = self._staged, []
+        committed: List[Committed] = []
+        for slug, tmp, final, data, raw in staged:
+            os.replace(tmp, final)
+            committed.append((slug, final, data, raw))
+        fsync_directory(self.directory)
+        return committed
+
+    def abort(self) -> None:
+        for _, tmp, _, _, _ in self._staged:
+            tmp.unlink(missing_ok=True)
+        self._staged = []
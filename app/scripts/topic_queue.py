@@ -0,0 +1,234 @@
+"""
+Persistent priority queue of candidate topics.
+
+Planned ideas, trending headlines and topics.txt lines are offered to the queue every
+run; data/topic_queue.jsonl keeps whatever was not picked, so good ideas carry over to
+later days instead of being thrown away. Each candidate's slug and category are resolved
+once, when it is first offered.
+
+A candidate scores
+
+    prior(origin) * recency + NOVELTY_WEIGHT * novelty + REPEAT_BONUS * repeats + deficit(category)
+
+where recency halves every HALF_LIFE_DAYS[origin] since the idea was last offered,
+novelty is one minus its MinHash similarity to the closest existing tool, repeats counts
+the times it was offered again, and deficit favours categories that are under-represented
+among recent tools and today's picks. select() is a single lazy-greedy pass over one
+heap: a popped candidate is re-scored (its category may have filled up, the corpus may
+have grown closer to it) and pushed back if its score dropped, which is sound because
+scores only ever decrease during a selection. Picking k of n candidates costs
+O(n + k log n) instead of repeated scans over every idea and trend.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import random
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PRIORS = {"plan": 1.0, "trend": 0.8, "file": 0.5}
+# Trends go stale quickly, planned ideas slowly; topics.txt lines are evergreen.
+HALF_LIFE_DAYS: Dict[str, Optional[float]] = {"plan": 7.0, "trend": 2.0, "file": None}
+NOVELTY_WEIGHT = 0.5
+REPEAT_BONUS = 0.1
+MAX_REPEATS = 3
+DEFICIT_WEIGHT = 1.0
+MAX_AGE_DAYS = 30
+MAX_ENTRIES = 500
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+Entry = Dict[str, Any]
+
+
+def _parse_time(raw: str, fallback: datetime) -> datetime:
+    try:
+        return datetime.strptime(raw, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return fallback
+
+
+class TopicQueue:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: Dict[str, Entry] = {}
+        self._loaded = False
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def load(self) -> Dict[str, Entry]:
+        if not self._loaded:
+            self._loaded = True
+            if self.path.exists():
+                with self.path.open("r", encoding="utf-8") as fh:
+                    for line in fh:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get("slug") and entry.get("prompt"):
+                            self._entries[entry["slug"]] = entry
+        return self._entries
+
+    def offer(
+        self,
+        slug: str,
+        prompt: str,
+        category: str,
+        origin: str,
+        source: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """Add a candidate or refresh one already queued; returns True when it is new."""
+        entries = self.load()
+        stamp = (now or datetime.utcnow()).strftime(TIMESTAMP_FORMAT)
+        self._dirty = True
+        entry = entries.get(slug)
+        if entry is None:
+            entries[slug] = {
+                "slug": slug,
+                "prompt": prompt,
+                "category": category,
+                "origin": origin,
+                "source": source,
+                "added": stamp,
+                "last_seen": stamp,
+                "repeats": 0,
+            }
+            return True
+        if entry["last_seen"][:10] != stamp[:10] and origin != "file":
+            # seen again on another day; topics.txt is offered every run and does not count
+            entry["repeats"] = entry.get("repeats", 0) + 1
+        entry["last_seen"] = stamp
+        if PRIORS.get(origin, 0) > PRIORS.get(entry.get("origin", ""), 0):
+            entry.update(prompt=prompt, category=category, origin=origin, source=source)
+        return False
+
+    def discard(self, slug: str) -> None:
+        if self.load().pop(slug, None) is not None:
+            self._dirty = True
+
+    def base_score(self, entry: Entry, now: datetime) -> float:
+        origin = entry.get("origin", "file")
+        half_life = HALF_LIFE_DAYS.get(origin)
+        recency = 1.0
+        if half_life:
+            age_days = (now - _parse_time(entry.get("last_seen", ""), now)).total_seconds() / 86400
+            recency = 0.5 ** (max(0.0, age_days) / half_life)
+        return (
+            PRIORS.get(origin, 0.5) * recency
+            + NOVELTY_WEIGHT * entry.get("novelty", 1.0)
+            + REPEAT_BONUS * min(entry.get("repeats", 0), MAX_REPEATS)
+        )
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop candidates not offered for MAX_AGE_DAYS, then keep the MAX_ENTRIES best; returns how many went."""
+        now = now or datetime.utcnow()
+        entries = self.load()
+        before = len(entries)
+        for slug in [
+            slug
+            for slug, entry in entries.items()
+            if (now - _parse_time(entry.get("last_seen", ""), now)).days > MAX_AGE_DAYS
+        ]:
+            del entries[slug]
+        if len(entries) > MAX_ENTRIES:
+            keep = heapq.nlargest(MAX_ENTRIES, entries.values(), key=lambda entry: self.base_score(entry, now))
+            self._entries = {entry["slug"]: entry for entry in keep}
+        removed = before - len(self._entries)
+        if removed:
+            self._dirty = True
+        return removed
+
+    def select(
+        self,
+        count: int,
+        max_per_category: int = 2,
+        pressure: Optional[Dict[str, float]] = None,
+        novelty: Optional[Callable[[str], Optional[float]]] = None,
+        exclude: Optional[Callable[[str], bool]] = None,
+        shuffle: bool = False,
+        now: Optional[datetime] = None,
+    ) -> List[Entry]:
+        """
+        Remove and return up to count candidates, best first, with at most max_per_category
+        per category (exceeded only when the queue runs out of other categories).
+        pressure maps a category to how over-represented it already is (recent tools per
+        category over the mean); novelty returns 0..1 for a prompt or None for a
+        near-duplicate, which is dropped along with candidates excluded outright (e.g.
+        slugs that already exist).
+        """
+        now = now or datetime.utcnow()
+        entries = self.load()
+        pressure = pressure or {}
+        counts: Counter = Counter()
+        checked: set[str] = set()
+
+        def deficit(category: str) -> float:
+            return DEFICIT_WEIGHT / (1 + counts[category] + pressure.get(category, 0.0))
+
+        def score(entry: Entry) -> float:
+            return self.base_score(entry, now) + deficit(entry["category"])
+
+        # ties break on queue order, or randomly with --shuffle
+        heap = [
+            (-score(entry), random.random() if shuffle else order, slug)
+            for order, (slug, entry) in enumerate(entries.items())
+        ]
+        heapq.heapify(heap)
+        selected: List[Entry] = []
+        overflow: List[Entry] = []
+        while heap and len(selected) < count:
+            key, tiebreak, slug = heapq.heappop(heap)
+            entry = entries[slug]
+            if exclude is not None and exclude(slug):
+                self.discard(slug)
+                continue
+            if novelty is not None and slug not in checked:
+                checked.add(slug)
+                value = novelty(entry["prompt"])
+                if value is None:
+                    self.discard(slug)
+                    continue
+                entry["novelty"] = round(value, 3)
+            if counts[entry["category"]] >= max_per_category:
+                overflow.append(entry)
+                continue
+            current = score(entry)
+            if current < -key - 1e-9:
+                heapq.heappush(heap, (-current, tiebreak, slug))
+                continue
+            counts[entry["category"]] += 1
+            selected.append(entry)
+        # strict caps left slots empty: fall back to the best capped candidates
+        for entry in overflow[: count - len(selected)]:
+            selected.append(entry)
+        for entry in selected:
+            self.discard(entry["slug"])
+        if checked:
+            self._dirty = True  # refreshed novelty scores
+        return selected
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        entries = list(self._entries.values())
+        if not entries:
+            self.path.unlink(missing_ok=True)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
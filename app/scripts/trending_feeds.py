@@ -0,0 +1,162 @@
+"""
+Trending-feed ingestion for strategy mode.
+
+TRENDING_FEED_URL may list several RSS feeds (comma or whitespace separated). Feeds are
+fetched concurrently over one pooled requests.Session with ETag / If-Modified-Since
+validators kept in data/.cache/feeds.json; a 304 reuses the cached items. Bodies are
+streamed through ElementTree.iterparse and the download stops as soon as enough items
+have been read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+Item = Dict[str, str]
+
+
+def parse_feed_urls(raw: str) -> List[str]:
+    return [url for url in re.split(r"[\s,]+", raw.strip()) if url]
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_feed_items(stream: Any, limit: int) -> List[Item]:
+    """Read RSS <item> (or Atom <entry>) elements from a file-like stream, stopping after limit."""
+    items: List[Item] = []
+    if limit <= 0:
+        return items
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if _local(elem.tag) not in ("item", "entry"):
+            continue
+        fields = {_local(child.tag): (child.text or "").strip() for child in elem}
+        title = fields.get("title", "")
+        if title:
+            items.append({"title": title, "description": fields.get("description") or fields.get("summary", "")})
+        elem.clear()
+        if len(items) >= limit:
+            break
+    return items
+
+
+class FeedCache:
+    """ETag / Last-Modified validators plus the items last seen for each feed URL."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                self.entries: Dict[str, Dict[str, Any]] = json.load(fh)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, url: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.entries.get(url, {}))
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.entries[url] = entry
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock, tmp.open("w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def make_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "CalcPandaTrends/1.0"
+    return session
+
+
+def fetch_feed(
+    session: requests.Session,
+    url: str,
+    limit: int,
+    cache: FeedCache,
+    timeout: float = 15,
+) -> Tuple[List[Item], str]:
+    """Return (items, status) where status is 'fetched', 'not-modified' or 'error: ...'."""
+    cached = cache.get(url)
+    headers: Dict[str, str] = {}
+    # Validators are only reusable if the cached copy holds as many items as we need now.
+    if len(cached.get("items", [])) >= limit:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                return cached["items"][:limit], "not-modified"
+            response.raise_for_status()
+            response.raw.decode_content = True
+            items = iter_feed_items(response.raw, limit)
+            cache.put(
+                url,
+                {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "items": items,
+                },
+            )
+            return items, "fetched"
+    except (requests.RequestException, Urllib3Error, OSError, ET.ParseError) as exc:
+        # reading response.raw surfaces urllib3's own errors (ProtocolError, ReadTimeoutError)
+        return cached.get("items", [])[:limit], f"error: {exc}"
+
+
+def fetch_feeds(
+    urls: List[str],
+    limit: int,
+    cache: FeedCache,
+    session: Optional[requests.Session] = None,
+    workers: int = 8,
+) -> List[Item]:
+    """
+    Fetch every feed concurrently and interleave their items round-robin (feed order
+    first), dropping repeated titles, until limit items are collected.
+    """
+    if not urls or limit <= 0:
+        return []
+    own_session = session is None
+    session = session or make_session(min(workers, len(urls)))
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as pool:
+            results = list(pool.map(lambda url: fetch_feed(session, url, limit, cache), urls))
+    finally:
+        if own_session:
+            session.close()
+    for url, (_, status) in zip(urls, results):
+        if status.startswith("error"):
+            print(f"Warning: unable to fetch trending feed {url} ({status[7:]})")
+    merged: List[Item] = []
+    seen: set[str] = set()
+    for row in range(limit):
+        for items, _ in results:
+            if row < len(items) and items[row]["title"] not in seen:
+                seen.add(items[row]["title"])
+                merged.append(items[row])
+        if len(merged) >= limit:
+            break
+    return merged[:limit]
@@ -1,15 +1,25 @@
 
 import os
+import re
+import sys
 import json
+import string
+import hashlib
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-import google.generativeai as genai
 
 # Setup
 ROOT = Path(__file__).resolve().parents[1]
 TOOLS_DIR = ROOT / "app" / "data" / "tools"
 MARKETING_DIR = ROOT / "app" / "data" / "marketing"
-MARKETING_DIR.mkdir(parents=True, exist_ok=True)
+LOG_FILE = ROOT / "app" / "data" / "tool_generation_log.csv"
+PLATFORMS = ["Reddit", "Quora", "Twitter", "Medium"]
+# Records the hashed tool fields and how each section was drafted (see seed_hash/read_seed).
+SEED_MARKER = re.compile(r"^<!-- seed-hash: ([0-9a-f]+) platforms: (.*?) -->$", re.MULTILINE)
+SECTION_END = "\n\n---\n\n"
 
 MODEL_NAME = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
 API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -27,7 +37,10 @@ except Exception:
     except Exception:
         pass
 
-import google.generativeai as genai
+try:
+    import google.generativeai as genai
+except ImportError:  # template drafts still work without the SDK
+    genai = None
 
 def load_tool(slug):
     path = TOOLS_DIR / f"{slug}.json"
@@ -37,20 +50,8 @@ def load_tool(slug):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def generate_social_content(tool, platform):
-    prompt_base = f"""
-    You are an expert content marketer. Create a comprehensive "{platform}" post for a free online tool called "{tool['title']}".
-    
-    Tool Context:
-    - Summary: {tool.get('summary', '')}
-    - Key Inputs: {[i['label'] for i in tool.get('inputs', [])]}
-    - Key Outputs: {[o['label'] for o in tool.get('outputs', [])]}
-    
-    Constraints for {platform}:
-    """
-    
-    if platform == "Reddit":
-        prompt = prompt_base + """
+PLATFORM_RULES = {
+    "Reddit": """
         - Context: A relevant subreddit (e.g., r/dataisbeautiful, r/personalfinance, r/fitness).
         - Style: "I built this." Humble, authentic, engineering-focused. Avoid excessive emojis or "salesy" language.
         - Structure:
@@ -59,9 +60,8 @@ def generate_social_content(tool, platform):
           3. "I made it free and privacy-focused (local calculation)."
           4. Ask for feedback.
         - formatting: Markdown.
-        """
-    elif platform == "Quora":
-        prompt = prompt_base + """
+        """,
+    "Quora": """
         - Context: Answering a question like "How do I calculate [Tool Topic]?"
         - Style: Educational, helpful, authoritative.
         - Structure:
@@ -70,9 +70,8 @@ def generate_social_content(tool, platform):
           3. Manual Calculation Example: Walk through a dummy example.
           4. "To save time, I built a calculator that does this automatically: [Link Placeholder]"
         - formatting: Markdown.
-        """
-    elif platform == "Twitter":
-        prompt = prompt_base + """
+        """,
+    "Twitter": """
         - Context: A viral thread (5-7 tweets).
         - Style: Punchy, data-driven, "Did you know?".
         - Structure:
@@ -81,9 +80,8 @@ def generate_social_content(tool, platform):
           - Tweet 5: "I built a tool to solve this."
           - Tweet 6: Link.
         - formatting: Plain text with tweet numbering (1/6).
-        """
-    elif platform == "Medium":
-        prompt = prompt_base + """
+        """,
+    "Medium": """
         - Context: A "Deep Dive" blog post draft.
         - Style: Storytelling + Technical.
         - Structure:
@@ -93,24 +91,65 @@ def generate_social_content(tool, platform):
           - How our tool solves it.
         - Length: ~600 words.
         - formatting: Markdown.
-        """
-        
+        """,
+}
+
+def tool_context(tool):
+    return f"""
+    Tool Context:
+    - Summary: {tool.get('summary', '')}
+    - Key Inputs: {[i['label'] for i in tool.get('inputs', [])]}
+    - Key Outputs: {[o['label'] for o in tool.get('outputs', [])]}
+    """
+
+def generate_social_content(tool, platform):
+    prompt = f"""
+    You are an expert content marketer. Create a comprehensive "{platform}" post for a free online tool called "{tool['title']}".
+    {tool_context(tool)}
+    Constraints for {platform}:
+    """ + PLATFORM_RULES[platform]
     model = genai.GenerativeModel(MODEL_NAME)
+    response = model.generate_content(prompt)
+    return response.text
+
+def parse_multi_platform(text, platforms):
+    """Pull {platform: draft} out of a JSON object reply (code fences and chatter tolerated)."""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
     try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        return f"Error generating {platform} content: {str(e)}"
+        data = json.loads(text[start : end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {p: data[p].strip() for p in platforms if isinstance(data.get(p), str) and data[p].strip()}
+
+def generate_multi_platform(tool, platforms):
+    """
+    Draft every platform in one request: the tool context is sent once and each
+    platform's constraints follow. Returns only the drafts that parsed.
+    """
+    constraints = "".join(f"""
+    Constraints for "{platform}":
+    """ + PLATFORM_RULES[platform] for platform in platforms)
+    keys = ", ".join(f'"{p}"' for p in platforms)
+    prompt = f"""
+    You are an expert content marketer. Create one post per platform ({', '.join(platforms)}) for a free online tool called "{tool['title']}".
+    {tool_context(tool)}{constraints}
+    Return ONLY a JSON object with exactly these keys: {keys}.
+    Each value is that platform's complete draft as a single string, formatted as its constraints ask.
+    """
+    model = genai.GenerativeModel(MODEL_NAME)
+    response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+    return parse_multi_platform(response.text or "", platforms)
 
 # ---------- Template Fallback ----------
-def generate_template_content(tool, platform):
-    title = tool.get('title', 'Calculator')
-    summary = tool.get('summary', 'A useful tool.')
-    slug = tool.get('slug', '')
-    url = f"https://calcpanda.com/{slug}"
-    
-    if platform == "Reddit":
-        return f"""**Title:** I built a free, privacy-focused {title} (no ads, local calculation)
+# Offline drafts are plain format strings over the columns built by template_columns();
+# each is split into (literal, field) segments once at import, so rendering a platform for
+# a batch of tools is one join per tool with no per-call parsing or branching.
+TEMPLATES = {
+    "Reddit": """**Title:** I built a free, privacy-focused {title} (no ads, local calculation)
 
 Hey r/selfhosted (and others),
 
@@ -125,12 +164,8 @@ It runs entirely in your browser using standardized formulas. No data leaves you
 **Link:**
 [{title}]({url})
 
-I'd love to hear your feedback on the UX or if I missed any edge cases!"""
-
-    elif platform == "Quora":
-        faq = tool.get('faq', [])
-        faq_content = faq[0]['a'] if faq else "It uses standard industry formulas."
-        return f"""**Question:** What is the best way to calculate {title}?
+I'd love to hear your feedback on the UX or if I missed any edge cases!""",
+    "Quora": """**Question:** What is the best way to calculate {title}?
 
 **Answer:**
 
@@ -139,7 +174,7 @@ Calculating this accurately requires understanding a few key variables.
 {summary}
 
 The core logic usually involves these factors:
-{', '.join([i['label'] for i in tool.get('inputs', [])[:3]])}
+{input_list}
 
 Strictly speaking, the formula often looks like this:
 > (Refer to standard engineering/financial models)
@@ -151,10 +186,8 @@ I built a free tool called **{title}** that automates this:
 
 It processes everything locally in your browser for privacy.
 
-*Disclaimer: I am the developer of CalcPanda.*"""
-
-    elif platform == "Twitter":
-        return f"""1/5 🧵 Struggling with {title}?
+*Disclaimer: I am the developer of CalcPanda.*""",
+    "Twitter": """1/5 🧵 Struggling with {title}?
         
 Most people guess, but precision matters.
 
@@ -170,10 +203,8 @@ Runs 100% in your browser. No ads. No tracking.
 5/5 🔗 Try it here:
 {url}
 
-#buildinpublic #tool #calculator"""
-
-    elif platform == "Medium":
-         return f"""# The Definitive Guide to {title}
+#buildinpublic #tool #calculator""",
+    "Medium": """# The Definitive Guide to {title}
 
 In a world driven by data, making guesses is a recipe for failure. Whether you are planning your finances or engineering a structure, precision is key.
 
@@ -182,7 +213,7 @@ In a world driven by data, making guesses is a recipe for failure. Whether you a
 
 ## The Mathematical Challenge
 Most people underestimate the complexity of getting this right. You need to account for:
-* {tool.get('inputs', [{'label': 'Various inputs'}])[0]['label']}
+* {first_input}
 * Unit conversions
 * Edge cases
 
@@ -198,47 +229,342 @@ It is designed to be:
 You can use the tool for free here: [{title}]({url})
 
 Let me know what you think in the comments!
-"""
-    return "Unknown platform"
+""",
+}
+
+def compile_template(text):
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+
+COMPILED_TEMPLATES = {platform: compile_template(text) for platform, text in TEMPLATES.items()}
+
+def template_columns(tools):
+    """Extract the template fields for every tool into columns, defaulting anything missing or malformed."""
+    columns = {"title": [], "summary": [], "url": [], "input_list": [], "first_input": []}
+    for tool in tools:
+        inputs = tool.get("inputs") if isinstance(tool.get("inputs"), list) else []
+        labels = [str(i["label"]) for i in inputs if isinstance(i, dict) and i.get("label")]
+        columns["title"].append(str(tool.get("title") or "Calculator"))
+        columns["summary"].append(str(tool.get("summary") or "A useful tool."))
+        columns["url"].append(f"https://calcpanda.com/{tool.get('slug', '')}")
+        columns["input_list"].append(", ".join(labels[:3]) or "the inputs listed on the tool page")
+        columns["first_input"].append(labels[0] if labels else "Various inputs")
+    return columns
+
+def render_templates(tools, platform, columns=None):
+    """Render one platform's template for a batch of tools; returns drafts in tool order."""
+    columns = columns or template_columns(tools)
+    segments = [(literal, columns[field] if field else None) for literal, field in COMPILED_TEMPLATES[platform]]
+    return [
+        "".join(literal + (column[row] if column is not None else "") for literal, column in segments)
+        for row in range(len(tools))
+    ]
+
+def generate_template_content(tool, platform):
+    if platform not in COMPILED_TEMPLATES:
+        return "Unknown platform"
+    return render_templates([tool], platform)[0]
+
+# ---------- Bulk seeding ----------
+def slugs_since(since):
+    """Slugs logged in tool_generation_log.csv at or after `since`, oldest first."""
+    if not LOG_FILE.exists():
+        print(f"Generation log not found: {LOG_FILE}")
+        return []
+    slugs = []
+    with open(LOG_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split(",", 2)
+            if len(parts) < 2:
+                continue
+            try:
+                logged = datetime.fromisoformat(parts[0].rstrip("Z"))
+            except ValueError:
+                continue  # header or malformed row
+            if logged >= since:
+                slugs.append(parts[1])
+    return slugs
+
+def resolve_slugs(slugs, pattern=None, since=None):
+    """Explicit slugs, then glob matches, then slugs generated since a date; de-duplicated in order."""
+    candidates = list(slugs)
+    if pattern:
+        candidates += sorted(path.stem for path in TOOLS_DIR.glob(f"{pattern}.json"))
+    if since:
+        candidates += slugs_since(since)
+    return list(dict.fromkeys(candidates))
+
+def seed_hash(tool):
+    """Hash of the tool fields the drafts are written from; edits elsewhere do not trigger a reseed."""
+    fields = {
+        "title": tool.get("title", ""),
+        "summary": tool.get("summary", ""),
+        "inputs": [i.get("label") for i in tool.get("inputs") or [] if isinstance(i, dict)],
+        "outputs": [o.get("label") for o in tool.get("outputs") or [] if isinstance(o, dict)],
+        "faq": tool.get("faq") or [],
+    }
+    raw = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+def read_seed(path):
+    """Return (hash or None, {platform: "ai"|"template"|"stale"}, {platform: section}) from a seed file, or None if unreadable."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    marker = SEED_MARKER.search(text)
+    if marker:
+        modes = dict(item.split("=", 1) for item in marker.group(2).split() if "=" in item)
+    else:
+        # written before seeds recorded their inputs: keep the sections, but as stale
+        modes = {p: "stale" for p in PLATFORMS if f"## {p} Draft\n" in text}
+    # split on the headers write_seed emits for the recorded platforms only, so rules and
+    # headings inside a draft stay part of it
+    header = re.compile(rf"^## ({'|'.join(re.escape(p) for p in modes)}) Draft\n\n", re.MULTILINE) if modes else None
+    found = list(header.finditer(text, marker.end() if marker else 0)) if header else []
+    sections = {}
+    for match, following in zip(found, found[1:] + [None]):
+        body = text[match.end() : following.start() if following else len(text)]
+        if body.endswith(SECTION_END):
+            body = body[: -len(SECTION_END)]
+        sections.setdefault(match.group(1), body)
+    return marker.group(1) if marker else None, modes, sections
+
+def plan_seed(tool, platforms, use_ai, force=False):
+    """
+    Return (kept sections, kept modes, platforms to draft), or None when every requested
+    platform is current. Requested sections survive only when the hashed fields are
+    unchanged; template drafts are redone once a model is available. Sections for
+    platforms outside the request are always carried over, marked stale when the tool
+    changed so a later run for that platform redrafts them.
+    """
+    existing = read_seed(MARKETING_DIR / f"{tool['slug']}-seed.md")
+    if existing is None:
+        return {}, {}, list(platforms)
+    digest, modes, sections = existing
+    changed = digest != seed_hash(tool)
+    keep = [] if force or changed else [
+        p for p in platforms if p in sections and modes.get(p) != "stale" and not (use_ai and modes.get(p) == "template")
+    ]
+    todo = [p for p in platforms if p not in keep]
+    if not todo:
+        return None
+    others = [p for p in sections if p not in platforms]
+    kept_modes = {p: modes[p] for p in keep}
+    kept_modes.update({p: "stale" if changed else modes[p] for p in others})
+    return {p: sections[p] for p in keep + others}, kept_modes, todo
+
+def draft(tool, platform, use_ai):
+    """Return (platform, content, "ai"|"template"); model failures fall back to the template."""
+    if use_ai:
+        try:
+            return platform, generate_social_content(tool, platform), "ai"
+        except Exception as e:
+            print(f"  ! {tool['slug']} {platform}: {e} (using template)")
+    return platform, generate_template_content(tool, platform), "template"
+
+def draft_one(tool, platform, use_ai):
+    return [draft(tool, platform, use_ai)], 0
+
+def draft_combined(tool, platforms, use_ai):
+    """
+    Return ([(platform, content, mode)], fallbacks): one request for every platform, then
+    a separate call for each section that was missing or did not parse.
+    """
+    drafts = {}
+    if use_ai and len(platforms) > 1:
+        try:
+            drafts = generate_multi_platform(tool, platforms)
+        except Exception as e:
+            print(f"  ! {tool['slug']} combined draft: {e} (drafting per platform)")
+    missing = [p for p in platforms if p not in drafts]
+    if use_ai and len(platforms) > 1 and missing:
+        print(f"  ~ {tool['slug']}: {', '.join(missing)} not in combined reply, drafting separately")
+    results = [(p, drafts[p], "ai") if p in drafts else draft(tool, p, use_ai) for p in platforms]
+    return results, len(missing) if use_ai and len(platforms) > 1 else 0
+
+def write_seed(tool, sections, modes):
+    output_path = MARKETING_DIR / f"{tool['slug']}-seed.md"
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    platforms = [p for p in PLATFORMS if p in sections]
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"# Seeding Content for {tool['title']}\n\n")
+        f.write(f"Target URL: https://calcpanda.com/{tool['slug']}\n\n")
+        f.write(f"<!-- seed-hash: {seed_hash(tool)} platforms: {' '.join(f'{p}={modes[p]}' for p in platforms)} -->\n\n")
+        for platform in platforms:
+            f.write(f"## {platform} Draft\n\n")
+            f.write(sections[platform])
+            f.write(SECTION_END)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+def seed_tools(tools, use_ai, workers, platforms=PLATFORMS, force=False, combined=False):
+    """
+    Fan the (tool, platform) drafts that are missing or stale out over a bounded pool, or
+    with combined=True one multi-platform request per tool. Work is queued tool by tool,
+    so each -seed.md is written as soon as its drafts are in rather than at the end;
+    unchanged tools are skipped without touching the file.
+    """
+    MARKETING_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = {}
+    unchanged = 0
+    reused = 0
+    for tool in tools:
+        plan = plan_seed(tool, platforms, use_ai, force)
+        if plan is None:
+            unchanged += 1
+            continue
+        reused += len(plan[0])
+        jobs[tool["slug"]] = (tool,) + plan
+    total_pairs = sum(len(todo) for _, _, _, todo in jobs.values())
+    print(
+        f"{len(jobs)} tool(s) to seed, {unchanged} unchanged; {total_pairs} drafts to write, "
+        f"{reused} sections reused."
+    )
+    if not jobs:
+        return 0, set()
+    done_pairs = 0
+    written = 0
+    fallbacks = 0
+    split = 0
+    failed = set()
+    start = time.perf_counter()
+    report_every = max(1, len(jobs) // 20)
+
+    def finish(slug):
+        nonlocal written
+        tool, sections, modes, _ = jobs[slug]
+        path = write_seed(tool, sections, modes)
+        written += 1
+        if written % report_every and written != len(jobs):
+            return
+        elapsed = time.perf_counter() - start
+        print(
+            f"[{written}/{len(jobs)}] {path.name} "
+            f"({done_pairs}/{total_pairs} drafts, {done_pairs / elapsed if elapsed else 0:.1f} drafts/s)"
+        )
+
+    futures = {}
+    if not use_ai:
+        # offline: each platform's template is rendered for the whole batch in one pass
+        slugs = [slug for slug, job in jobs.items() if job[3]]
+        batch = [jobs[slug][0] for slug in slugs]
+        columns = template_columns(batch)
+        for platform in platforms:
+            for slug, content in zip(slugs, render_templates(batch, platform, columns)):
+                _, sections, modes, todo = jobs[slug]
+                if platform in todo:
+                    sections[platform] = content
+                    modes[platform] = "template"
+        for slug in slugs:
+            done_pairs += len(jobs[slug][3])
+            finish(slug)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            if combined:
+                futures = {
+                    pool.submit(draft_combined, tool, todo, use_ai): (slug, len(todo))
+                    for slug, (tool, _, _, todo) in jobs.items()
+                    if todo
+                }
+            else:
+                futures = {
+                    pool.submit(draft_one, tool, platform, use_ai): (slug, 1)
+                    for slug, (tool, _, _, todo) in jobs.items()
+                    for platform in todo
+                }
+            pending = {}
+            for slug, count in futures.values():
+                pending[slug] = pending.get(slug, 0) + count
+            for future in as_completed(futures):
+                slug, count = futures[future]
+                done_pairs += count
+                pending[slug] -= count
+                try:
+                    results, separate = future.result()
+                    split += separate
+                    _, sections, modes, _ = jobs[slug]
+                    for platform, content, mode in results:
+                        sections[platform] = content
+                        modes[platform] = mode
+                        fallbacks += mode == "template"
+                except Exception as e:
+                    # a broken draft must not sink the batch; the tool is reported and skipped
+                    print(f"  ! {slug}: {e.__class__.__name__}: {e}")
+                    failed.add(slug)
+                if pending[slug] == 0 and slug not in failed:
+                    finish(slug)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Done! {written} seed files, {total_pairs} drafts in {elapsed:.1f}s "
+        f"({written / elapsed if elapsed else 0:.2f} tools/s, {total_pairs / elapsed if elapsed else 0:.1f} drafts/s, "
+        f"{workers} workers)"
+    )
+    if combined and use_ai:
+        print(f"Combined requests: {len(futures)}; {split} sections needed a separate call.")
+    if fallbacks:
+        print(f"{fallbacks} drafts fell back to the template after model errors.")
+    if failed:
+        print(f"Skipped {len(failed)} tool(s) with failed drafts: {', '.join(sorted(failed))}")
+    return written, failed
 
 def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("slug", help="Tool slug to generate content for")
+    parser = argparse.ArgumentParser(description="Generate social seeding drafts for one or more tools.")
+    parser.add_argument("slugs", nargs="*", help="Tool slug(s) to generate content for")
+    parser.add_argument("--glob", help="Seed every tool whose slug matches this pattern (e.g. 'loan-*')")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Seed every tool in the generation log since this date (YYYY-MM-DD[THH:MM:SS])",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("SEED_WORKERS", "8")),
+        help="Concurrent (tool, platform) drafts",
+    )
+    parser.add_argument(
+        "--platforms",
+        type=lambda value: [p.strip() for p in value.split(",") if p.strip()],
+        default=PLATFORMS,
+        help=f"Comma-separated platforms to draft (default: {','.join(PLATFORMS)})",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Request all platform drafts for a tool in one JSON response (per-platform calls only for sections that fail)",
+    )
+    parser.add_argument("--force", action="store_true", help="Redraft every section even if the tool is unchanged")
     args = parser.parse_args()
-    
+    if not args.slugs and not args.glob and not args.since:
+        parser.error("Provide slug(s), --glob or --since")
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    unknown = [p for p in args.platforms if p not in PLATFORMS]
+    if unknown or not args.platforms:
+        parser.error(f"--platforms must be a subset of {','.join(PLATFORMS)}")
+
     # Configure GenAI if key exists
     use_ai = False
-    if API_KEY:
+    if API_KEY and genai is not None:
         try:
             genai.configure(api_key=API_KEY)
             use_ai = True
-        except:
+        except Exception:
             pass
-    
-    tool = load_tool(args.slug)
-    if not tool:
-        return
-
-    print(f"Generating seeding content for: {tool['title']} (AI Mode: {use_ai})...")
-    
-    output_path = MARKETING_DIR / f"{args.slug}-seed.md"
-    
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(f"# Seeding Content for {tool['title']}\n\n")
-        f.write(f"Target URL: https://calcpanda.com/{tool['slug']}\n\n")
-        
-        for platform in ["Reddit", "Quora", "Twitter", "Medium"]:
-            print(f"  - Generating {platform}...")
-            if use_ai:
-                content = generate_social_content(tool, platform)
-            else:
-                content = generate_template_content(tool, platform)
-                
-            f.write(f"## {platform} Draft\n\n")
-            f.write(content)
-            f.write("\n\n---\n\n")
-            
-    print(f"Done! Saved to {output_path}")
+
+    tools = []
+    for slug in resolve_slugs(args.slugs, args.glob, args.since):
+        tool = load_tool(slug)
+        if tool:
+            tool.setdefault("slug", slug)
+            tools.append(tool)
+    if not tools:
+        print("No tools to seed.")
+        return 1
+
+    print(f"Generating seeding content for {len(tools)} tool(s) (AI Mode: {use_ai}, {args.workers} workers)...")
+    _, failed = seed_tools(tools, use_ai, args.workers, args.platforms, args.force, args.combined)
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Local stand-in for the Reddit and Medium APIs, for testing social_publisher.py offline.
+
+Serves the endpoints the publisher touches:
+  Reddit (via praw):  POST /api/v1/access_token, GET /api/v1/me, POST /api/submit
+  Medium:             GET /v1/me, POST /v1/users/<id>/posts
+
+Every accepted post is kept in memory and counted per platform. Posts arriving less than
+--min-interval seconds after the previous one on the same platform get a 429, and
+--failure-rate injects 503s (seeded by --seed), so rate limiting and retries can be
+exercised without real accounts.
+
+Usage:
+  python scripts/mock_social_server.py --port 8090 --min-interval 1
+  MEDIUM_API_BASE=http://127.0.0.1:8090/v1 REDDIT_URL=http://127.0.0.1:8090 \
+  REDDIT_OAUTH_URL=http://127.0.0.1:8090 python scripts/social_publisher.py --drain
+or let the publisher start one in-process with --mock.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+MEDIUM_POSTS = re.compile(r"^/v1/users/([^/]+)/posts$")
+
+
+class MockSocial:
+    def __init__(self, min_interval=0.0, failure_rate=0.0, seed=0):
+        self.min_interval = min_interval
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.posts = []
+        self.last_post = {}
+        self.counts = {"reddit": 0, "medium": 0, "rejected": 0, "failed": 0, "auth": 0}
+
+    def admit(self, platform):
+        """Returns the HTTP status for a new post on platform (200 when accepted)."""
+        with self.lock:
+            now = time.monotonic()
+            if self.failure_rate and self.rng.random() < self.failure_rate:
+                self.counts["failed"] += 1
+                return 503
+            last = self.last_post.get(platform)
+            if last is not None and now - last < self.min_interval:
+                self.counts["rejected"] += 1
+                return 429
+            self.last_post[platform] = now
+            self.counts[platform] += 1
+            return 200
+
+    def record(self, platform, title, body):
+        with self.lock:
+            post_id = f"{platform[0]}{len(self.posts) + 1:05d}"
+            self.posts.append({"id": post_id, "platform": platform, "title": title, "chars": len(body)})
+            return post_id
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length).decode("utf-8") if length else ""
+            if "json" in (self.headers.get("Content-Type") or ""):
+                try:
+                    return json.loads(raw or "{}")
+                except ValueError:
+                    return {}
+            return {key: values[-1] for key, values in parse_qs(raw).items()}
+
+        def _authorized(self):
+            if (self.headers.get("Authorization") or "").split(" ", 1)[0].lower() in ("bearer", "basic"):
+                return True
+            self._send(401, {"message": "unauthorized", "error": 401})
+            return False
+
+        def do_GET(self):
+            path = urlparse(self.path).path.rstrip("/")
+            if not self._authorized():
+                return
+            with mock.lock:
+                mock.counts["auth"] += 1
+            if path == "/api/v1/me":
+                self._send(200, {"name": "mock-redditor", "id": "mock1"})
+            elif path == "/v1/me":
+                self._send(200, {"data": {"id": "mock-author", "username": "mock-writer"}})
+            else:
+                self._send(404, {"message": "not found"})
+
+        def do_POST(self):
+            path = urlparse(self.path).path.rstrip("/")
+            data = self._read()
+            if path == "/api/v1/access_token":
+                self._send(200, {"access_token": "mock-token", "token_type": "bearer", "expires_in": 3600, "scope": "*"})
+                return
+            if not self._authorized():
+                return
+            if path == "/api/submit":
+                status = mock.admit("reddit")
+                if status != 200:
+                    self._send(status, {"message": "slow down", "error": status})
+                    return
+                post_id = mock.record("reddit", data.get("title", ""), data.get("text", ""))
+                url = f"http://{self.headers.get('Host')}/r/{data.get('sr', 'test')}/comments/{post_id}/"
+                self._send(200, {"json": {"errors": [], "data": {"url": url, "id": post_id, "name": f"t3_{post_id}"}}})
+                return
+            match = MEDIUM_POSTS.match(path)
+            if match:
+                status = mock.admit("medium")
+                if status != 200:
+                    self._send(status, {"errors": [{"message": "slow down", "code": status}]})
+                    return
+                post_id = mock.record("medium", data.get("title", ""), data.get("content", ""))
+                url = f"http://{self.headers.get('Host')}/@mock-writer/{post_id}"
+                self._send(201, {"data": {"id": post_id, "authorId": match.group(1), "url": url, "publishStatus": data.get("publishStatus")}})
+                return
+            self._send(404, {"message": "not found"})
+
+    return Handler
+
+
+def start_mock_server(port=0, min_interval=0.0, failure_rate=0.0, seed=0):
+    """Start the server on a daemon thread; returns (server, mock, base_url)."""
+    mock = MockSocial(min_interval=min_interval, failure_rate=failure_rate, seed=seed)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(mock))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-social", daemon=True).start()
+    return server, mock, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Reddit/Medium API for offline publisher tests")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--min-interval", type=float, default=0.0, help="Reject posts closer than this many seconds per platform with 429")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of posts answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server, mock, base_url = start_mock_server(args.port, args.min_interval, args.failure_rate, args.seed)
+    print(f"Mock social API on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Posts: {mock.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,21 @@
 
 import os
 import re
+import json
 import time
 import argparse
+import threading
 import requests
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
+from urllib3.exceptions import NewConnectionError
+
+try:
+    import fcntl
+except ImportError:  # Windows: the queue lock only covers threads of one process
+    fcntl = None
 
 # Load environment variables
 load_dotenv()
@@ -17,37 +27,195 @@ REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "CalcPandaPublisher/1.0")
 REDDIT_USERNAME = os.getenv("REDDIT_USERNAME")
 REDDIT_PASSWORD = os.getenv("REDDIT_PASSWORD")
 REDDIT_SUBREDDIT = os.getenv("REDDIT_SUBREDDIT", "u_{}".format(REDDIT_USERNAME) if REDDIT_USERNAME else "test")
+# Optional endpoint overrides (e.g. scripts/mock_social_server.py); praw uses its defaults when unset.
+REDDIT_URL = os.getenv("REDDIT_URL")
+REDDIT_OAUTH_URL = os.getenv("REDDIT_OAUTH_URL")
 
 MEDIUM_INTEGRATION_TOKEN = os.getenv("MEDIUM_INTEGRATION_TOKEN")
 MEDIUM_AUTHOR_ID = os.getenv("MEDIUM_AUTHOR_ID") # Optional, fetched if None
+MEDIUM_API_BASE = os.getenv("MEDIUM_API_BASE", "https://api.medium.com/v1").rstrip("/")
 
 MARKETING_DIR = Path(__file__).resolve().parents[1] / "app" / "data" / "marketing"
+QUEUE_FILE = Path(__file__).resolve().parents[1] / "app" / "data" / "publish_queue.jsonl"
+
+# Platforms with an API handler, and the seed file section each one posts.
+SECTIONS = {"reddit": "Reddit", "medium": "Medium"}
+# Posts per minute; each platform gets its own token bucket (burst of one post).
+RATES = {
+    "reddit": float(os.getenv("REDDIT_POSTS_PER_MINUTE", "1")),
+    "medium": float(os.getenv("MEDIUM_POSTS_PER_MINUTE", "2")),
+}
+MAX_ATTEMPTS = 5
+POST_TIMEOUT = 30
+RETRY_BASE_SECONDS = 60
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class PublishError(Exception):
+    """A post that did not go out; retry is False when trying again cannot help (no draft, no credentials)."""
+
+    def __init__(self, message, retry=True):
+        super().__init__(message)
+        self.retry = retry
+
+
+def never_sent(exc):
+    """
+    True when a requests error happened before the request reached the server. Anything
+    later (read timeouts, dropped connections) may follow an accepted post, so retrying
+    it could post twice.
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def reddit_retryable(exc):
+    """True only when Reddit certainly did not take the submission (rate limits, connection never made)."""
+    import prawcore
+    from praw.exceptions import RedditAPIException
+
+    if isinstance(exc, prawcore.exceptions.TooManyRequests):
+        return True
+    if isinstance(exc, RedditAPIException):
+        return any(item.error_type == "RATELIMIT" for item in exc.items)
+    if isinstance(exc, prawcore.exceptions.RequestException):
+        return never_sent(exc.original_exception)
+    return False
+
+
+# --- Rate limiting ---
+
+class TokenBucket:
+    """Allows `per_minute` posts per minute on average, at most `capacity` back to back."""
+
+    def __init__(self, per_minute, capacity=1):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """Block until a token is available; returns False if `stop` (an Event) is set first."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate if self.rate > 0 else 60.0
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+# --- Clients (created once, reused for every post) ---
+
+_clients_lock = threading.Lock()
+_reddit = None
+_medium = None
+
+
+def get_reddit():
+    global _reddit
+    with _clients_lock:
+        if _reddit is None:
+            if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USERNAME, REDDIT_PASSWORD]):
+                raise PublishError("Missing credentials in .env", retry=False)
+            try:
+                import praw
+            except ImportError:
+                raise PublishError("'praw' library not installed. Run 'pip install praw'", retry=False)
+            endpoints = {}
+            if REDDIT_URL:
+                endpoints["reddit_url"] = REDDIT_URL
+            if REDDIT_OAUTH_URL:
+                endpoints["oauth_url"] = REDDIT_OAUTH_URL
+            reddit = praw.Reddit(
+                client_id=REDDIT_CLIENT_ID,
+                client_secret=REDDIT_CLIENT_SECRET,
+                user_agent=REDDIT_USER_AGENT,
+                username=REDDIT_USERNAME,
+                password=REDDIT_PASSWORD,
+                **endpoints
+            )
+            # Authentication check, once per process
+            try:
+                print(f"  [Reddit] Authenticated as {reddit.user.me()}")
+            except Exception as e:
+                raise PublishError(f"Authentication failed: {e.__class__.__name__}: {e}")
+            _reddit = reddit
+        return _reddit
+
+
+def get_medium():
+    """Returns (session, author_id); the session keeps the auth headers and connection pool."""
+    global _medium
+    with _clients_lock:
+        if _medium is None:
+            if not MEDIUM_INTEGRATION_TOKEN:
+                raise PublishError("MEDIUM_INTEGRATION_TOKEN not set.", retry=False)
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {MEDIUM_INTEGRATION_TOKEN}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            })
+            author_id = MEDIUM_AUTHOR_ID
+            if not author_id:
+                try:
+                    user_resp = session.get(f"{MEDIUM_API_BASE}/me", timeout=30)
+                    user_resp.raise_for_status()
+                except requests.RequestException as e:
+                    session.close()
+                    status = getattr(e.response, "status_code", None)
+                    raise PublishError(f"Authentication failed: {e}", retry=status not in (401, 403))
+                user = user_resp.json()['data']
+                author_id = user['id']
+                print(f"  [Medium] Authenticated as {user['username']}")
+            _medium = (session, author_id)
+        return _medium
+
+
+def close_clients():
+    global _reddit, _medium
+    with _clients_lock:
+        if _medium is not None:
+            _medium[0].close()
+        _reddit = _medium = None
+
 
 # --- Platform Handlers ---
 
 def post_to_reddit(content_block, dry_run=False):
     """
-    Publishes content to Reddit. 
+    Publishes content to Reddit and returns the post URL (True on a dry run).
     Expects content_block to have a line starting with **Title:**
+    Raises PublishError on failure.
     """
     print(f"  [Reddit] Identifying content...")
-    
+
     # Simple parsing strategy
     lines = content_block.strip().split('\n')
     title = ""
     body_lines = []
-    
+
     for line in lines:
         if line.lower().startswith("**title:**"):
             title = line.split(":", 1)[1].strip()
         else:
             body_lines.append(line)
-            
+
     body = "\n".join(body_lines).strip()
-    
+
     if not title:
-        print("  [Reddit] Error: No '**Title:**' found in draft.")
-        return False
+        raise PublishError("No '**Title:**' found in draft.", retry=False)
 
     if dry_run:
         print(f"  [Reddit] [DRY RUN] Would post to r/{REDDIT_SUBREDDIT}:")
@@ -55,43 +223,30 @@ def post_to_reddit(content_block, dry_run=False):
         print(f"    Body Length: {len(body)} chars")
         return True
 
-    if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USERNAME, REDDIT_PASSWORD]):
-        print("  [Reddit] Error: Missing credentials in .env")
-        return False
-
+    reddit = get_reddit()
     try:
-        import praw
-        reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent=REDDIT_USER_AGENT,
-            username=REDDIT_USERNAME,
-            password=REDDIT_PASSWORD
-        )
-        # Authentication check
-        print(f"  [Reddit] Authenticated as {reddit.user.me()}")
-        
         subreddit = reddit.subreddit(REDDIT_SUBREDDIT)
         submission = subreddit.submit(title, selftext=body)
-        print(f"  [Reddit] Success! URL: {submission.url}")
-        return True
-    except ImportError:
-        print("  [Reddit] Error: 'praw' library not installed. Run 'pip install praw'")
     except Exception as e:
-        print(f"  [Reddit] Error: {e}")
-    return False
+        retry = reddit_retryable(e)
+        note = "" if retry else " (not retried: the post may have gone through; check before re-queueing)"
+        raise PublishError(f"{e.__class__.__name__}: {e}{note}", retry=retry)
+    url = submission.shortlink
+    print(f"  [Reddit] Success! URL: {url}")
+    return url
 
 def post_to_medium(content_block, dry_run=False):
     """
-    Publishes content to Medium.
+    Publishes content to Medium as a draft and returns its URL (True on a dry run).
     Expects markdown content. First H1 (# Title) is used as title.
+    Raises PublishError on failure.
     """
     print(f"  [Medium] Identifying content...")
-    
+
     lines = content_block.strip().split('\n')
     title = "New Post"
     processed_lines = []
-    
+
     # Extract Title from first H1
     found_title = False
     for line in lines:
@@ -100,7 +255,7 @@ def post_to_medium(content_block, dry_run=False):
             found_title = True
         else:
             processed_lines.append(line)
-            
+
     content = "\n".join(processed_lines).strip()
     content_format = "markdown"
 
@@ -109,28 +264,10 @@ def post_to_medium(content_block, dry_run=False):
         print(f"    Title: {title}")
         print(f"    Body Length: {len(content)} chars")
         return True
-        
-    if not MEDIUM_INTEGRATION_TOKEN:
-         print("  [Medium] Error: MEDIUM_INTEGRATION_TOKEN not set.")
-         return False
-
-    headers = {
-        "Authorization": f"Bearer {MEDIUM_INTEGRATION_TOKEN}",
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
 
     try:
-        # 1. Get User ID if not provided
-        author_id = MEDIUM_AUTHOR_ID
-        if not author_id:
-            user_resp = requests.get("https://api.medium.com/v1/me", headers=headers)
-            user_resp.raise_for_status()
-            author_id = user_resp.json()['data']['id']
-            print(f"  [Medium] Authenticated as {user_resp.json()['data']['username']}")
-
-        # 2. Post
-        url = f"https://api.medium.com/v1/users/{author_id}/posts"
+        session, author_id = get_medium()
+        url = f"{MEDIUM_API_BASE}/users/{author_id}/posts"
         data = {
             "title": title,
             "contentFormat": content_format,
@@ -138,18 +275,248 @@ def post_to_medium(content_block, dry_run=False):
             "publishStatus": "draft", # Safety first
             "notifyFollowers": False
         }
-        
-        resp = requests.post(url, headers=headers, json=data)
+        resp = session.post(url, json=data, timeout=POST_TIMEOUT)
         resp.raise_for_status()
         post_data = resp.json()['data']
-        print(f"  [Medium] Success! content posted as draft. URL: {post_data['url']}")
-        return True
+    except requests.HTTPError as e:
+        status = e.response.status_code
+        # 429 and server errors are worth retrying; other 4xx will fail the same way again
+        raise PublishError(f"HTTP {status}: {e.response.text[:200]}", retry=status == 429 or status >= 500)
+    except requests.RequestException as e:
+        retry = never_sent(e)
+        note = "" if retry else " (not retried: the draft may have been created; check before re-queueing)"
+        raise PublishError(f"{e.__class__.__name__}: {e}{note}", retry=retry)
+    print(f"  [Medium] Success! content posted as draft. URL: {post_data['url']}")
+    return post_data['url']
+
+HANDLERS = {"reddit": post_to_reddit, "medium": post_to_medium}
+CLIENTS = {"reddit": get_reddit, "medium": get_medium}
+
+# --- Posting queue ---
+
+class PublishQueue:
+    """
+    Pending (slug, platform) posts, one JSON line each in QUEUE_FILE. Posted and failed
+    entries stay in the file, so a pair is never posted twice unless re-queued with --force.
+    Every read-modify-write holds an exclusive flock on a sidecar .lock file (POSIX), so
+    slugs queued by another invocation while a daemon is draining are picked up rather
+    than overwritten. Without fcntl (Windows) only threads of one process are serialised.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def lock(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read(self):
+        entries = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[(entry["slug"], entry["platform"])] = entry
+        return entries
+
+    def _write(self, entries):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in entries.values():
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def entries(self):
+        with self.lock():
+            return list(self._read().values())
+
+    def add(self, pairs, force=False):
+        """Queue (slug, platform) pairs; returns how many were added or re-queued."""
+        stamp = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+        added = 0
+        with self.lock():
+            entries = self._read()
+            for slug, platform in pairs:
+                entry = entries.get((slug, platform))
+                if entry is not None and (entry["status"] == "pending" or (entry["status"] == "posted" and not force)):
+                    continue
+                entries[(slug, platform)] = {
+                    "slug": slug,
+                    "platform": platform,
+                    "status": "pending",
+                    "queued": stamp,
+                    "attempts": 0,
+                    "next_try": None,
+                }
+                added += 1
+            if added:
+                self._write(entries)
+        return added
+
+    def next_due(self, platform, skip=()):
+        """
+        Oldest pending entry for platform that is due now, or None. The second value is
+        the seconds until the earliest backed-off entry becomes due (None if there is none).
+        """
+        now = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+        due, later = None, None
+        with self.lock():
+            for entry in self._read().values():
+                if entry["platform"] != platform or entry["status"] != "pending" or (entry["slug"], platform) in skip:
+                    continue
+                next_try = entry.get("next_try")
+                if next_try and next_try > now:
+                    later = next_try if later is None or next_try < later else later
+                elif due is None or entry["queued"] < due["queued"]:
+                    due = entry
+        wait = None
+        if later is not None:
+            wait = max(1.0, (datetime.strptime(later, TIMESTAMP_FORMAT) - datetime.utcnow()).total_seconds())
+        return due, wait
+
+    def mark(self, slug, platform, url=None, error=None, retry=True):
+        """Record a post (url) or a failure; failures back off exponentially until MAX_ATTEMPTS."""
+        now = datetime.utcnow()
+        with self.lock():
+            entries = self._read()
+            entry = entries.get((slug, platform))
+            if entry is None:
+                return
+            if error is None:
+                entry.update(status="posted", posted=now.strftime(TIMESTAMP_FORMAT), next_try=None)
+                if isinstance(url, str):
+                    entry["url"] = url
+            else:
+                entry["attempts"] = entry.get("attempts", 0) + 1
+                entry["error"] = error
+                if retry and entry["attempts"] < MAX_ATTEMPTS:
+                    delay = RETRY_BASE_SECONDS * 2 ** (entry["attempts"] - 1)
+                    entry["next_try"] = (now + timedelta(seconds=delay)).strftime(TIMESTAMP_FORMAT)
+                else:
+                    entry.update(status="failed", next_try=None)
+            self._write(entries)
+
+
+def drain_platform(queue, platform, bucket, dry_run, stop, poll=None):
+    """
+    Post everything queued for one platform, oldest first. Returns when nothing is pending,
+    or, with poll set (daemon mode), keeps checking the queue every poll seconds until stop.
+    """
+    seen = set()  # dry runs leave entries pending; visit each once
+    while not stop.is_set():
+        entry, wait = queue.next_due(platform, skip=seen)
+        if entry is None:
+            if wait is None and poll is None:
+                return
+            stop.wait(min(wait, poll) if wait is not None and poll is not None else (wait or poll))
+            continue
+        slug = entry["slug"]
+        print(f"--- {slug} -> {SECTIONS[platform]} ---")
+        try:
+            filepath = MARKETING_DIR / f"{slug}-seed.md"
+            if not filepath.exists():
+                raise PublishError(f"Marketing file not found at {filepath}", retry=False)
+            block = parse_markdown_file(filepath).get(SECTIONS[platform])
+            if block is None:
+                raise PublishError("No draft found in file.", retry=False)
+            if not dry_run:
+                try:
+                    CLIENTS[platform]()
+                except PublishError as e:
+                    # setup problem (credentials, missing praw, auth): not the post's fault, so it stays queued
+                    print(f"  [{SECTIONS[platform]}] Error: {e}; leaving its queue pending.")
+                    if e.retry and poll is not None:
+                        stop.wait(poll)
+                        continue
+                    return
+                if not bucket.acquire(stop):
+                    return
+            url = HANDLERS[platform](block, dry_run=dry_run)
+        except PublishError as e:
+            print(f"  [{SECTIONS[platform]}] Error: {e}")
+            if dry_run:
+                seen.add((slug, platform))
+            else:
+                queue.mark(slug, platform, error=str(e), retry=e.retry)
+            continue
+        if dry_run:
+            seen.add((slug, platform))
+        else:
+            queue.mark(slug, platform, url=url)
 
-    except Exception as e:
-        print(f"  [Medium] Error: {e}")
-        if 'resp' in locals():
-            print(resp.text)
-    return False
+
+def drain(queue, platforms, dry_run=False, poll=None):
+    """Drain the queue with one worker thread per platform; platforms post concurrently."""
+    stop = threading.Event()
+    workers = [
+        threading.Thread(
+            target=drain_platform,
+            args=(queue, platform, TokenBucket(RATES[platform]), dry_run, stop, poll),
+            name=f"publish-{platform}",
+            daemon=True,
+        )
+        for platform in platforms
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("Stopping after the current posts...")
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+
+def print_status(queue):
+    entries = queue.entries()
+    counts = {}
+    for entry in entries:
+        key = (entry["platform"], entry["status"])
+        counts[key] = counts.get(key, 0) + 1
+    print(f"Queue {queue.path}: {len(entries)} entries")
+    for (platform, status), count in sorted(counts.items()):
+        print(f"  {platform:<8} {status:<8} {count}")
+    for entry in entries:
+        if entry["status"] == "failed" or (entry["status"] == "pending" and entry.get("error")):
+            print(f"  ! {entry['slug']} [{entry['platform']}] {entry['status']} after {entry['attempts']} attempts: {entry['error']}")
+
+
+def use_mock_endpoints(min_interval):
+    """Point both clients at an in-process scripts/mock_social_server.py instance."""
+    global REDDIT_URL, REDDIT_OAUTH_URL, MEDIUM_API_BASE, MEDIUM_AUTHOR_ID
+    global REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USERNAME, REDDIT_PASSWORD, MEDIUM_INTEGRATION_TOKEN
+    from mock_social_server import start_mock_server
+
+    server, mock, base_url = start_mock_server(min_interval=min_interval)
+    REDDIT_URL = REDDIT_OAUTH_URL = base_url
+    MEDIUM_API_BASE = f"{base_url}/v1"
+    MEDIUM_AUTHOR_ID = None
+    REDDIT_CLIENT_ID = REDDIT_CLIENT_SECRET = REDDIT_USERNAME = REDDIT_PASSWORD = "mock"
+    MEDIUM_INTEGRATION_TOKEN = "mock"
+    print(f"Using mock Reddit/Medium endpoints at {base_url}")
+    return server, mock
 
 # --- Main Logic ---
 
@@ -159,58 +526,105 @@ def parse_markdown_file(filepath):
     """
     with open(filepath, 'r', encoding='utf-8') as f:
         text = f.read()
-        
+
     sections = {}
     # Regex to find "## Platform Draft" sections
     # Matches "## Reddit Draft" until the next "## " or end of string
     platforms = ["Reddit", "Medium", "Quora", "Twitter"]
-    
+
     for p in platforms:
         pattern = re.compile(f"## {p} Draft\n(.*?)(?=\n## |\Z)", re.DOTALL)
         match = pattern.search(text)
         if match:
             sections[p] = match.group(1).strip()
-            
+
     return sections
 
+def publish_now(slugs, platforms, dry_run=False):
+    """Post the given slugs right away (no queue); posts on one platform are spaced by its token bucket."""
+    buckets = {platform: TokenBucket(RATES[platform]) for platform in platforms}
+    for slug in slugs:
+        filepath = MARKETING_DIR / f"{slug}-seed.md"
+        if not filepath.exists():
+            print(f"Error: Marketing file not found at {filepath}")
+            print(f"Run 'python scripts/generate_social_seed.py {slug}' first.")
+            continue
+
+        print(f"--- Processing {slug} ---")
+        sections = parse_markdown_file(filepath)
+        for platform in platforms:
+            name = SECTIONS[platform]
+            if name not in sections:
+                print(f"  [{name}] No draft found in file.")
+                continue
+            if not dry_run:
+                buckets[platform].acquire()
+            try:
+                HANDLERS[platform](sections[name], dry_run=dry_run)
+            except PublishError as e:
+                print(f"  [{name}] Error: {e}")
+
 def main():
     parser = argparse.ArgumentParser(description="Automated Social Media Publisher")
-    parser.add_argument("slug", help="Tool slug (e.g., loan-amortization-calculator)")
+    parser.add_argument("slugs", nargs="*", help="Tool slugs (e.g., loan-amortization-calculator)")
     parser.add_argument("--dry-run", action="store_true", help="Preview without posting")
     parser.add_argument("--platform", choices=["all", "reddit", "medium"], default="all", help="Specific platform to post to")
-    
+    parser.add_argument("--enqueue", action="store_true", help="Add the slugs to the posting queue instead of posting now")
+    parser.add_argument("--force", action="store_true", help="With --enqueue, re-queue pairs that were already posted")
+    parser.add_argument("--drain", action="store_true", help="Post everything pending in the queue, then exit")
+    parser.add_argument("--daemon", action="store_true", help="Keep draining the queue, checking for new entries every --poll seconds")
+    parser.add_argument("--poll", type=float, default=30.0, help="Daemon queue check interval in seconds (default 30)")
+    parser.add_argument("--status", action="store_true", help="Show queue counts and failures")
+    parser.add_argument("--queue", type=Path, default=QUEUE_FILE, help=f"Queue file (default {QUEUE_FILE})")
+    parser.add_argument("--rate", action="append", default=[], metavar="PLATFORM=N", help="Posts per minute for a platform, e.g. reddit=2 (repeatable)")
+    parser.add_argument("--mock", action="store_true", help="Post to local mock Reddit/Medium endpoints (scripts/mock_social_server.py)")
+    parser.add_argument("--mock-min-interval", type=float, default=0.0, help="With --mock, answer posts closer than this many seconds with 429")
+
     args = parser.parse_args()
-    
-    # Locate file
-    filename = f"{args.slug}-seed.md"
-    filepath = MARKETING_DIR / filename
-    
-    if not filepath.exists():
-        print(f"Error: Marketing file not found at {filepath}")
-        print(f"Run 'python scripts/generate_social_seed.py {args.slug}' first.")
-        return
-
-    print(f"--- Processing {args.slug} ---")
-    sections = parse_markdown_file(filepath)
-    
-    # Reddit
-    if args.platform in ["all", "reddit"]:
-        if "Reddit" in sections:
-            post_to_reddit(sections["Reddit"], dry_run=args.dry_run)
-            time.sleep(2) # Rate limit safety
-        else:
-            print("  [Reddit] No draft found in file.")
 
-    # Medium
-    if args.platform in ["all", "medium"]:
-        if "Medium" in sections:
-            post_to_medium(sections["Medium"], dry_run=args.dry_run)
-            time.sleep(2)
-        else:
-            print("  [Medium] No draft found in file.")
-            
+    for item in args.rate:
+        platform, _, value = item.partition("=")
+        if platform not in RATES:
+            parser.error(f"--rate: unknown platform '{platform}'")
+        try:
+            RATES[platform] = float(value)
+        except ValueError:
+            parser.error(f"--rate: '{item}' is not PLATFORM=N")
+    platforms = list(SECTIONS) if args.platform == "all" else [args.platform]
+    queue = PublishQueue(args.queue)
+
+    if args.enqueue:
+        if not args.slugs:
+            parser.error("--enqueue needs at least one slug")
+        missing = [slug for slug in args.slugs if not (MARKETING_DIR / f"{slug}-seed.md").exists()]
+        for slug in missing:
+            print(f"Warning: no marketing file for {slug} yet; it will fail unless generated before posting.")
+        added = queue.add([(slug, platform) for slug in args.slugs for platform in platforms], force=args.force)
+        print(f"Queued {added} posts ({len(args.slugs) * len(platforms) - added} already pending or posted).")
+        if not (args.drain or args.daemon):
+            return
+    elif not args.slugs and not (args.drain or args.daemon or args.status):
+        parser.error("give slugs to post, or --enqueue/--drain/--daemon/--status")
+
+    server = mock = None
+    if args.mock:
+        server, mock = use_mock_endpoints(args.mock_min_interval)
+    try:
+        if args.drain or args.daemon:
+            drain(queue, platforms, dry_run=args.dry_run, poll=args.poll if args.daemon else None)
+        elif args.slugs and not args.status:
+            publish_now(args.slugs, platforms, dry_run=args.dry_run)
+    finally:
+        close_clients()
+        if server is not None:
+            server.shutdown()
+            print(f"Mock endpoints received: {mock.counts}")
+
+    if args.status or args.drain or args.daemon:
+        print_status(queue)
+
     # Note on others
-    if args.platform == "all":
+    if args.platform == "all" and args.slugs and not args.enqueue:
         print(f"  [Info] Quora and Twitter drafts are generated but require manual posting (APIs expensive/complex).")
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+import json
+
+import generation_scheduler
+from generation_scheduler import DeadLetterQueue, RateBudget, RetryPolicy, estimate_tokens
+
+
+def test_dead_letter_counts_attempts_and_drops_exhausted_topics(tmp_path):
+    queue = DeadLetterQueue(tmp_path / "dead_letter.jsonl", max_attempts=3)
+    assert queue.add("bmi", "BMI calculator", "timeout", category="health")
+    assert queue.add("bmi", "BMI calculator", "bad json")
+    entry = queue.load()[0]
+    assert (entry["attempts"], entry["error"], entry["category"]) == (2, "bad json", "health")
+
+    assert not queue.add("bmi", "BMI calculator", "timeout")
+    assert len(queue) == 0
+
+
+def test_dead_letter_truncates_long_errors(tmp_path):
+    queue = DeadLetterQueue(tmp_path / "dead_letter.jsonl")
+    queue.add("bmi", "prompt", "x" * 1000)
+    assert len(queue.load()[0]["error"]) == 300
+
+
+def test_dead_letter_save_round_trips_and_discard_empties_the_file(tmp_path):
+    path = tmp_path / "dead_letter.jsonl"
+    queue = DeadLetterQueue(path)
+    queue.add("bmi", "prompt", "timeout")
+    queue.add("tip", "prompt", "timeout")
+    queue.save()
+    assert [json.loads(line)["slug"] for line in path.read_text(encoding="utf-8").splitlines()] == ["bmi", "tip"]
+
+    reloaded = DeadLetterQueue(path)
+    reloaded.discard("bmi")
+    reloaded.discard("tip")
+    reloaded.save()
+    assert not path.exists()
+
+
+def test_dead_letter_save_without_changes_leaves_the_file_alone(tmp_path):
+    path = tmp_path / "dead_letter.jsonl"
+    path.write_text('{"slug": "bmi", "attempts": 1}\nnot json\n', encoding="utf-8")
+    queue = DeadLetterQueue(path)
+    assert len(queue) == 1
+    queue.save()
+    assert "not json" in path.read_text(encoding="utf-8")
+
+
+def test_retry_policy_retries_until_a_result(monkeypatch):
+    monkeypatch.setattr(generation_scheduler.time, "sleep", lambda seconds: None)
+    outcomes = iter([RuntimeError("boom"), None, "tool"])
+
+    def call():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert RetryPolicy(attempts=3).call(call) == ("tool", "")
+
+
+def test_retry_policy_reports_the_last_error(monkeypatch):
+    monkeypatch.setattr(generation_scheduler.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError("bad json")
+
+    assert RetryPolicy(attempts=2).call(call) == (None, "bad json")
+    assert len(calls) == 2
+
+
+def test_retry_policy_delay_is_capped():
+    policy = RetryPolicy(base_delay=2.0, max_delay=5.0)
+    assert all(0 <= policy.delay(attempt) <= 5.0 for attempt in range(1, 10))
+
+
+def test_rate_budget_admits_within_limits_without_waiting():
+    budget = RateBudget(requests_per_minute=2, tokens_per_minute=10_000)
+    assert budget.acquire(estimate_tokens("prompt")) == 0.0
+    assert budget.acquire(100) == 0.0
+    assert budget.waited == 0.0
+
+
+def test_rate_budget_waits_for_the_window_when_full(monkeypatch):
+    clock = [100.0]
+    slept = []
+    monkeypatch.setattr(generation_scheduler.time, "monotonic", lambda: clock[0])
+
+    def sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(generation_scheduler.time, "sleep", sleep)
+    budget = RateBudget(requests_per_minute=1, tokens_per_minute=0, window=60.0)
+    budget.acquire(1)
+    clock[0] += 10
+    waited = budget.acquire(1)
+    assert 50 < waited < 51
+    assert slept and budget.waited == waited
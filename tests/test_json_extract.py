@@ -0,0 +1,68 @@
+import pytest
+
+from json_extract import JSONExtractError, JSONStreamExtractor, extract_json
+
+
+def test_extract_json_from_fenced_prose():
+    text = 'Here you go:\n```json\n{"title": "BMI {calc}", "tags": ["a", "b"]}\n```\nEnjoy!'
+    assert extract_json(text) == {"title": "BMI {calc}", "tags": ["a", "b"]}
+
+
+def test_extract_json_honours_kind():
+    text = 'Options [1, 2] then {"a": 1}'
+    assert extract_json(text, "array") == [1, 2]
+    assert extract_json(text, "object") == {"a": 1}
+    assert extract_json(text) == [1, 2]
+
+
+def test_extract_json_handles_escaped_quotes_and_brackets_in_strings():
+    assert extract_json(r'{"a": "say \"}\" ]", "b": [{}]} trailing }') == {"a": 'say "}" ]', "b": [{}]}
+
+
+@pytest.mark.parametrize(
+    "text, reason",
+    [
+        ("no json here", "no JSON any found"),
+        ('{"a": [1, 2}', "expected ']' but found '}'"),
+        ('{"a": "unterminated', "truncated JSON (inside a string)"),
+        ('{"a": {"b": 1}', "truncated JSON (with 1 unclosed bracket(s))"),
+    ],
+)
+def test_extract_json_errors_carry_reason(text, reason):
+    with pytest.raises(JSONExtractError) as info:
+        extract_json(text)
+    assert info.value.reason == reason
+
+
+def test_extract_json_reports_invalid_json_inside_balanced_brackets():
+    with pytest.raises(JSONExtractError) as info:
+        extract_json("x {'a': 1}")
+    assert info.value.position >= 2
+
+
+def test_stream_extractor_accepts_chunks_and_reports_members():
+    keys, members = [], []
+    extractor = JSONStreamExtractor("object", on_key=keys.append, on_member=lambda key, raw: members.append((key, raw)))
+    text = 'prefix {"title": "A, B", "faq": [{"q": 1}, {"q": 2}], "n": 3} suffix'
+    done = [extractor.feed(text[index : index + 5]) for index in range(0, len(text), 5)]
+    assert done[-1] and not done[0]
+    assert extractor.complete
+    assert keys == ["title", "faq", "n"]
+    assert members == [("title", '"A, B"'), ("faq", '[{"q": 1}, {"q": 2}]'), ("n", "3")]
+    assert extractor.result() == {"title": "A, B", "faq": [{"q": 1}, {"q": 2}], "n": 3}
+
+
+def test_stream_extractor_callbacks_can_abort_early():
+    def reject(key):
+        if key == "bad":
+            raise ValueError(key)
+
+    extractor = JSONStreamExtractor("object", on_key=reject)
+    with pytest.raises(ValueError):
+        extractor.feed('{"ok": 1, "bad": ')
+    assert not extractor.complete
+
+
+def test_stream_extractor_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        JSONStreamExtractor("string")
@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+import social_publisher  # noqa: E402
+from social_publisher import MAX_ATTEMPTS, TIMESTAMP_FORMAT, PublishQueue  # noqa: E402
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return PublishQueue(tmp_path / "publish_queue.jsonl")
+
+
+def test_add_skips_queued_and_posted_pairs_unless_forced(queue):
+    assert queue.add([("bmi", "reddit"), ("bmi", "medium")]) == 2
+    assert queue.add([("bmi", "reddit")]) == 0
+    queue.mark("bmi", "reddit", url="https://example.com/bmi")
+    assert queue.add([("bmi", "reddit")]) == 0
+    assert queue.add([("bmi", "reddit")], force=True) == 1
+    entry = next(e for e in queue.entries() if e["platform"] == "reddit")
+    assert (entry["status"], entry["attempts"]) == ("pending", 0)
+
+
+def test_next_due_returns_the_oldest_pending_entry_per_platform(queue):
+    queue.add([("old", "reddit")])
+    queue.add([("new", "reddit"), ("other", "medium")])
+    # same-second stamps: make the order explicit
+    entries = {(e["slug"], e["platform"]): e for e in queue.entries()}
+    entries[("old", "reddit")]["queued"] = "2026-01-01T00:00:00Z"
+    queue._write(entries)
+
+    due, wait = queue.next_due("reddit")
+    assert (due["slug"], wait) == ("old", None)
+    due, _ = queue.next_due("reddit", skip={("old", "reddit")})
+    assert due["slug"] == "new"
+
+
+def test_failures_back_off_then_fail_after_max_attempts(queue):
+    queue.add([("bmi", "reddit")])
+    queue.mark("bmi", "reddit", error="503")
+    entry = queue.entries()[0]
+    assert (entry["status"], entry["attempts"], entry["error"]) == ("pending", 1, "503")
+    assert datetime.strptime(entry["next_try"], TIMESTAMP_FORMAT) > datetime.utcnow()
+
+    due, wait = queue.next_due("reddit")
+    assert due is None and wait >= 1.0
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        queue.mark("bmi", "reddit", error="503")
+    assert queue.entries()[0]["status"] == "failed"
+    assert queue.next_due("reddit") == (None, None)
+
+
+def test_non_retryable_failure_fails_at_once(queue):
+    queue.add([("bmi", "medium")])
+    queue.mark("bmi", "medium", error="may have posted", retry=False)
+    entry = queue.entries()[0]
+    assert (entry["status"], entry["next_try"]) == ("failed", None)
+
+
+def test_due_again_once_the_backoff_has_passed(queue):
+    queue.add([("bmi", "reddit")])
+    queue.mark("bmi", "reddit", error="429")
+    entries = {(e["slug"], e["platform"]): e for e in queue.entries()}
+    entries[("bmi", "reddit")]["next_try"] = (datetime.utcnow() - timedelta(seconds=5)).strftime(TIMESTAMP_FORMAT)
+    queue._write(entries)
+    due, _ = queue.next_due("reddit")
+    assert due["slug"] == "bmi"
+
+
+def test_mark_ignores_unknown_pairs_and_malformed_lines(queue):
+    queue.path.write_text('not json\n{"slug": "bmi", "platform": "reddit", "status": "pending", "queued": "x", "attempts": 0}\n', encoding="utf-8")
+    queue.mark("tip", "reddit", url="u")
+    assert [e["slug"] for e in queue.entries()] == ["bmi"]
+
+
+def _add_and_post(path, worker, count):
+    queue = PublishQueue(path)
+    for index in range(count):
+        slug = f"w{worker}-{index}"
+        queue.add([(slug, "reddit")])
+        queue.mark(slug, "reddit", url=f"https://example.com/{slug}")
+
+
+@pytest.mark.skipif(social_publisher.fcntl is None, reason="cross-process locking needs fcntl")
+def test_concurrent_processes_do_not_lose_entries(queue):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_add_and_post, args=(queue.path, worker, 15)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+    assert all(process.exitcode == 0 for process in workers)
+    lines = [json.loads(line) for line in queue.path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 60
+    assert all(entry["status"] == "posted" for entry in lines)
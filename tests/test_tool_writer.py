@@ -0,0 +1,60 @@
+import json
+import os
+
+import tool_writer
+from tool_writer import ToolWriteBatch, serialize_tool
+
+TOOL = {"slug": "bmi", "title": "BMI — calculator", "related": []}
+
+
+def test_stage_writes_a_hidden_temp_file_until_commit(tmp_path):
+    batch = ToolWriteBatch(tmp_path)
+    raw = batch.stage("bmi", TOOL)
+    assert raw == serialize_tool(TOOL)
+    assert len(batch) == 1
+    assert not (tmp_path / "bmi.json").exists()
+    assert (tmp_path / ".bmi.json.tmp").read_bytes() == raw
+
+    committed = batch.commit()
+    assert [(slug, path.name, data) for slug, path, data, _ in committed] == [("bmi", "bmi.json", TOOL)]
+    assert json.loads((tmp_path / "bmi.json").read_text(encoding="utf-8")) == TOOL
+    assert not (tmp_path / ".bmi.json.tmp").exists()
+    assert len(batch) == 0 and batch.commit() == []
+
+
+def test_commit_replaces_existing_files(tmp_path):
+    (tmp_path / "bmi.json").write_text("{}", encoding="utf-8")
+    batch = ToolWriteBatch(tmp_path, compact=True)
+    batch.stage("bmi", TOOL)
+    batch.commit()
+    assert (tmp_path / "bmi.json").read_bytes() == serialize_tool(TOOL, compact=True)
+
+
+def test_abort_removes_staged_files_and_keeps_the_old_ones(tmp_path):
+    (tmp_path / "bmi.json").write_text("{}", encoding="utf-8")
+    batch = ToolWriteBatch(tmp_path)
+    batch.stage("bmi", TOOL)
+    batch.stage("tip", TOOL)
+    batch.abort()
+    assert sorted(os.listdir(tmp_path)) == ["bmi.json"]
+    assert (tmp_path / "bmi.json").read_text(encoding="utf-8") == "{}"
+    assert batch.commit() == []
+
+
+def test_stage_finishes_short_writes(tmp_path, monkeypatch):
+    real_write = os.write
+    calls = []
+
+    def short_write(fd, data):
+        calls.append(len(data))
+        return real_write(fd, bytes(data[:7]))
+
+    monkeypatch.setattr(tool_writer.os, "write", short_write)
+    raw = ToolWriteBatch(tmp_path).stage("bmi", TOOL)
+    assert len(calls) > 1
+    assert (tmp_path / ".bmi.json.tmp").read_bytes() == raw
+
+
+def test_serialize_tool_layouts():
+    assert serialize_tool(TOOL).startswith(b"{\n  ")
+    assert serialize_tool(TOOL, compact=True) == (json.dumps(TOOL, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from topic_queue import TopicQueue
+
+NOW = datetime(2026, 1, 10, 12, 0, 0)
+
+
+def make_queue(tmp_path, *items, now=NOW):
+    queue = TopicQueue(tmp_path / "topic_queue.jsonl")
+    for slug, category, origin in items:
+        queue.offer(slug, f"prompt for {slug}", category, origin, now=now)
+    return queue
+
+
+def test_offer_is_new_once_and_counts_repeats_on_later_days(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.offer("bmi", "BMI calculator", "health", "trend", now=NOW)
+    assert not queue.offer("bmi", "BMI calculator", "health", "trend", now=NOW)
+    assert not queue.offer("bmi", "BMI calculator", "health", "trend", now=NOW + timedelta(days=1))
+    # topics.txt lines are offered every run and never count as repeats
+    assert not queue.offer("bmi", "BMI calculator", "health", "file", now=NOW + timedelta(days=2))
+    assert queue.load()["bmi"]["repeats"] == 1
+
+
+def test_offer_keeps_the_higher_priority_origin(tmp_path):
+    queue = make_queue(tmp_path, ("bmi", "health", "file"))
+    queue.offer("bmi", "planned prompt", "fitness", "plan", now=NOW)
+    queue.offer("bmi", "trend prompt", "news", "trend", now=NOW)
+    entry = queue.load()["bmi"]
+    assert (entry["origin"], entry["prompt"], entry["category"]) == ("plan", "planned prompt", "fitness")
+
+
+def test_select_orders_by_score_and_removes_picks(tmp_path):
+    queue = make_queue(tmp_path, ("from-file", "a", "file"), ("planned", "b", "plan"), ("trending", "c", "trend"))
+    picked = [entry["slug"] for entry in queue.select(2, now=NOW)]
+    assert picked == ["planned", "trending"]
+    assert list(queue.load()) == ["from-file"]
+
+
+def test_select_caps_categories_until_other_categories_run_out(tmp_path):
+    queue = make_queue(tmp_path, *[(f"fin-{index}", "finance", "plan") for index in range(4)], ("hp", "health", "file"))
+    picked = queue.select(3, max_per_category=2, now=NOW)
+    assert [entry["category"] for entry in picked].count("finance") == 2
+    assert "hp" in {entry["slug"] for entry in picked}
+
+    # only one category left: the cap gives way rather than leaving slots empty
+    assert len(queue.select(2, max_per_category=1, now=NOW)) == 2
+
+
+def test_select_drops_excluded_and_near_duplicate_candidates(tmp_path):
+    queue = make_queue(tmp_path, ("exists", "a", "plan"), ("dupe", "b", "plan"), ("fresh", "c", "plan"))
+    picked = queue.select(
+        3,
+        exclude=lambda slug: slug == "exists",
+        novelty=lambda prompt: None if "dupe" in prompt else 0.8,
+        now=NOW,
+    )
+    assert [entry["slug"] for entry in picked] == ["fresh"]
+    assert picked[0]["novelty"] == 0.8
+    assert len(queue) == 0
+
+
+def test_prune_drops_candidates_not_offered_recently(tmp_path):
+    queue = make_queue(tmp_path, ("old", "a", "trend"), now=NOW - timedelta(days=40))
+    queue.offer("new", "prompt", "a", "trend", now=NOW)
+    assert queue.prune(now=NOW) == 1
+    assert list(queue.load()) == ["new"]
+
+
+def test_save_round_trips_and_removes_an_empty_queue(tmp_path):
+    queue = make_queue(tmp_path, ("bmi", "health", "plan"), ("tip", "money", "trend"))
+    queue.save()
+    reloaded = TopicQueue(queue.path)
+    assert reloaded.load() == queue.load()
+
+    reloaded.select(5, now=NOW)
+    reloaded.save()
+    assert not queue.path.exists()
+
+
+def test_load_skips_malformed_lines(tmp_path):
+    path = tmp_path / "topic_queue.jsonl"
+    path.write_text('{"slug": "ok", "prompt": "p"}\nnot json\n\n{"slug": "no-prompt"}\n', encoding="utf-8")
+    assert list(TopicQueue(path).load()) == ["ok"]